@@ -13,8 +13,8 @@ from .forms import CustomUserCreationForm, CustomLoginForm
 from .models import *
 from market.models import ShoppingList, ShoppingListIngredient
 from food.models import SavedRecipe
+from food.services import recipe_search
 from market.models import ActivityLog
-from food.utils import get_user_total_point, cart_items_count
 from accounts.utils import *
 
 # =============================================================================
@@ -98,9 +98,6 @@ def activity_log_view(request):
         .count() + 1
     ) if my_week_points > 0 else None
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     return render(request, 'accounts/activity_log.html', {
         # 전체 기준 요약(유틸 반환 분해)
         'total_logs': totals['total_logs'],
@@ -113,8 +110,6 @@ def activity_log_view(request):
         # 목록(전체 로그)
         'log_data': log_data,
 
-        "cart_items_count": items_count,
-        "total_point": total_point,
     })
 
 
@@ -184,16 +179,11 @@ def activity_history_view(request):
             "calories_kcal": log.calories_kcal,
         })
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     return render(request, "accounts/activity_history.html", {
         "q": q,
         "period": period,
         "sort": sort,
         "log_data": log_data,
-        "cart_items_count": items_count,
-        "total_point": total_point,
     })
 
 
@@ -266,32 +256,33 @@ def activity_detail_ajax(request, shopping_list_id):
 def my_recipes(request):
     """
     내가 저장한 레시피 목록
-    - 검색(제목), 정렬(최신/가나다)
+    - 검색(제목/내용 전문 검색, food.services.recipe_search), 정렬(관련도/최신/가나다)
+    - 검색어가 있으면 기본은 관련도순, 제목/내용의 일치 부분은 <mark>로 표시
     """
     user = request.user
 
     q = request.GET.get('q', '').strip()
-    sort = request.GET.get('sort', 'latest')
-
-    recipes = SavedRecipe.objects.filter(user=user)
+    sort = request.GET.get('sort') or ('relevance' if q else 'latest')
 
     if q:
-        recipes = recipes.filter(title__icontains=q)
-
-    if sort == 'alpha':
-        recipes = recipes.order_by('title')
+        recipes = []
+        for hit in recipe_search.search(user, q):
+            hit.recipe.title_html = hit.title_html
+            hit.recipe.snippet_html = hit.snippet_html
+            recipes.append(hit.recipe)
+        if sort == 'alpha':
+            recipes.sort(key=lambda r: r.title)
+        elif sort == 'latest':
+            recipes.sort(key=lambda r: r.created_at, reverse=True)
+    elif sort == 'alpha':
+        recipes = SavedRecipe.objects.filter(user=user).order_by('title')
     else:
-        recipes = recipes.order_by('-created_at')
-
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
+        recipes = SavedRecipe.objects.filter(user=user).order_by('-created_at')
 
     return render(request, 'accounts/my_recipes.html', {
         'recipes': recipes,
         'q': q,
         'sort': sort,
-        "cart_items_count": items_count,
-        "total_point": total_point,
     })
 
 
@@ -3,4 +3,29 @@ from .models import *
 
 admin.site.register(Ingredient)
 admin.site.register(SavedRecipe)
-admin.site.register(FoodBanner)
\ No newline at end of file
+admin.site.register(FoodBanner)
+admin.site.register(GptJob)
+admin.site.register(GeneratedText)
+
+
+@admin.register(LlmCall)
+class LlmCallAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "task", "model", "latency_ms", "prompt_tokens", "completion_tokens",
+                    "cache_hit", "retries", "parse_ok")
+    list_filter = ("task", "model", "cache_hit", "parse_ok")
+    date_hierarchy = "created_at"
+
+
+@admin.register(SearchTrend)
+class SearchTrendAdmin(admin.ModelAdmin):
+    list_display = ("window_start", "dong", "term", "count")
+    list_filter = ("dong",)
+    search_fields = ("term",)
+    date_hierarchy = "window_start"
+
+
+@admin.register(FlowState)
+class FlowStateAdmin(admin.ModelAdmin):
+    list_display = ("user", "shopping_list", "updated_at", "expires_at")
+    exclude = ("chat_history", "recipe_chat", "last_recipe_text", "idea_hist")
+    raw_id_fields = ("user", "shopping_list")
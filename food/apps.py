@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class FoodConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'food'
+
+    def ready(self):
+        # 백그라운드 GPT 작업 등록
+        from . import tasks  # noqa: F401
+        # 캐시/스냅샷 무효화 시그널
+        from . import signals  # noqa: F401
@@ -0,0 +1,29 @@
+"""
+공통 헤더(장바구니 수, 보유 포인트) 컨텍스트.
+
+템플릿이 실제로 값을 쓸 때만 계산하고(호출 가능한 값은 템플릿이 알아서 호출),
+한 요청 안에서는 한 번만 계산한다. 뷰가 같은 키를 넘기면 뷰 값이 우선.
+"""
+from .utils import cart_items_count, get_user_total_point
+
+
+def header(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+
+    memo = {}
+
+    def once(fn):
+        def get():
+            if fn not in memo:
+                memo[fn] = fn(user)
+            return memo[fn]
+        return get
+
+    count = once(cart_items_count)
+    return {
+        "cart_items_count": count,
+        "items_count": count,
+        "total_point": once(get_user_total_point),
+    }
@@ -0,0 +1,97 @@
+import statistics, time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from food import utils as food_utils
+from food.models import Ingredient
+from food.services.fake_llm import FakeLLMClient
+from food.services.llm_telemetry import instrument_client
+from market import utils as market_utils
+
+SAMPLE_NAMES = ["양파", "대파", "두부", "계란", "감자", "애호박", "돼지고기", "김치"]
+
+
+class Command(BaseCommand):
+    help = "가짜 LLM 백엔드로 GPT 헬퍼들을 돌려 지연(p50/p95)과 우리 쪽 오버헤드를 측정합니다."
+
+    FLOWS = ["leftover", "ingredients", "ingredients_v2", "idea", "idea_followup",
+             "tip", "tip_batch", "praise", "chat"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flows", default="all", help=f"쉼표 구분 ({', '.join(self.FLOWS)})")
+        parser.add_argument("--calls", type=int, default=50, help="흐름별 호출 수")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--latency", type=float, default=0.2, help="가짜 지연 중앙값(초)")
+        parser.add_argument("--sigma", type=float, default=0.3, help="lognormal sigma (0이면 고정)")
+        parser.add_argument("--failure-rate", type=float, default=0.0)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **opts):
+        flows = self.FLOWS if opts["flows"] == "all" else [f.strip() for f in opts["flows"].split(",")]
+        unknown = set(flows) - set(self.FLOWS)
+        if unknown:
+            raise CommandError(f"알 수 없는 흐름: {', '.join(sorted(unknown))}")
+
+        fake = FakeLLMClient({
+            "seed": opts["seed"],
+            "latency": {"dist": "lognormal", "median": opts["latency"], "sigma": opts["sigma"]},
+            "failure_rate": opts["failure_rate"],
+            "failure_kinds": ["timeout", "connection", "malformed"],
+        })
+        # 벤치마크는 설정과 무관하게 항상 가짜 백엔드
+        food_utils.client = market_utils.client = instrument_client(fake)
+
+        names = list(Ingredient.objects.values_list("name", flat=True)[:200]) or SAMPLE_NAMES
+        self.stdout.write(f"{'flow':<16}{'calls':>6}{'p50 ms':>10}{'p95 ms':>10}{'overhead ms':>13}{'errors':>8}")
+        for flow in flows:
+            cache.clear()
+            injected_before = fake.injected_latency
+            run = self._flow(flow, names)
+            with ThreadPoolExecutor(max_workers=opts["concurrency"]) as pool:
+                results = list(pool.map(lambda i: self._timed(run, i), range(opts["calls"])))
+            walls = sorted(w for w, _ in results)
+            errors = sum(1 for _, ok in results if not ok)
+            injected = fake.injected_latency - injected_before
+            overhead = max(0.0, sum(walls) - injected) / len(walls)
+            p95 = walls[min(len(walls) - 1, int(len(walls) * 0.95))]
+            self.stdout.write(
+                f"{flow:<16}{len(walls):>6}{statistics.median(walls) * 1000:>10.1f}"
+                f"{p95 * 1000:>10.1f}{overhead * 1000:>13.2f}{errors:>8}"
+            )
+
+    @staticmethod
+    def _timed(run, i):
+        t0 = time.monotonic()
+        try:
+            run(i)
+            ok = True
+        except Exception:
+            ok = False
+        return time.monotonic() - t0, ok
+
+    @staticmethod
+    def _flow(flow, names):
+        def pick(i, k):
+            return [names[(i + j) % len(names)] for j in range(k)]
+
+        if flow == "leftover":
+            # 같은 키 캐시 적중을 피하려고 요청마다 followup을 다르게
+            return lambda i: food_utils.call_gpt(pick(i, 3), f"#{i}", deadline=60)
+        if flow == "ingredients":
+            return lambda i: food_utils.extract_ingredients_from_recipe(f"요리{i}")
+        if flow == "ingredients_v2":
+            return lambda i: food_utils.extract_ingredients_from_recipe_v2(f"요리{i}", allowed_ingredients=names)
+        if flow == "idea":
+            return lambda i: food_utils.generate_recipe_chat(pick(i, 1)[0])
+        if flow == "idea_followup":
+            return lambda i: food_utils.generate_recipe_chat(pick(i, 1)[0], followup="매운 버전도 돼?")
+        if flow == "tip":
+            return lambda i: market_utils.generate_tip_text(pick(i, 1)[0])
+        if flow == "tip_batch":
+            return lambda i: market_utils.generate_tip_texts_batch(pick(i, 8))
+        if flow == "praise":
+            return lambda i: market_utils.generate_arrival_praises("통일시장", "쌍문동", 800 + i)
+        return lambda i: food_utils.gpt_conversational_cook([
+            {"role": "system", "content": "추천 끝에 요리명을 큰따옴표(\")로 감싸서 제시해."},
+            {"role": "user", "content": f"오늘 피곤해요 #{i}"},
+        ])
@@ -0,0 +1,108 @@
+import statistics, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+from food.services import session_store
+
+
+class Command(BaseCommand):
+    help = ("동시 사용자 N명이 세션을 읽고 고쳐 저장하는 요청을 흉내 내 "
+            "백엔드별 초당 저장 수(p50/p95)와 실제 DB 쓰기 수를 측정합니다.")
+
+    BACKENDS = {
+        "db": "django.contrib.sessions.backends.db",
+        "cached_db": "food.services.session_store",
+        "cached_db_wb": "food.services.session_store",   # write-behind
+        "cache": "django.contrib.sessions.backends.cache",
+        "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backends", default="all", help=f"쉼표 구분 ({', '.join(self.BACKENDS)})")
+        parser.add_argument("--users", type=int, default=8, help="동시 사용자(스레드) 수")
+        parser.add_argument("--requests", type=int, default=200, help="사용자별 요청 수")
+        parser.add_argument("--noop-ratio", type=float, default=0.5,
+                            help="같은 값을 다시 넣는 요청 비율 (modified만 켜지고 내용은 그대로)")
+        parser.add_argument("--write-behind", type=int, default=1, help="cached_db_wb의 flush 간격(초)")
+
+    def handle(self, *args, **opts):
+        names = list(self.BACKENDS) if opts["backends"] == "all" else [b.strip() for b in opts["backends"].split(",")]
+        unknown = set(names) - set(self.BACKENDS)
+        if unknown:
+            raise CommandError(f"알 수 없는 백엔드: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(f"{'backend':<16}{'saves':>7}{'saves/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+                          f"{'db writes':>11}{'errors':>8}")
+        for name in names:
+            store_cls = import_module(self.BACKENDS[name]).SessionStore
+            old_wb = session_store.SessionStore.write_behind
+            session_store.SessionStore.write_behind = opts["write_behind"] if name == "cached_db_wb" else 0
+            try:
+                self._run(name, store_cls, opts)
+            finally:
+                session_store.SessionStore.write_behind = old_wb
+
+    def _run(self, name, store_cls, opts):
+        writes, errors = [0], [0]
+        lock = threading.Lock()
+
+        def count_writes(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith(("INSERT", "UPDATE")) and "django_session" in sql:
+                with lock:
+                    writes[0] += 1
+            return execute(sql, params, many, context)
+
+        # write-behind flush 스레드의 쓰기까지 세려고 모든 새 연결에 붙임
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(count_writes)
+
+        def new_session():
+            store = store_cls()
+            store["recent_searches"] = []
+            store.save()
+            return store.session_key
+
+        def user(u, key):
+            close_old_connections()
+            timings = []
+            for i in range(opts["requests"]):
+                t0 = time.perf_counter()
+                try:
+                    store = store_cls(key)
+                    recent = store.get("recent_searches", [])
+                    if (i % 20) / 20 >= opts["noop_ratio"]:
+                        recent = ([f"검색{u}-{i}"] + recent)[:6]
+                    store["recent_searches"] = recent   # 같은 값이어도 modified는 켜짐 (뷰와 같은 패턴)
+                    store.save()
+                    key = store.session_key
+                except Exception:   # SQLite 'database is locked' 등
+                    with lock:
+                        errors[0] += 1
+                timings.append(time.perf_counter() - t0)
+            connections.close_all()
+            return timings, key
+
+        connection_created.connect(install)
+        connection.execute_wrappers.append(count_writes)
+        try:
+            keys = [new_session() for _ in range(opts["users"])]   # 준비 단계는 측정하지 않음
+            writes[0] = 0
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=opts["users"]) as pool:
+                results = list(pool.map(user, range(opts["users"]), keys))
+            wall = time.perf_counter() - t0
+            session_store.flush()
+            for _, key in results:
+                store_cls(key).delete()
+            timings = [t for ts, _ in results for t in ts]
+        finally:
+            connection_created.disconnect(install)
+            connection.execute_wrappers.remove(count_writes)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{name:<16}{len(timings):>7}{len(timings) / wall:>10.0f}{statistics.median(timings) * 1000:>9.2f}"
+            f"{p95 * 1000:>9.2f}{writes[0]:>11}{errors[0]:>8}"
+        )
@@ -0,0 +1,52 @@
+import os, time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from food.models import FoodBanner, Ingredient
+from food.services import renditions
+from market.models import Market, NearbyPlace
+
+
+class Command(BaseCommand):
+    help = ("모든 ImageField 원본의 WebP/JPEG 리사이즈본"
+            f"({', '.join(map(str, renditions.RENDITION_WIDTHS))}px)을 프로세스 풀로 만듭니다. "
+            "이미 있고 원본보다 새 파일은 건너뜁니다.")
+
+    MODELS = {"ingredient": Ingredient, "banner": FoodBanner, "market": Market, "nearby": NearbyPlace}
+
+    def add_arguments(self, parser):
+        parser.add_argument("--models", default="all", help=f"쉼표 구분 ({', '.join(self.MODELS)})")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--force", action="store_true", help="있는 리사이즈본도 다시 만듦")
+
+    def handle(self, *args, **opts):
+        keys = list(self.MODELS) if opts["models"] == "all" else [m.strip() for m in opts["models"].split(",")]
+        unknown = set(keys) - set(self.MODELS)
+        if unknown:
+            raise CommandError(f"알 수 없는 모델: {', '.join(sorted(unknown))}")
+
+        jobs, missing = [], 0
+        for key in keys:
+            names = (self.MODELS[key].objects.exclude(image="").exclude(image__isnull=True)
+                     .values_list("image", flat=True).distinct())
+            for name in names:
+                path = renditions.source_path(name)
+                if path and os.path.exists(path):
+                    jobs.append((name, path, opts["force"]))
+                else:
+                    missing += 1
+
+        t0 = time.monotonic()
+        done = failed = 0
+        # 워커에는 파일 경로만 넘기고(Django 불필요), 캐시 갱신은 이 프로세스에서
+        with ProcessPoolExecutor(max_workers=max(1, opts["workers"])) as pool:
+            for name, widths, width, error in pool.map(renditions.render_job, jobs, chunksize=8):
+                if error:
+                    failed += 1
+                    self.stderr.write(f"실패 {name}: {error}")
+                    continue
+                renditions.remember(name, widths, width)
+                done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: {done}장 ({time.monotonic() - t0:.1f}s, 워커 {opts['workers']}), "
+            f"실패 {failed}, 원본 없음 {missing}"
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from food.services import flow_state
+
+
+class Command(BaseCommand):
+    help = "만료된 흐름 상태(FlowState)와 끝난 장바구니의 흐름 상태를 삭제합니다. (cron으로 하루 1회 권장)"
+
+    def handle(self, *args, **options):
+        deleted = flow_state.cleanup()
+        self.stdout.write(self.style.SUCCESS(f"flow state 삭제: {deleted}건"))
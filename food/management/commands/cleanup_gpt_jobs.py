@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from food.services import job_queue
+
+
+class Command(BaseCommand):
+    help = "오래된 GPT 작업(GptJob) 행을 삭제합니다. (cron으로 하루 1회 권장)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=job_queue.JOB_RETENTION_DAYS,
+                            help="이 일수보다 오래된 작업 삭제")
+
+    def handle(self, *args, **options):
+        deleted = job_queue.prune_jobs(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"gpt job 삭제: {deleted}건"))
@@ -0,0 +1,61 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from food.models import LlmCall
+from food.services.llm_telemetry import flush
+
+
+def _pct(sorted_values, p: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+class Command(BaseCommand):
+    help = "GPT 호출 텔레메트리(LlmCall)를 작업별/일별로 집계합니다: p50/p95 지연, 토큰, 캐시 적중률."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--task", help="특정 작업만")
+        parser.add_argument("--by-day", action="store_true", help="작업별 + 일별로 나눠서")
+
+    def handle(self, *args, **opts):
+        flush()   # 이 프로세스 버퍼에 남은 것까지
+        since = timezone.now() - timedelta(days=opts["days"])
+        qs = LlmCall.objects.filter(created_at__gte=since)
+        if opts["task"]:
+            qs = qs.filter(task=opts["task"])
+
+        groups = defaultdict(lambda: {"lat": [], "calls": 0, "hits": 0, "pt": 0, "ct": 0, "retries": 0, "bad": 0})
+        rows = qs.values_list("task", "created_at", "latency_ms", "cache_hit",
+                              "prompt_tokens", "completion_tokens", "retries", "parse_ok")
+        for task, created_at, latency_ms, cache_hit, pt, ct, retries, parse_ok in rows.iterator():
+            day = timezone.localtime(created_at).date().isoformat() if opts["by_day"] else ""
+            g = groups[(task, day)]
+            if cache_hit:
+                g["hits"] += 1
+                continue
+            g["calls"] += 1
+            g["lat"].append(latency_ms)
+            g["pt"] += pt
+            g["ct"] += ct
+            g["retries"] += retries
+            g["bad"] += 0 if parse_ok else 1
+
+        if not groups:
+            self.stdout.write("기록 없음")
+            return
+
+        self.stdout.write(
+            f"{'task':<20}{'day':<12}{'calls':>7}{'hit%':>7}{'p50ms':>8}{'p95ms':>8}"
+            f"{'prompt tok':>12}{'compl tok':>11}{'retry':>7}{'parse fail':>12}"
+        )
+        for (task, day), g in sorted(groups.items()):
+            lat = sorted(g["lat"])
+            total = g["calls"] + g["hits"]
+            self.stdout.write(
+                f"{task:<20}{day:<12}{g['calls']:>7}{g['hits'] * 100 / total:>6.0f}%"
+                f"{_pct(lat, 0.5):>8}{_pct(lat, 0.95):>8}"
+                f"{g['pt']:>12}{g['ct']:>11}{g['retries']:>7}{g['bad']:>12}"
+            )
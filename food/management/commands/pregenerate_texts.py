@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from food.models import GeneratedText, Ingredient
+from food.services.text_store import TEXT_KINDS, store_text, text_key
+
+
+class Command(BaseCommand):
+    help = "재료별 구매 TIP / 요리 아이디어를 미리 생성해 저장소(GeneratedText)와 캐시를 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=["tip", "idea", "all"], default="all")
+        parser.add_argument("--top", type=int, default=0,
+                            help="장바구니에 많이 담긴 상위 N개 재료만 (0이면 전체 카탈로그)")
+        parser.add_argument("--workers", type=int, default=4, help="동시 GPT 호출 수")
+        parser.add_argument("--refresh-hours", type=int, default=None,
+                            help="다음 갱신까지 시간 (기본: PREGEN_REFRESH_HOURS)")
+        parser.add_argument("--force", action="store_true", help="갱신 시각과 무관하게 모두 재생성")
+        parser.add_argument("--dry-run", action="store_true", help="대상만 출력")
+
+    def handle(self, *args, **opts):
+        if opts["workers"] < 1:
+            raise CommandError("--workers는 1 이상이어야 합니다.")
+
+        kinds = list(TEXT_KINDS) if opts["kind"] == "all" else [opts["kind"]]
+        names = self._target_names(opts["top"])
+
+        jobs = []
+        for kind in kinds:
+            for name in self._due_names(kind, names, force=opts["force"]):
+                jobs.append((kind, name))
+
+        self.stdout.write(f"대상 재료 {len(names)}개, 생성할 항목 {len(jobs)}개")
+        if opts["dry_run"] or not jobs:
+            for kind, name in jobs:
+                self.stdout.write(f"  {kind}: {name}")
+            return
+
+        # GPT 호출만 병렬로, 저장은 메인 스레드에서 (SQLite 단일 writer)
+        ok, failed = 0, 0
+        with ThreadPoolExecutor(max_workers=opts["workers"]) as pool:
+            futures = {pool.submit(self._generate, kind, name): (kind, name) for kind, name in jobs}
+            for fut in as_completed(futures):
+                kind, name = futures[fut]
+                try:
+                    store_text(kind, name, fut.result(), refresh_hours=opts["refresh_hours"])
+                    ok += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"  실패 {kind}:{name} ({type(e).__name__}: {e})")
+
+        self.stdout.write(self.style.SUCCESS(f"완료: 성공 {ok}, 실패 {failed}"))
+
+    # ------------------------------------------------------------------
+    def _target_names(self, top: int) -> list[str]:
+        qs = Ingredient.objects.all()
+        if top:
+            qs = (
+                qs.annotate(cart_cnt=Count("shoppinglistingredient"))
+                .filter(cart_cnt__gt=0)
+                .order_by("-cart_cnt", "name")[:top]
+            )
+        return list(qs.values_list("name", flat=True))
+
+    def _due_names(self, kind: str, names: list[str], *, force: bool) -> list[str]:
+        """저장 안 됨 / 프롬프트 버전이 낮음 / refresh_at 지남 → 재생성 대상."""
+        if force:
+            return names
+        fresh = set(
+            GeneratedText.objects
+            .filter(kind=kind, version__gte=TEXT_KINDS[kind].version, refresh_at__gt=timezone.now())
+            .values_list("name", flat=True)
+        )
+        return [n for n in names if text_key(n) not in fresh]
+
+    def _generate(self, kind: str, name: str) -> str:
+        text = TEXT_KINDS[kind].generate(name)
+        if not text:
+            raise RuntimeError("빈 응답")
+        return text
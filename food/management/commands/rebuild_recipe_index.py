@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from food.services import recipe_search
+
+
+class Command(BaseCommand):
+    help = "요리법 보관함(SavedRecipe) 전문 검색 색인을 비우고 다시 만듭니다."
+
+    def handle(self, *args, **options):
+        if recipe_search.backend() == "basic":
+            self.stdout.write("전문 검색을 지원하지 않는 DB입니다 (icontains 검색 사용).")
+            return
+        count = recipe_search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"색인 완료 ({recipe_search.backend()}): {count}건"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from food.models import SearchTrend
+from food.services.trending import flush, popular_terms, prune, refresh_popular
+
+
+class Command(BaseCommand):
+    help = "동네별 인기 검색어(SearchTrend)를 보여주고, 오래된 집계를 정리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dong", action="append", help="특정 동만 (여러 번 지정 가능)")
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--prune-days", type=int, help="이 일수보다 오래된 창 삭제")
+
+    def handle(self, *args, **opts):
+        flush()   # 이 프로세스에 남은 증가분까지
+        if opts["prune_days"]:
+            self.stdout.write(f"삭제: {prune(opts['prune_days'])}행")
+
+        dongs = opts["dong"] or list(SearchTrend.objects.values_list("dong", flat=True).distinct().order_by("dong"))
+        for dong in dongs:
+            refresh_popular(dong, opts["limit"])
+            terms = popular_terms(dong, opts["limit"])
+            self.stdout.write(f"{dong or '(동 미설정)'}: {', '.join(terms) or '-'}")
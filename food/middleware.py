@@ -0,0 +1,100 @@
+"""
+- FlowStateMiddleware: request.flow 화면 흐름 상태 저장소 (food.services.flow_state).
+  처음 접근할 때 만들고, 응답 직전에 바뀐 필드만 저장한다.
+  저장이 실패하면 요청을 실패(500)로 돌린다 (성공 화면/리다이렉트만 보내고 상태를 잃지 않게).
+  로그인하지 않은 요청에는 붙이지 않고, 요청 중 로그아웃했으면 저장하지 않는다.
+- PrecompressedStaticMiddleware: collectstatic 결과(STATIC_ROOT)를 직접 서빙할 때
+  Accept-Encoding에 맞는 .br/.gz 미리 압축본을 고르고, 해시 파일명이면 1년 immutable 캐시.
+"""
+import mimetypes, os
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date
+from .services.flow_state import FlowStore
+from .services.static_storage import ENCODINGS
+
+
+class FlowStateMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        store = []
+
+        def _make():
+            store.append(FlowStore(request.user))
+            return store[0]
+
+        if request.user.is_authenticated:
+            request.flow = SimpleLazyObject(_make)
+        response = self.get_response(request)
+        if store and request.user.pk == store[0].user.pk:
+            store[0].save()   # 예외는 그대로 올려 보냄 → 500
+        return response
+
+
+STATIC_IMMUTABLE_MAX_AGE = getattr(settings, "STATIC_IMMUTABLE_MAX_AGE", 60 * 60 * 24 * 365)
+STATIC_MAX_AGE = getattr(settings, "STATIC_MAX_AGE", 60 * 60)   # 해시 없는 이름 (직접 링크된 파일)
+
+
+class PrecompressedStaticMiddleware:
+    """
+    STATIC_URL 아래 요청을 STATIC_ROOT에서 바로 응답 (없는 파일은 다음 단계로 넘김).
+    개발 서버(runserver)는 자체 정적 핸들러가 먼저 받으므로 이 미들웨어까지 오지 않는다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith("/") else "/" + settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT or "")
+        self._hashed = None
+
+    def hashed_names(self):
+        if self._hashed is None:
+            from django.contrib.staticfiles.storage import staticfiles_storage
+            self._hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        return self._hashed
+
+    def __call__(self, request):
+        if self.root and request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except Exception:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        accepted = {t.split(";")[0].strip() for t in request.headers.get("Accept-Encoding", "").split(",")}
+        encoding, file_path = None, path
+        for enc, suffix in ENCODINGS:
+            if enc in accepted and os.path.isfile(path + suffix):
+                encoding, file_path = enc, path + suffix
+                break
+
+        stat = os.stat(file_path)
+        etag = '"%x-%x%s"' % (int(stat.st_mtime), stat.st_size, f"-{encoding}" if encoding else "")
+        if name in self.hashed_names():
+            cache_control = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            cache_control = f"public, max-age={STATIC_MAX_AGE}"
+
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(path)
+            response = FileResponse(open(file_path, "rb"), content_type=content_type or "application/octet-stream")
+            if encoding:
+                response["Content-Encoding"] = encoding
+            response["Last-Modified"] = http_date(stat.st_mtime)
+        response["ETag"] = etag
+        response["Cache-Control"] = cache_control
+        response["Vary"] = "Accept-Encoding"
+        return response
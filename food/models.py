@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.db.models import Q
 from django.contrib.auth import get_user_model
@@ -57,3 +58,150 @@ class FoodBanner(models.Model):
 
     def __str__(self):
         return f"[{self.get_category_display()}] {self.title}"
+
+
+
+class GptJob(models.Model):
+    """
+    GPT 호출을 요청 밖(백그라운드 스레드)에서 처리하기 위한 작업 테이블.
+    뷰는 작업을 넣고 job id만 돌려주며, 결과는 폴링 API로 확인한다.
+    """
+    class Status(models.TextChoices):
+        QUEUED = "queued", "대기"
+        RUNNING = "running", "실행 중"
+        DONE = "done", "완료"
+        FAILED = "failed", "실패"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    task = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.task} [{self.status}] {self.id}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+
+class GeneratedText(models.Model):
+    """
+    재료별 GPT 생성 텍스트(구매 TIP / 요리 아이디어)의 영구 저장소.
+    오프라인 배치(pregenerate_texts)가 채우고, 캐시 미스 시 GPT 대신 먼저 조회한다.
+    도착 칭찬 문구 풀(praise)도 풀 하나당 한 행으로 둔다 (name = 풀 키, text = 문구 목록 JSON).
+    - version: 생성에 쓴 프롬프트 버전 (현재 버전보다 낮으면 재생성 대상)
+    - refresh_at: 이 시각 이후 배치에서 다시 생성
+    """
+    class Kind(models.TextChoices):
+        TIP = "tip", "구매 TIP"
+        IDEA = "idea", "요리 아이디어"
+        PRAISE = "praise", "도착 칭찬 문구 풀"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    name = models.CharField(max_length=100, help_text="재료명(소문자 정규화)")
+    text = models.TextField()
+    version = models.PositiveIntegerField(default=1)
+    generated_at = models.DateTimeField(auto_now=True)
+    refresh_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'name'], name='uniq_generatedtext_kind_name')
+        ]
+        indexes = [models.Index(fields=['kind', 'refresh_at'])]
+
+    def __str__(self):
+        return f"[{self.kind} v{self.version}] {self.name}"
+
+
+class LlmCall(models.Model):
+    """
+    GPT 호출 1건(또는 캐시 적중 1건)의 텔레메트리.
+    llm_telemetry가 메모리에 모았다가 bulk_create로 한꺼번에 저장한다.
+    """
+    task = models.CharField(max_length=40)
+    model = models.CharField(max_length=40, blank=True)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    cache_hit = models.BooleanField(default=False)
+    retries = models.PositiveSmallIntegerField(default=0)
+    parse_ok = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['task', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.task} {self.model or 'cache'} {self.latency_ms}ms"
+
+
+class SearchTrend(models.Model):
+    """
+    (동, 시간 창)별 검색어/담기 집계.
+    trending이 메모리의 heavy-hitter(top-k) 증가분만 주기적으로 더한다.
+    """
+    dong = models.CharField(max_length=40, blank=True, help_text="addr_level3, 없으면 빈 값")
+    window_start = models.DateTimeField()
+    term = models.CharField(max_length=30)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dong', 'window_start', 'term'], name='uniq_searchtrend_window_term')
+        ]
+        indexes = [models.Index(fields=['dong', 'window_start'])]
+
+    def __str__(self):
+        return f"[{self.dong or '-'} {self.window_start:%m-%d %H:%M}] {self.term} {self.count}"
+
+
+class FlowState(models.Model):
+    """
+    화면 흐름 상태 (세션에 통째로 넣던 큰 값들을 필드 단위로 분리).
+    - shopping_list가 있으면 그 장바구니 전용 상태(레시피 재료/선택 목록): 장보기가 끝나면 자연히 새 행
+    - shopping_list가 없으면 사용자 단위 상태(대화 기록 등)
+    대화 기록은 zlib 압축 JSON(BinaryField). flow_state가 바뀐 필드만 update_fields로 저장한다.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='flow_states')
+    shopping_list = models.ForeignKey('market.ShoppingList', on_delete=models.CASCADE,
+                                      null=True, blank=True, related_name='flow_states')
+
+    # 장바구니 단위
+    basic = models.JSONField(default=list, blank=True)
+    optional = models.JSONField(default=list, blank=True)
+    optional_selected = models.JSONField(default=list, blank=True)
+    extra_selected = models.JSONField(default=list, blank=True)
+    extra_selected_version = models.PositiveIntegerField(default=0)
+
+    # 사용자 단위
+    leftover_extra_selected = models.JSONField(default=list, blank=True)
+    leftover_extra_selected_version = models.PositiveIntegerField(default=0)
+    chat_history = models.BinaryField(default=b'', blank=True)
+    recipe_chat = models.BinaryField(default=b'', blank=True)
+    last_recipe_text = models.BinaryField(default=b'', blank=True)
+    idea_hist = models.BinaryField(default=b'', blank=True, help_text="{재료명: 대화}")
+
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'shopping_list'], name='uniq_flowstate_user_list'),
+            models.UniqueConstraint(fields=['user'], condition=Q(shopping_list__isnull=True),
+                                    name='uniq_flowstate_user_scope'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} / {self.shopping_list_id or '-'}"
@@ -0,0 +1,89 @@
+"""
+메인 배너 캐시 ((동, 카테고리)별).
+
+배너는 일주일에 몇 번 바뀌는데 메인 화면은 매번 열리므로:
+- 노출 중 배너 전체를 쿼리 1번으로 읽어 (동, 카테고리)로 묶은 스냅샷을 캐시에 둠
+- 화면별 결과(동 × 카테고리, 상위 limit개)도 캐시 → 메인 화면은 캐시 읽기만
+- FoodBanner 저장/삭제 시그널 → 세대(generation) 키 증가로 전부 무효화 (food/signals.py)
+- 템플릿 조각 캐시 키에도 세대를 넣어 배너가 바뀌면 조각도 새로 그림
+"""
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+BANNER_CACHE_TTL = getattr(settings, "BANNER_CACHE_TTL", 60 * 60 * 6)
+BANNER_GEN_KEY = "banners:gen"
+
+Group = Dict[Tuple[str, str], List[dict]]   # (동, 카테고리) → 배너(최신순)
+
+
+def generation() -> int:
+    gen = cache.get(BANNER_GEN_KEY)
+    if gen is None:
+        cache.add(BANNER_GEN_KEY, 1, None)
+        gen = cache.get(BANNER_GEN_KEY) or 1
+    return gen
+
+
+def invalidate_banners() -> None:
+    try:
+        cache.incr(BANNER_GEN_KEY)
+    except ValueError:
+        cache.set(BANNER_GEN_KEY, 2, None)
+
+
+def _dong_key(dong: str) -> str:
+    return hashlib.sha1(dong.encode("utf-8")).hexdigest()[:12]
+
+
+def fragment_key(user, tab: Optional[str]) -> str:
+    """템플릿 {% cache %} 조각 키에 넣을 값 (세대 + 동 + 탭)."""
+    dong = (getattr(user, "addr_level3", "") or "").strip()
+    return f"{generation()}:{_dong_key(dong)}:{tab or 'all'}"
+
+
+def _load_groups() -> Group:
+    from food.models import FoodBanner
+    groups: Group = defaultdict(list)
+    storage = FoodBanner._meta.get_field("image").storage
+    rows = (FoodBanner.objects.active().order_by("-created_at")
+            .values_list("title", "category", "dong", "link_url", "image", "created_at"))
+    for title, category, dong, link_url, image, created_at in rows:
+        groups[(dong or "", category)].append({
+            "title": title,
+            "link_url": link_url,
+            "image_url": storage.url(image) if image else None,
+            "created_at": created_at,
+        })
+    return dict(groups)
+
+
+def _groups(gen: int) -> Group:
+    key = f"banners:{gen}:groups"
+    groups = cache.get(key)
+    if groups is None:
+        groups = _load_groups()
+        cache.set(key, groups, BANNER_CACHE_TTL)
+    return groups
+
+
+def banners_for(user, tab: Optional[str], limit: int = 5) -> List[dict]:
+    """
+    사용자 동 + 전체 노출('') 배너 중 탭 카테고리(없으면 전체), 최신순 limit개.
+    [{"title", "link_url", "image_url", "created_at"}]
+    """
+    dong = (getattr(user, "addr_level3", "") or "").strip()
+    gen = generation()
+    key = f"banners:{gen}:{_dong_key(dong)}:{tab or 'all'}:{limit}"
+    banners = cache.get(key)
+    if banners is None:
+        groups = _groups(gen)
+        dongs = {"", dong}
+        picked = [b for (d, c), items in groups.items()
+                  if d in dongs and (not tab or c == tab) for b in items]
+        picked.sort(key=lambda b: b["created_at"], reverse=True)
+        banners = picked[:limit]
+        cache.set(key, banners, BANNER_CACHE_TTL)
+    return banners
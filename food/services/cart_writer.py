@@ -0,0 +1,109 @@
+"""
+장바구니(ShoppingListIngredient) 쓰기 공용 서비스.
+
+장바구니를 바꾸는 뷰는 모두 여기를 거친다.
+- 재료명은 카탈로그 스냅샷으로 한 번에 id로 바꾸고, 없는 이름은 만들지 않고 unknown으로 돌려줌
+- 현재 목록 1회 조회 → 삭제 1회 → bulk_create(ignore_conflicts=True) 1회
+  (동시에 같은 재료를 담아도 uniq_shoppinglist_ingredient 제약이 중복을 막음)
+- 바뀐 게 있으면 ShoppingList.version 증가 (장바구니 API의 낙관적 동시성)
+  + 헤더용 item_count를 같은 트랜잭션에서 갱신
+"""
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+from django.db import transaction
+from django.db.models import F
+from market.models import ShoppingList, ShoppingListIngredient
+from .catalog import get_catalog
+
+
+@dataclass
+class CartChange:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unknown: List[str] = field(default_factory=list)   # 카탈로그에 없어 무시한 이름
+    names: List[str] = field(default_factory=list)     # 변경 후 담긴 재료 (이름순)
+    version: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+class CartVersionConflict(Exception):
+    """expected_version이 현재 버전과 다름. current에 지금 상태가 들어 있다."""
+
+    def __init__(self, current: CartChange):
+        super().__init__(f"cart version is {current.version}")
+        self.current = current
+
+
+def apply(
+    shopping_list: ShoppingList,
+    *,
+    add: Iterable[str] = (),
+    remove: Iterable[str] = (),
+    remove_rows: Iterable[int] = (),
+    replace: Optional[Iterable[str]] = None,
+    expected_version: Optional[int] = None,
+) -> CartChange:
+    """
+    add/remove: 재료명, remove_rows: ShoppingListIngredient id,
+    replace: 이 목록만 남기고 나머지는 제거 (add/remove 대신).
+    같은 이름이 add와 remove에 다 있으면 add가 이김.
+    """
+    catalog = get_catalog()
+    names = list(replace) if replace is not None else list(add)
+    wanted = catalog.filter_names(names)
+    unknown = list(dict.fromkeys(n for n in names if catalog.resolve(n) is None))
+    wanted_ids = {catalog.id_for(n) for n in wanted}
+    remove_ids = {catalog.id_for(n) for n in catalog.filter_names(remove)} - wanted_ids
+
+    with transaction.atomic():
+        sl = ShoppingList.objects.select_for_update().only("id", "version").get(pk=shopping_list.pk)
+        rows = dict(ShoppingListIngredient.objects.filter(shopping_list_id=sl.pk).values_list("id", "ingredient_id"))
+        existing = set(rows.values())
+
+        if expected_version is not None and expected_version != sl.version:
+            current = sorted(n for n in map(catalog.name_for, existing) if n)
+            raise CartVersionConflict(CartChange(names=current, version=sl.version))
+
+        if replace is not None:
+            remove_ids = existing - wanted_ids
+        remove_ids |= {rows[r] for r in map(int, remove_rows) if r in rows}
+        remove_ids &= existing
+        add_ids = wanted_ids - existing
+
+        if remove_ids:
+            ShoppingListIngredient.objects.filter(shopping_list_id=sl.pk, ingredient_id__in=remove_ids).delete()
+        if add_ids:
+            ShoppingListIngredient.objects.bulk_create(
+                [ShoppingListIngredient(shopping_list_id=sl.pk, ingredient_id=i) for i in add_ids],
+                ignore_conflicts=True,
+            )
+        after = (existing - remove_ids) | add_ids
+        version = sl.version
+        if add_ids or remove_ids:
+            ShoppingList.objects.filter(pk=sl.pk).update(version=F("version") + 1, item_count=len(after))
+            version += 1
+    shopping_list.version = version
+    shopping_list.item_count = len(after)
+
+    return CartChange(
+        added=[n for n in wanted if catalog.id_for(n) in add_ids],
+        removed=sorted(n for n in map(catalog.name_for, remove_ids) if n),
+        unknown=unknown,
+        names=sorted(n for n in map(catalog.name_for, after) if n),
+        version=version,
+    )
+
+
+def add_names(shopping_list: ShoppingList, names: Iterable[str]) -> CartChange:
+    return apply(shopping_list, add=names)
+
+
+def remove_names(shopping_list: ShoppingList, names: Iterable[str]) -> CartChange:
+    return apply(shopping_list, remove=names)
+
+
+def replace_names(shopping_list: ShoppingList, names: Iterable[str]) -> CartChange:
+    return apply(shopping_list, replace=names)
@@ -0,0 +1,150 @@
+"""
+재료 카탈로그 스냅샷 (프로세스 로컬, 버전 관리).
+
+프롬프트 작성/GPT 출력 필터링마다 Ingredient 전체를 다시 읽지 않도록
+이름·id·정규화 키·이미지 URL을 한 번 읽어 메모리에 둔다.
+- Ingredient 저장/삭제 시그널 → 캐시의 버전 키 증가 + 이 프로세스 스냅샷 폐기
+- 다른 프로세스는 CATALOG_CHECK_SECONDS마다 버전 키를 확인해 바뀌었으면 다시 읽음
+- bulk_create/update처럼 시그널이 없는 일괄 변경 뒤에는 invalidate_catalog() 호출
+"""
+import re, threading, time, unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "ingredient_catalog:version"
+CATALOG_CHECK_SECONDS = getattr(settings, "CATALOG_CHECK_SECONDS", 2.0)
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_key(name: str) -> str:
+    """공백 제거 + NFC + casefold ('대 파' == '대파', 'Tofu' == 'tofu')."""
+    return _WS_RE.sub("", unicodedata.normalize("NFC", str(name or ""))).casefold()
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    ids: Tuple[int, ...]                     # 이름순
+    names: Tuple[str, ...]
+    image_urls: Tuple[Optional[str], ...]
+    _by_name: Dict[str, int] = field(repr=False)
+    _by_id: Dict[int, int] = field(repr=False)
+    _by_key: Dict[str, int] = field(repr=False)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    @property
+    def names_csv(self) -> str:
+        """GPT 프롬프트용 '이름, 이름, ...'"""
+        return ", ".join(self.names)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """표기가 조금 달라도(공백/대소문자) DB 원본명으로. 없으면 None."""
+        if name in self._by_name:
+            return name
+        i = self._by_key.get(normalize_key(name))
+        return self.names[i] if i is not None else None
+
+    def filter_names(self, names: Iterable[str]) -> List[str]:
+        """카탈로그에 있는 것만 원본명으로 (순서 유지, 중복 제거)."""
+        out, seen = [], set()
+        for n in names or []:
+            r = self.resolve(n)
+            if r is not None and r not in seen:
+                seen.add(r)
+                out.append(r)
+        return out
+
+    def id_for(self, name: str) -> Optional[int]:
+        i = self._by_name.get(name)
+        return self.ids[i] if i is not None else None
+
+    def ids_for(self, names: Iterable[str]) -> Dict[str, int]:
+        """{이름: id} (카탈로그에 없는 이름은 빠짐)."""
+        return {n: self.ids[self._by_name[n]] for n in names if n in self._by_name}
+
+    def name_for(self, ingredient_id: int) -> Optional[str]:
+        i = self._by_id.get(int(ingredient_id))
+        return self.names[i] if i is not None else None
+
+    def image_url(self, name: str) -> Optional[str]:
+        i = self._by_name.get(name)
+        return self.image_urls[i] if i is not None else None
+
+    def to_ctx(self, names: Iterable[str]) -> List[Dict[str, Optional[str]]]:
+        """템플릿용 [{"name", "image_url"}] (ingredients_qs_to_ctx와 같은 모양)."""
+        return [{"name": n, "image_url": self.image_url(n)} for n in names if n in self._by_name]
+
+
+def _build(version: int) -> CatalogSnapshot:
+    from food.models import Ingredient
+
+    storage = Ingredient._meta.get_field("image").storage
+    ids, names, urls = [], [], []
+    for pk, name, image in Ingredient.objects.order_by("name").values_list("id", "name", "image"):
+        ids.append(pk)
+        names.append(name)
+        urls.append(storage.url(image) if image else None)
+    by_key: Dict[str, int] = {}
+    for i, n in enumerate(names):
+        by_key.setdefault(normalize_key(n), i)
+    return CatalogSnapshot(
+        version=version,
+        ids=tuple(ids),
+        names=tuple(names),
+        image_urls=tuple(urls),
+        _by_name={n: i for i, n in enumerate(names)},
+        _by_id={pk: i for i, pk in enumerate(ids)},
+        _by_key=by_key,
+    )
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _current_version() -> int:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # 키가 사라졌으면(캐시 재시작 등) 예전 번호와 겹치지 않게 시각으로 시작
+        cache.add(CATALOG_VERSION_KEY, time.time_ns() // 1000, None)
+        version = cache.get(CATALOG_VERSION_KEY) or 0
+    return int(version)
+
+
+def get_catalog() -> CatalogSnapshot:
+    """현재 카탈로그 스냅샷. 버전이 바뀌었을 때만 DB를 다시 읽는다."""
+    global _snapshot, _checked_at
+    snap = _snapshot
+    now = time.monotonic()
+    if snap is not None and now - _checked_at < CATALOG_CHECK_SECONDS:
+        return snap
+
+    version = _current_version()
+    if snap is not None and snap.version == version:
+        _checked_at = now
+        return snap
+
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _build(version)
+        _checked_at = now
+        return _snapshot
+
+
+def invalidate_catalog() -> None:
+    """모든 프로세스의 스냅샷을 무효화 (버전 키 증가)."""
+    global _snapshot
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns() // 1000, None)
+    _snapshot = None
@@ -0,0 +1,149 @@
+"""
+토큰 예산 기반 대화 메모리.
+
+세션에는 화면용 전체 대화를 그대로 두고, GPT에 보낼 때만 예산에 맞춰 줄인다.
+- 앞쪽 system 메시지(가이드/재료 목록)는 항상 유지하되, 예산의 CHAT_PINNED_SHARE를 넘으면
+  긴 메시지부터 목록 구분자(", "/줄바꿈) 단위로 잘라 넣음
+- 최근 N턴은 원문 그대로
+- 그보다 오래된 턴은 한 줄씩 요약해 '이전 대화 요약' system 메시지 하나로 접음
+- 토큰 수는 로컬 추정치(estimate_tokens)로 계산 → 호출 전에 예산 강제
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from django.conf import settings
+
+CHAT_TOKEN_BUDGET = getattr(settings, "CHAT_TOKEN_BUDGET", 3000)
+CHAT_KEEP_TURNS = getattr(settings, "CHAT_KEEP_TURNS", 3)
+CHAT_PINNED_SHARE = getattr(settings, "CHAT_PINNED_SHARE", 0.5)
+
+_MESSAGE_OVERHEAD = 4   # role/구분자 등 메시지당 대략적인 추가 토큰
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]")
+_QUOTED_RE = re.compile(r'["“](.+?)["”]')
+
+Message = Dict[str, Any]
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    토크나이저 없이 쓰는 보수적 추정.
+    한글은 글자당 1토큰, 그 외(영문/숫자/공백/기호)는 4글자당 1토큰.
+    """
+    if not text:
+        return 0
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def message_tokens(messages: Sequence[Message]) -> int:
+    return sum(estimate_tokens(str(m.get("content") or "")) + _MESSAGE_OVERHEAD for m in messages)
+
+
+def _clip(text: str, n: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= n else text[:n] + "…"
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """text를 max_tokens 안으로. 목록 중간에서 끊기지 않게 마지막 ', '/줄바꿈에서 자름."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    sep = max(cut.rfind(", "), cut.rfind("\n"))
+    if sep > lo // 2:
+        cut = cut[:sep]
+    return cut + "…" if cut else ""
+
+
+def shrink_pinned(pinned: Sequence[Message], limit: int) -> List[Message]:
+    """고정 system 메시지들을 limit 토큰 안으로 (긴 메시지부터 자름)."""
+    out = [dict(m) for m in pinned]
+    for m in sorted(out, key=lambda m: estimate_tokens(str(m.get("content") or "")), reverse=True):
+        over = message_tokens(out) - limit
+        if over <= 0:
+            break
+        content = str(m.get("content") or "")
+        m["content"] = clip_to_tokens(content, max(0, estimate_tokens(content) - over))
+    return [m for m in out if m.get("content")]
+
+
+def summarize_turns(turns: Sequence[Sequence[Message]]) -> List[str]:
+    """
+    오래된 턴을 한 줄씩 요약(로컬, GPT 호출 없음).
+    답변에 큰따옴표로 감싼 요리명이 있으면 그걸 우선 남긴다.
+    """
+    lines: List[str] = []
+    for turn in turns:
+        asked = next((m.get("content") for m in turn if m.get("role") == "user"), "")
+        answer = next((m.get("content") for m in turn if m.get("role") == "assistant"), "")
+        m = _QUOTED_RE.search(answer or "")
+        said = f'"{m.group(1).strip()}" 추천' if m else _clip(answer, 40)
+        if asked:
+            lines.append(f"- 사용자: {_clip(asked, 40)} → {said}")
+        elif said:
+            lines.append(f"- 도우미: {said}")
+    return lines
+
+
+def _split_turns(messages: Sequence[Message]) -> List[List[Message]]:
+    """user 메시지마다 새 턴 시작 (user → assistant 묶음)."""
+    turns: List[List[Message]] = []
+    for m in messages:
+        if m.get("role") == "user" or not turns:
+            turns.append([m])
+        else:
+            turns[-1].append(m)
+    return turns
+
+
+def budget_messages(
+    messages: Sequence[Message],
+    *,
+    budget: Optional[int] = None,
+    keep_turns: Optional[int] = None,
+    summarize: Callable[[Sequence[Sequence[Message]]], List[str]] = summarize_turns,
+) -> List[Message]:
+    """
+    GPT에 보낼 메시지 목록을 토큰 예산 안으로 줄여 반환 (원본은 수정하지 않음).
+    고정 system 메시지도 예산에 포함 (budget × CHAT_PINNED_SHARE까지).
+    마지막 턴(현재 질문)은 예산을 넘어도 항상 포함.
+    """
+    budget = CHAT_TOKEN_BUDGET if budget is None else budget
+    keep_turns = CHAT_KEEP_TURNS if keep_turns is None else keep_turns
+
+    msgs = [{"role": m.get("role"), "content": m.get("content")} for m in messages if isinstance(m, dict)]
+    i = 0
+    while i < len(msgs) and msgs[i].get("role") == "system":
+        i += 1
+    pinned, turns = msgs[:i], _split_turns(msgs[i:])
+    pinned_limit = int(budget * CHAT_PINNED_SHARE)
+    if message_tokens(pinned) > pinned_limit:
+        pinned = shrink_pinned(pinned, pinned_limit)
+
+    older = turns[:-keep_turns] if keep_turns > 0 else turns[:]
+    recent = turns[len(older):]
+
+    def flat(ts):
+        return [m for t in ts for m in t]
+
+    # 최근 턴만으로도 넘치면 오래된 쪽부터 요약으로 넘김
+    while len(recent) > 1 and message_tokens(pinned + flat(recent)) > budget:
+        older.append(recent.pop(0))
+
+    summary_msgs: List[Message] = []
+    lines = summarize(older) if older else []
+    if lines:
+        room = budget - message_tokens(pinned + flat(recent)) - _MESSAGE_OVERHEAD
+        # 예산이 모자라면 오래된 요약 줄부터 버림
+        while lines and estimate_tokens("이전 대화 요약:\n" + "\n".join(lines)) > room:
+            lines.pop(0)
+        if lines:
+            summary_msgs = [{"role": "system", "content": "이전 대화 요약:\n" + "\n".join(lines)}]
+
+    return pinned + summary_msgs + flat(recent)
@@ -0,0 +1,227 @@
+"""
+테스트/부하 측정용 가짜 LLM 백엔드 (OpenAI 클라이언트와 같은 모양).
+
+settings.LLM_BACKEND = "fake" 이면 llm_backend.get_llm_client()가 이 클라이언트를 돌려준다.
+- 응답: 프롬프트를 보고 작업을 추정해 실제 파서가 그대로 도는 형식으로 생성
+  (레시피 텍스트, basic/optional JSON, TIP 배치 JSON, 칭찬 2줄, 큰따옴표 요리명 등)
+  같은 프롬프트 → 같은 응답 (해시 기반 시드)
+- 지연: fixed / uniform / lognormal 분포, 모델별 배율
+- 스트리밍: stream=True면 delta 청크를 순서대로 흘려보냄
+- 장애 주입: timeout / connection 예외, malformed(형식 깨진 응답)
+
+설정 예:
+FAKE_LLM = {
+    "seed": 42,
+    "latency": {"dist": "lognormal", "median": 0.8, "sigma": 0.4},
+    "model_latency": {"gpt-4o-mini": 0.5},
+    "failure_rate": 0.05,
+    "failure_kinds": ["timeout", "connection", "malformed"],
+    "responses": {"praise": "걷기 최고 장보기\n오늘도 알찬 한 끼"},
+}
+"""
+import hashlib, json, random, re, threading, time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+import httpx
+import openai
+from .chat_memory import estimate_tokens
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "seed": 0,
+    "latency": {"dist": "fixed", "value": 0.0},
+    "model_latency": {},
+    "failure_rate": 0.0,
+    "failure_kinds": ["timeout"],
+    "stream_chunk_chars": 8,
+    "responses": {},
+}
+
+_DISHES = ["볶음밥", "조림", "찌개", "전", "무침", "볶음", "덮밥", "국"]
+_FAKE_URL = "https://fake-llm.local/v1/chat/completions"
+
+
+def _seed(*parts: str) -> int:
+    return int(hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _split_names(raw: str) -> List[str]:
+    return [n.strip() for n in re.split(r"[,\n]", raw or "") if n.strip()]
+
+
+# ---- 작업 추정 + 정형 응답 -------------------------------------------------
+
+def detect_task(messages: List[Dict[str, Any]], response_format: Optional[dict] = None) -> str:
+    """model_router의 작업 이름과 같은 이름으로 추정."""
+    text = "\n".join(str(m.get("content") or "") for m in messages)
+    if '"tips"' in text:
+        return "tip_batch"
+    if '"basic"' in text and '"optional"' in text:
+        return "recipe_ingredients_v2" if "JSON으로 반환하는 도우미" in text else "recipe_ingredients"
+    if "큰따옴표" in text:
+        return "chat_cook"
+    if "필요한 재료:" in text and "조리 방법" in text:
+        return "leftover_recipe"
+    if "두 줄" in text or "칭찬" in text:
+        return "praise"
+    if "대화 모드" in text:
+        return "idea_followup"
+    if "초기 제안 모드" in text:
+        return "idea"
+    if "구매 팁" in text or "구매 TIP" in text or "사용자 질문:" in text:
+        return "tip"
+    return "chat_cook"
+
+
+def _after(label: str, text: str) -> str:
+    m = re.search(re.escape(label) + r"\s*(.+)", text)
+    return m.group(1).strip() if m else ""
+
+
+def canned_response(task: str, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+    text = "\n".join(str(m.get("content") or "") for m in messages)
+    last = str(messages[-1].get("content") or "") if messages else ""
+
+    if task == "tip_batch":
+        names = _split_names(_after("재료 목록:", text).split("\n")[0])
+        return json.dumps({"tips": [
+            {"name": n, "tip": f"{n} 구매 TIP💡\n• 색 - 선명한 것\n• 크기 - 고른 것\n• 보관법 - 냉장 보관"}
+            for n in names
+        ]}, ensure_ascii=False)
+
+    if task in ("recipe_ingredients", "recipe_ingredients_v2"):
+        allowed = _split_names(_after("(이 중에서만 선택):", text)) or _split_names(_after("우리 재료 DB:\\n", text).split("다른 설명")[0])
+        picks = rng.sample(allowed, min(len(allowed), 4)) if allowed else ["두부", "대파"]
+        return json.dumps({"basic": picks[:2], "optional": picks[2:]}, ensure_ascii=False)
+
+    if task == "leftover_recipe":
+        names = _split_names(_after("요리법을 추천해줘:", text).split(".\n")[0].rstrip("."))
+        names = names or ["재료"]
+        steps = "\n".join(f"{i}) {s}" for i, s in enumerate(["재료를 손질해요.", "팬에 볶아요.", "간을 맞춰 완성해요."], 1))
+        return (
+            f"{names[0]}{rng.choice(_DISHES)}\n"
+            "필요한 재료:\n" + "\n".join(f"- {n}" for n in names) + "\n"
+            f"조리 방법:\n{steps}"
+        )
+
+    if task == "praise":
+        place = _after("장소:", text) or "우리 동네"
+        return f"{place[:8]} 걷기 챔피언님\n오늘 장보기 최고예요"
+
+    if task in ("idea", "idea_followup"):
+        ingredient = _after("재료:", last).split("\n")[0] or "재료"
+        if task == "idea_followup":
+            return f"{ingredient}라면 충분히 가능해요. 부담 없이 시도해 보세요."
+        a, b = rng.sample(_DISHES, 2)
+        return (
+            f"1. {ingredient}{a}\n• {ingredient}를 먼저 손질해 넣어요\n• 든든한 한 끼예요\n\n"
+            f"2. {ingredient}{b}\n• {ingredient}를 마지막에 넣어요\n• 가볍게 즐기기 좋아요"
+        )
+
+    if task == "tip":
+        name = _after("재료:", text).split("\n")[0] or last.split(" 구매")[0].strip()
+        if "사용자 질문:" in text:
+            return f"{name}는 신선할 때 바로 드시는 게 가장 좋아요."
+        return f"{name} 구매 TIP💡\n• 색 - 선명한 것\n• 향 - 신선한 향\n• 보관법 - 냉장 보관"
+
+    # chat_cook: recipe_ai가 큰따옴표 안의 요리명을 추출
+    return f'오늘은 간단하게 "{rng.choice(["김치", "두부", "계란"])}{rng.choice(_DISHES)}" 어떠세요?'
+
+
+# ---- OpenAI 클라이언트 모양 흉내 ------------------------------------------
+
+class _Completions:
+    def __init__(self, owner: "FakeLLMClient"):
+        self._owner = owner
+
+    def create(self, *, model: str, messages: List[Dict[str, Any]], stream: bool = False,
+               response_format: Optional[dict] = None, **_: Any):
+        return self._owner.complete(model=model, messages=messages, stream=stream, response_format=response_format)
+
+
+class FakeLLMClient:
+    """client.chat.completions.create(...)만 흉내 내는 결정적 가짜 클라이언트."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self._rng = random.Random(self.config["seed"])
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.injected_latency = 0.0   # 누적 가짜 지연(초): 벤치마크에서 우리 쪽 오버헤드 분리용
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def _sample_latency(self, model: str) -> float:
+        spec = self.config["latency"]
+        with self._lock:
+            dist = spec.get("dist", "fixed")
+            if dist == "uniform":
+                value = self._rng.uniform(spec.get("low", 0.0), spec.get("high", 0.0))
+            elif dist == "lognormal":
+                value = spec.get("median", 0.0) * self._rng.lognormvariate(0.0, spec.get("sigma", 0.0))
+            else:
+                value = spec.get("value", 0.0)
+        return max(0.0, value * self.config["model_latency"].get(model, 1.0))
+
+    def _pick_failure(self) -> Optional[str]:
+        with self._lock:
+            if self._rng.random() >= self.config["failure_rate"]:
+                return None
+            return self._rng.choice(self.config["failure_kinds"])
+
+    def complete(self, *, model: str, messages, stream: bool = False, response_format=None):
+        with self._lock:
+            self.calls += 1
+        latency = self._sample_latency(model)
+        failure = self._pick_failure()
+
+        request = httpx.Request("POST", _FAKE_URL)
+        if failure == "timeout":
+            self._sleep(latency)
+            raise openai.APITimeoutError(request=request)
+        if failure == "connection":
+            raise openai.APIConnectionError(request=request)
+
+        task = detect_task(messages, response_format)
+        prompt = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+        rng = random.Random(_seed(str(self.config["seed"]), model, prompt))
+        content = self.config["responses"].get(task) or canned_response(task, messages, rng)
+        if failure == "malformed":
+            content = content[: max(1, len(content) // 3)].replace("{", "").replace("\n", " ")
+
+        usage = SimpleNamespace(
+            prompt_tokens=sum(estimate_tokens(str(m.get("content") or "")) for m in messages),
+            completion_tokens=estimate_tokens(content),
+        )
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+
+        if stream:
+            return self._stream(model, content, latency)
+        self._sleep(latency)
+        return SimpleNamespace(
+            id=f"fake-{self.calls}",
+            model=model,
+            usage=usage,
+            choices=[SimpleNamespace(index=0, finish_reason="stop",
+                                     message=SimpleNamespace(role="assistant", content=content))],
+        )
+
+    def _stream(self, model: str, content: str, latency: float) -> Iterator[SimpleNamespace]:
+        size = max(1, int(self.config["stream_chunk_chars"]))
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        # 첫 토큰까지 지연의 절반, 나머지는 청크마다 나눠서
+        first, rest = latency / 2, (latency / 2) / len(pieces)
+        self._sleep(first)
+        for i, piece in enumerate(pieces):
+            if i:
+                self._sleep(rest)
+            last = i == len(pieces) - 1
+            yield SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, finish_reason="stop" if last else None,
+                                         delta=SimpleNamespace(content=piece))],
+            )
+
+    def _sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.injected_latency += seconds
+        if seconds:
+            time.sleep(seconds)
@@ -0,0 +1,214 @@
+"""
+화면 흐름 상태 저장소 (request.flow).
+
+세션 한 덩어리에 넣던 큰 값(레시피 재료 목록, 선택 목록, GPT 대화 기록)을
+FlowState 테이블의 필드로 나눠 담는다.
+- 장바구니 단위 필드는 (사용자, 진행 중 장바구니) 행, 나머지는 (사용자, 장바구니 없음) 행
+  → 장보기가 끝나고 새 장바구니가 생기면 선택 목록이 따로 지우지 않아도 비어 있음
+- 필드는 처음 읽을 때 해당 행만 1회 조회, 저장은 응답 직전에 바뀐 필드만 update_fields로
+  (세션처럼 매 요청 전체를 다시 쓰지 않고, 동시 요청끼리 다른 필드를 덮어쓰지 않음)
+- 대화 기록은 JSON → zlib 압축 (FLOW_STATE_COMPRESS_MIN 바이트 미만은 압축 생략)
+- 마지막 저장 후 FLOW_STATE_TTL이 지나면 만료 (읽을 때 무시, cleanup_flow_state가 삭제)
+- 로그아웃하면 사용자 단위 행(대화 기록 등)을 지움 (food/signals.py)
+
+뷰에서는 세션처럼 쓴다: request.flow.get('basic', []), request.flow['chat_history'] = chat
+"""
+import json, zlib
+from datetime import timedelta
+from typing import Any, Dict, Iterator, Optional, Set
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from food.models import FlowState
+
+FLOW_STATE_TTL = getattr(settings, "FLOW_STATE_TTL", 60 * 60 * 24 * 14)
+FLOW_STATE_COMPRESS_MIN = getattr(settings, "FLOW_STATE_COMPRESS_MIN", 256)
+
+CART, USER = "cart", "user"
+
+# 필드명 → (범위, 종류). 종류: list/int는 DB 필드 그대로, blob은 압축 JSON
+FIELDS: Dict[str, tuple] = {
+    "basic": (CART, "list"),
+    "optional": (CART, "list"),
+    "optional_selected": (CART, "list"),
+    "extra_selected": (CART, "list"),
+    "extra_selected_version": (CART, "int"),
+    "leftover_extra_selected": (USER, "list"),
+    "leftover_extra_selected_version": (USER, "int"),
+    "chat_history": (USER, "blob"),
+    "recipe_chat": (USER, "blob"),
+    "last_recipe_text": (USER, "blob"),
+    "idea_hist": (USER, "blob"),
+}
+
+_RAW, _ZLIB = b"j", b"z"   # blob 앞 1바이트: 압축 여부
+
+
+def pack(value: Any) -> bytes:
+    """값 → 저장용 bytes. None은 빈 bytes."""
+    if value is None:
+        return b""
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(raw) < FLOW_STATE_COMPRESS_MIN:
+        return _RAW + raw
+    return _ZLIB + zlib.compress(raw, 6)
+
+
+def unpack(data) -> Any:
+    data = bytes(data or b"")
+    if not data:
+        return None
+    body = data[1:]
+    if data[:1] == _ZLIB:
+        body = zlib.decompress(body)
+    return json.loads(body.decode("utf-8"))
+
+
+def _empty(kind: str) -> Any:
+    return [] if kind == "list" else 0 if kind == "int" else None
+
+
+class FlowStore:
+    """
+    dict처럼 쓰는 흐름 상태. 알 수 없는 키는 KeyError (세션 키와 섞이지 않게).
+    목록 필드는 값이 없으면 [], 숫자 필드는 0, 대화 필드는 None(= 키 없음).
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._rows: Dict[str, Optional[FlowState]] = {}   # 범위 → 행(없으면 None)
+        self._list_id: Optional[int] = None
+        self._values: Dict[str, Any] = {}
+        self._snapshot: Dict[str, bytes] = {}   # 읽은 시점 직렬화 값 (제자리 변경 감지용)
+        self._dirty: Set[str] = set()
+
+    # ---- 로드 ----------------------------------------------------------------
+    def _active_list_id(self, create: bool = False) -> Optional[int]:
+        if self._list_id is None:
+            from market.models import ShoppingList
+            self._list_id = (ShoppingList.objects.filter(user=self.user, is_done=False)
+                             .values_list("id", flat=True).first())
+            if self._list_id is None and create:
+                self._list_id = ShoppingList.objects.create(user=self.user).id
+        return self._list_id
+
+    def _row(self, scope: str) -> Optional[FlowState]:
+        if scope in self._rows:
+            return self._rows[scope]
+        row = None
+        list_id = self._active_list_id() if scope == CART else None
+        if scope == USER or list_id:
+            row = FlowState.objects.filter(user=self.user, shopping_list_id=list_id).first()
+            if row is not None and row.expires_at <= timezone.now():
+                row.delete()
+                row = None
+        self._rows[scope] = row
+        return row
+
+    def _load(self, key: str) -> Any:
+        if key not in FIELDS:
+            raise KeyError(key)
+        if key not in self._values:
+            scope, kind = FIELDS[key]
+            row = self._row(scope)
+            raw = getattr(row, key) if row is not None else None
+            value = unpack(raw) if kind == "blob" else (raw if raw is not None else _empty(kind))
+            self._values[key] = value
+            self._snapshot[key] = pack(value)
+        return self._values[key]
+
+    # ---- dict 인터페이스 ------------------------------------------------------
+    def __getitem__(self, key: str) -> Any:
+        value = self._load(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._load(key)
+        return default if value is None else value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._load(key)
+        self._values[key] = value
+        self._dirty.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self._load(key) is not None
+
+    def setdefault(self, key: str, default: Any) -> Any:
+        if key not in self:
+            self[key] = default
+        return self._values[key]
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self._load(key)
+        empty = _empty(FIELDS[key][1])
+        if value != empty:
+            self._values[key] = empty
+            self._dirty.add(key)
+        return default if value is None else value
+
+    def keys(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    # ---- 저장 ----------------------------------------------------------------
+    def dirty_fields(self) -> Set[str]:
+        """명시적으로 바꾼 필드 + 꺼내서 제자리 변경(append 등)한 필드."""
+        changed = set(self._dirty)
+        for key, value in self._values.items():
+            if key not in changed and pack(value) != self._snapshot[key]:
+                changed.add(key)
+        return changed
+
+    def _db_value(self, key: str) -> Any:
+        value = self._values[key]
+        kind = FIELDS[key][1]
+        if kind == "blob":
+            return pack(value)
+        return value if value is not None else _empty(kind)
+
+    def save(self) -> Set[str]:
+        """바뀐 필드만 저장. 저장한 필드명을 반환."""
+        changed = self.dirty_fields()
+        if not changed:
+            return changed
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=FLOW_STATE_TTL)
+        for scope in (CART, USER):
+            fields = sorted(k for k in changed if FIELDS[k][0] == scope)
+            if not fields:
+                continue
+            values = {k: self._db_value(k) for k in fields}
+            row = self._rows.get(scope)
+            if row is not None:
+                FlowState.objects.filter(pk=row.pk).update(updated_at=now, expires_at=expires_at, **values)
+                continue
+            list_id = self._active_list_id(create=True) if scope == CART else None
+            try:
+                with transaction.atomic():
+                    row, _ = FlowState.objects.update_or_create(
+                        user=self.user, shopping_list_id=list_id,
+                        defaults={"expires_at": expires_at, **values},
+                    )
+            except IntegrityError:
+                # 동시 요청이 먼저 행을 만든 경우: 내 필드만 덮어씀
+                FlowState.objects.filter(user=self.user, shopping_list_id=list_id).update(
+                    updated_at=now, expires_at=expires_at, **values)
+            self._rows[scope] = row
+        for key in changed:
+            self._snapshot[key] = pack(self._values[key])
+        self._dirty.clear()
+        return changed
+
+
+def clear_user_flow(user) -> int:
+    """사용자 단위 행(장바구니 없음) 삭제. 장바구니 단위 행은 장바구니와 함께 정리된다."""
+    return FlowState.objects.filter(user=user, shopping_list__isnull=True).delete()[0]
+
+
+def cleanup(now=None) -> int:
+    """만료된 행 + 끝난 장바구니의 행 삭제. 삭제한 행 수를 반환."""
+    from django.db.models import Q
+    now = now or timezone.now()
+    return FlowState.objects.filter(Q(expires_at__lte=now) | Q(shopping_list__is_done=True)).delete()[0]
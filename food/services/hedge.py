@@ -0,0 +1,60 @@
+"""
+마감 시간(SLO)을 둔 GPT 호출.
+
+GPT 호출은 별도 스레드에서 돌리고, 엔드포인트별 마감 시간 안에 끝나지 않으면
+즉시 로컬 대체 결과를 돌려준다. 늦게 도착한 GPT 결과는 on_late 콜백으로 넘겨
+(보통 캐시에 저장) 다음 요청에서 쓰게 한다.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 엔드포인트별 마감 시간(초). settings.GPT_DEADLINES로 덮어쓰기 가능
+GPT_DEADLINES = {
+    "leftover_recipe": 8.0,
+    **getattr(settings, "GPT_DEADLINES", {}),
+}
+GPT_DEADLINE_DEFAULT = getattr(settings, "GPT_DEADLINE_DEFAULT", 10.0)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "GPT_HEDGE_WORKERS", 8), thread_name_prefix="gpt-hedge"
+)
+
+
+def deadline_for(endpoint: str) -> float:
+    return float(GPT_DEADLINES.get(endpoint, GPT_DEADLINE_DEFAULT))
+
+
+def hedged_call(
+    call: Callable[[], Any],
+    *,
+    deadline: float,
+    fallback: Callable[[], Any],
+    on_late: Optional[Callable[[Any], None]] = None,
+) -> Any:
+    """
+    call()을 deadline초까지만 기다린다.
+    - 제시간에 성공: 그 결과
+    - 실패(예외) 또는 시간 초과: fallback()
+    - 시간 초과 후 늦게 성공하면 on_late(result) 호출
+    """
+    future = _executor.submit(call)
+    try:
+        return future.result(timeout=deadline)
+    except FutureTimeout:
+        if on_late is not None:
+            def _late(f):
+                if f.cancelled() or f.exception() is not None:
+                    return
+                try:
+                    on_late(f.result())
+                except Exception:
+                    logger.exception("hedged call: late result handler failed")
+            future.add_done_callback(_late)
+        return fallback()
+    except Exception:
+        logger.warning("hedged call failed, using fallback", exc_info=True)
+        return fallback()
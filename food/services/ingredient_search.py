@@ -0,0 +1,188 @@
+"""
+재료 검색 인덱스 (한글 자모 인식, 메모리).
+
+카탈로그 스냅샷에서 만들고, 카탈로그 버전이 바뀌면 다시 만든다.
+- 자모 접두 트라이: '양ㅍ', '양파' 입력 중에도 바로 매칭 (겹받침/겹모음은 낱자로 풀어서)
+- 초성 인덱스: 'ㅇㅍ' → 양파
+- 자모 3-gram 역색인 + 편집 거리: '양퍄' → 양파 (오타 허용)
+- 그 외 부분 일치(기존 icontains와 같은 동작)
+순위: 완전 일치 < 접두 < 초성 접두 < 부분 일치 < 초성 부분 < 오타 허용(거리순), 같은 등급은 짧은 이름 먼저.
+"""
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from django.conf import settings
+from .catalog import get_catalog, normalize_key
+
+SEARCH_LIMIT = getattr(settings, "INGREDIENT_SEARCH_LIMIT", 50)
+
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+        "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 입력 중간 상태와 맞추기 위해 겹자모는 낱자로
+_SPLIT = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+_CHO_SET = set(CHO)
+_S_BASE, _S_END = 0xAC00, 0xD7A3
+
+
+def to_jamo(text: str) -> str:
+    """'닭갈비' → 'ㄷㅏㄹㄱㄱㅏㄹㅂㅣ' (정규화 키 기준, 한글 외 문자는 그대로)."""
+    out = []
+    for ch in normalize_key(text):
+        code = ord(ch)
+        if _S_BASE <= code <= _S_END:
+            s = code - _S_BASE
+            parts = (CHO[s // 588], JUNG[(s % 588) // 28], JONG[s % 28])
+        else:
+            parts = (ch,)
+        for p in parts:
+            out.append(_SPLIT.get(p, p))
+    return "".join(out)
+
+
+def to_choseong(text: str) -> str:
+    """'양파' → 'ㅇㅍ' (한글 외 문자는 그대로)."""
+    out = []
+    for ch in normalize_key(text):
+        code = ord(ch)
+        out.append(CHO[(code - _S_BASE) // 588] if _S_BASE <= code <= _S_END else ch)
+    return "".join(out)
+
+
+def _ngrams(jamo: str, n: int = 3) -> Set[str]:
+    padded = f"^{jamo}$"
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein (limit 초과가 확실하면 limit+1로 조기 종료)."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def _max_typos(jamo_len: int) -> int:
+    return 1 if jamo_len <= 5 else 2 if jamo_len <= 10 else 3
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ids: List[int] = []   # 여기서 끝나는 이름들
+
+
+class SearchIndex:
+    def __init__(self, names: Tuple[str, ...], version: int):
+        self.version = version
+        self.names = names
+        self.keys = [normalize_key(n) for n in names]
+        self.jamo = [to_jamo(n) for n in names]
+        self.choseong = [to_choseong(n) for n in names]
+
+        self.root = _TrieNode()
+        for i, j in enumerate(self.jamo):
+            node = self.root
+            for ch in j:
+                node = node.children.setdefault(ch, _TrieNode())
+            node.ids.append(i)
+
+        self.grams: Dict[str, List[int]] = {}
+        for i, j in enumerate(self.jamo):
+            for g in _ngrams(j):
+                self.grams.setdefault(g, []).append(i)
+
+    def _prefix_ids(self, jamo: str) -> List[int]:
+        node = self.root
+        for ch in jamo:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        out, stack = [], [node]
+        while stack:
+            n = stack.pop()
+            out.extend(n.ids)
+            stack.extend(n.children.values())
+        return out
+
+    def search(self, query: str, *, exclude: Iterable[str] = (), limit: Optional[int] = None) -> List[str]:
+        q = normalize_key(query)
+        if not q:
+            return []
+        limit = SEARCH_LIMIT if limit is None else limit
+        excluded = set(exclude or ())
+        qj = to_jamo(q)
+        ranked: Dict[int, Tuple[int, int]] = {}   # idx → (등급, 거리)
+
+        def hit(i: int, grade: int, dist: int = 0):
+            if i not in ranked or (grade, dist) < ranked[i]:
+                ranked[i] = (grade, dist)
+
+        for i in self._prefix_ids(qj):
+            hit(i, 0 if self.jamo[i] == qj else 1)
+
+        cho_only = all(ch in _CHO_SET for ch in q)
+        for i, key in enumerate(self.keys):
+            if q in key:
+                hit(i, 3)
+            if cho_only:
+                cs = self.choseong[i]
+                if cs.startswith(q):
+                    hit(i, 2)
+                elif q in cs:
+                    hit(i, 4)
+
+        # 오타 허용: 3-gram이 겹치는 후보만 편집 거리 계산 (전체 이름/같은 길이 접두 중 작은 쪽)
+        if not cho_only and len(qj) >= 2:
+            max_d = _max_typos(len(qj))
+            shared = Counter(i for g in _ngrams(qj) for i in self.grams.get(g, ()))
+            for i, _ in shared.most_common(200):
+                if i in ranked:
+                    continue
+                j = self.jamo[i]
+                d = min(_edit_distance(qj, j, max_d), _edit_distance(qj, j[:len(qj)], max_d))
+                if d <= max_d:
+                    hit(i, 5, d)
+
+        order = sorted(
+            (i for i in ranked if self.names[i] not in excluded),
+            key=lambda i: (ranked[i], len(self.names[i]), self.names[i]),
+        )
+        return [self.names[i] for i in order[:limit]]
+
+
+_index: Optional[SearchIndex] = None
+_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    global _index
+    catalog = get_catalog()
+    idx = _index
+    if idx is not None and idx.version == catalog.version:
+        return idx
+    with _lock:
+        if _index is None or _index.version != catalog.version:
+            _index = SearchIndex(catalog.names, catalog.version)
+        return _index
+
+
+def search_ingredients(query: str, *, exclude: Iterable[str] = (), limit: Optional[int] = None) -> List[str]:
+    """순위대로 정렬된 재료명 목록."""
+    return get_search_index().search(query, exclude=exclude, limit=limit)
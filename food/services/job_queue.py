@@ -0,0 +1,203 @@
+"""
+GPT 백그라운드 작업 큐 (프로세스 내 스레드 풀 + DB 작업 테이블).
+
+- 뷰는 enqueue()로 작업을 넣고 즉시 job id를 돌려준다.
+- 워커 스레드가 등록된 task 함수를 실행하고 결과를 GptJob에 기록한다.
+- 대기 + 실행 중 작업 수가 GPT_JOB_MAX_PENDING을 넘으면 QueueFull (백프레셔).
+- 끝난 작업 행은 cleanup_gpt_jobs 명령으로 GPT_JOB_RETENTION_DAYS 지난 것부터 삭제.
+"""
+import logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+from food.models import GptJob
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = getattr(settings, "GPT_JOB_WORKERS", 4)
+JOB_MAX_PENDING = getattr(settings, "GPT_JOB_MAX_PENDING", 32)
+JOB_STALE_SECONDS = getattr(settings, "GPT_JOB_STALE_SECONDS", 180)
+JOB_RETENTION_DAYS = getattr(settings, "GPT_JOB_RETENTION_DAYS", 7)
+
+
+class QueueFull(Exception):
+    """대기열이 가득 차 작업을 받을 수 없음. 뷰에서는 '잠시 후 재시도'로 안내."""
+
+
+_TASKS: Dict[str, Callable[..., Any]] = {}
+_slots = threading.BoundedSemaphore(JOB_MAX_PENDING)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+# =============================================================================
+# A. 작업 등록/제출
+# =============================================================================
+
+def register_task(name: str):
+    """
+    task 함수 등록 데코레이터. task는 payload(dict)를 kwargs로 받고
+    JSON 직렬화 가능한 값을 반환해야 한다.
+    """
+    def deco(fn: Callable[..., Any]):
+        _TASKS[name] = fn
+        return fn
+    return deco
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="gpt-job")
+    return _executor
+
+
+def enqueue(task: str, payload: Optional[Dict[str, Any]] = None, *, user=None) -> GptJob:
+    """
+    작업 행을 만들고 스레드 풀에 제출. 슬롯이 없으면 행을 만들지 않고 QueueFull.
+    트랜잭션 안에서 불리면 커밋 이후에 제출(on_commit)하고, 슬롯도 그때 잡는다.
+    (롤백되면 on_commit이 불리지 않으므로 미리 잡아 두면 슬롯이 영영 새어 나감)
+    """
+    if task not in _TASKS:
+        raise KeyError(f"등록되지 않은 작업: {task}")
+    if not _slots.acquire(blocking=False):
+        raise QueueFull(task)
+    deferred = transaction.get_connection().in_atomic_block
+    if deferred:
+        _slots.release()   # 여유 확인만 하고, 실제 슬롯은 _submit에서
+
+    try:
+        job = GptJob.objects.create(
+            task=task,
+            payload=payload or {},
+            user=user if getattr(user, "is_authenticated", False) else None,
+        )
+    except Exception:
+        if not deferred:
+            _slots.release()
+        raise
+    transaction.on_commit(lambda: _submit(job.id, reserved=not deferred))
+    return job
+
+
+def _submit(job_id, reserved: bool = True) -> None:
+    if not reserved and not _slots.acquire(blocking=False):
+        GptJob.objects.filter(id=job_id).update(
+            status=GptJob.Status.FAILED, error="queue full", finished_at=timezone.now()
+        )
+        return
+    try:
+        _get_executor().submit(_run, job_id)
+    except Exception:
+        _slots.release()
+        GptJob.objects.filter(id=job_id).update(
+            status=GptJob.Status.FAILED, error="submit failed", finished_at=timezone.now()
+        )
+
+
+def _run(job_id) -> None:
+    close_old_connections()
+    try:
+        job = GptJob.objects.filter(id=job_id).first()
+        if job is None:
+            return
+        # 대기 중에 시간 초과로 정리된 작업은 실행하지 않음
+        if not GptJob.objects.filter(id=job_id, status=GptJob.Status.QUEUED).update(
+            status=GptJob.Status.RUNNING, started_at=timezone.now()
+        ):
+            return
+        try:
+            result = _TASKS[job.task](**(job.payload or {}))
+        except Exception as e:
+            logger.exception("gpt job failed (task=%s, id=%s)", job.task, job_id)
+            GptJob.objects.filter(id=job_id).update(
+                status=GptJob.Status.FAILED,
+                error=f"{type(e).__name__}: {e}"[:1000],
+                finished_at=timezone.now(),
+            )
+            return
+        GptJob.objects.filter(id=job_id).update(
+            status=GptJob.Status.DONE, result=result, finished_at=timezone.now()
+        )
+    finally:
+        _slots.release()
+        close_old_connections()
+
+
+# =============================================================================
+# B. 조회/세션 연동
+# =============================================================================
+
+def get_job(job_id, user=None) -> Optional[GptJob]:
+    """
+    작업 조회(소유자 제한). 오래 끝나지 않은 작업(프로세스 재시작 등)은 실패로 정리.
+    실행 중이면 시작 시각, 대기 중이면 생성 시각부터 잰다.
+    """
+    qs = GptJob.objects.filter(id=job_id)
+    if user is not None:
+        qs = qs.filter(user=user)
+    try:
+        job = qs.first()
+    except Exception:
+        # 잘못된 UUID 문자열 등
+        return None
+    if job is None:
+        return None
+
+    stale_before = timezone.now() - timedelta(seconds=JOB_STALE_SECONDS)
+    since = job.started_at if job.status == GptJob.Status.RUNNING and job.started_at else job.created_at
+    if not job.is_finished and since < stale_before:
+        # 그사이 워커가 끝냈으면 덮어쓰지 않도록 상태 조건부 갱신
+        updated = GptJob.objects.filter(id=job.id, status=job.status).update(
+            status=GptJob.Status.FAILED, error="timeout", finished_at=timezone.now()
+        )
+        if updated:
+            job.status, job.error = GptJob.Status.FAILED, "timeout"
+        else:
+            job.refresh_from_db()
+    return job
+
+
+def prune_jobs(days: int = JOB_RETENTION_DAYS) -> int:
+    """days일보다 오래된 작업 행 삭제 (끝난 것 + 시간 초과된 미완료). 삭제 수 반환."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = GptJob.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def session_job(request, key: str) -> Optional[GptJob]:
+    """
+    세션 key에 걸어 둔 작업을 조회.
+    끝난 작업(또는 사라진 작업)이면 세션에서 key를 떼어낸다 → 결과는 한 번만 반영.
+    """
+    job_id = request.session.get(key)
+    if not job_id:
+        return None
+    job = get_job(job_id, user=request.user)
+    if job is None or job.is_finished:
+        request.session.pop(key, None)
+    return job
+
+
+def job_status_url(job: GptJob) -> str:
+    return reverse("food:job_status", args=[job.id])
+
+
+def job_to_dict(job: GptJob) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        "job_id": str(job.id),
+        "task": job.task,
+        "status": job.status,
+        "status_url": job_status_url(job),
+    }
+    if job.status == GptJob.Status.DONE:
+        data["result"] = job.result
+    elif job.status == GptJob.Status.FAILED:
+        data["error"] = job.error
+    return data
@@ -0,0 +1,50 @@
+"""
+LLM 클라이언트 선택.
+
+settings.LLM_BACKEND
+- "openai" (기본): 실제 OpenAI 클라이언트
+- "fake": food.services.fake_llm.FakeLLMClient (settings.FAKE_LLM 설정 사용)
+GPT 헬퍼들은 이 함수로 만든 클라이언트만 쓰므로, 설정 하나로 전체 흐름을 가짜 백엔드로 돌릴 수 있다.
+클라이언트는 처음 쓸 때 설정을 읽어 만든다 (import 시점에 API 키가 없어도 되고,
+테스트의 override_settings(LLM_BACKEND=...)도 반영됨). 테스트 러너는 기본으로 fake를 쓴다 (jangbom/test_runner.py).
+"""
+import threading
+from django.conf import settings
+from .llm_telemetry import instrument_client
+
+
+class LazyLLMClient:
+    """속성을 처음 꺼낼 때 build_llm_client()로 만든 클라이언트에 위임. 백엔드 설정이 바뀌면 다시 만든다."""
+
+    def __init__(self):
+        self._client = None
+        self._conf = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        conf = (getattr(settings, "LLM_BACKEND", "openai"), repr(getattr(settings, "FAKE_LLM", None)))
+        if self._client is None or self._conf != conf:
+            with self._lock:
+                if self._client is None or self._conf != conf:
+                    self._client, self._conf = build_llm_client(), conf
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+
+def get_llm_client() -> LazyLLMClient:
+    """설정된 백엔드 클라이언트 (처음 쓸 때 만듦)."""
+    return LazyLLMClient()
+
+
+def build_llm_client():
+    """설정된 백엔드 클라이언트를 바로 만든다 (토큰 사용량 집계용으로 감싸서 반환)."""
+    backend = getattr(settings, "LLM_BACKEND", "openai")
+    if backend == "fake":
+        from .fake_llm import FakeLLMClient
+        return instrument_client(FakeLLMClient(getattr(settings, "FAKE_LLM", None)))
+    if backend == "openai":
+        from openai import OpenAI
+        return instrument_client(OpenAI(api_key=settings.OPENAI_API_KEY))
+    raise ValueError(f"알 수 없는 LLM_BACKEND: {backend}")
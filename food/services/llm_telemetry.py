@@ -0,0 +1,159 @@
+"""
+GPT 호출 텔레메트리.
+
+- model_router.complete()가 작업 1건마다 한 줄 기록 (모델, 토큰, 지연, 재시도, 검증 성공)
+- 캐시/저장소/풀에서 GPT 없이 답한 경우는 record_cache_hit()으로 기록
+- 요청 중에는 메모리 버퍼에 쌓기만 하고, 프로세스당 1개인 저장 스레드가
+  LLM_TELEMETRY_FLUSH_SECONDS마다(또는 LLM_TELEMETRY_BATCH개가 모이면 바로) bulk_create로 저장
+  (요청이 없어도 주기적으로 저장, 저장 실패분은 버퍼에 되돌려 다음 주기에 재시도)
+- 토큰 수는 instrument_client()로 감싼 클라이언트가 응답 usage에서 스레드별로 모음
+"""
+import atexit, logging, threading
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LLM_TELEMETRY_ENABLED = getattr(settings, "LLM_TELEMETRY_ENABLED", True)
+LLM_TELEMETRY_BATCH = getattr(settings, "LLM_TELEMETRY_BATCH", 50)
+LLM_TELEMETRY_FLUSH_SECONDS = getattr(settings, "LLM_TELEMETRY_FLUSH_SECONDS", 10)
+LLM_TELEMETRY_MAX_BUFFER = 5000   # DB 장애 시 메모리 상한
+
+_buffer: List[dict] = []
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wake = threading.Event()
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+_usage = threading.local()
+
+
+# ---- 토큰 사용량 (스레드별) -----------------------------------------------
+
+def reset_usage() -> None:
+    _usage.prompt = _usage.completion = 0
+
+
+def take_usage() -> Tuple[int, int]:
+    """현재 스레드에 쌓인 (prompt, completion) 토큰을 돌려주고 초기화."""
+    out = (getattr(_usage, "prompt", 0), getattr(_usage, "completion", 0))
+    reset_usage()
+    return out
+
+
+class _UsageTrackingClient:
+    """chat.completions.create 응답의 usage를 스레드별로 합산 (나머지 속성은 원본 그대로)."""
+
+    def __init__(self, inner):
+        self._inner = inner
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        resp = self._inner.chat.completions.create(**kwargs)
+        usage = getattr(resp, "usage", None)
+        if usage is not None:
+            _usage.prompt = getattr(_usage, "prompt", 0) + (getattr(usage, "prompt_tokens", 0) or 0)
+            _usage.completion = getattr(_usage, "completion", 0) + (getattr(usage, "completion_tokens", 0) or 0)
+        return resp
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+def instrument_client(client):
+    return _UsageTrackingClient(client) if LLM_TELEMETRY_ENABLED else client
+
+
+# ---- 기록 / 배치 저장 ------------------------------------------------------
+
+def record(
+    task: str,
+    *,
+    model: str = "",
+    latency: float = 0.0,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cache_hit: bool = False,
+    retries: int = 0,
+    parse_ok: bool = True,
+) -> None:
+    if not LLM_TELEMETRY_ENABLED:
+        return
+    row = {
+        "task": task[:40],
+        "model": (model or "")[:40],
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latency_ms": int(latency * 1000),
+        "cache_hit": cache_hit,
+        "retries": retries,
+        "parse_ok": parse_ok,
+        "created_at": timezone.now(),
+    }
+    with _buffer_lock:
+        _buffer.append(row)
+        if len(_buffer) > LLM_TELEMETRY_MAX_BUFFER:
+            del _buffer[: len(_buffer) - LLM_TELEMETRY_MAX_BUFFER]
+        full = len(_buffer) >= LLM_TELEMETRY_BATCH
+    _ensure_flusher()
+    if full:
+        _wake.set()
+
+
+def record_cache_hit(task: str, *, latency: float = 0.0) -> None:
+    record(task, cache_hit=True, latency=latency)
+
+
+def flush() -> int:
+    """버퍼를 DB에 저장. 저장한 행 수를 반환 (다른 스레드가 저장 중이면 0)."""
+    if not _flush_lock.acquire(blocking=False):
+        return 0
+    try:
+        with _buffer_lock:
+            rows = _buffer[:]
+            _buffer.clear()
+        if not rows:
+            return 0
+        from food.models import LlmCall
+        try:
+            LlmCall.objects.bulk_create([LlmCall(**r) for r in rows], batch_size=500)
+        except Exception:
+            logger.exception("llm telemetry flush failed (%d rows re-queued)", len(rows))
+            with _buffer_lock:
+                _buffer[:0] = rows
+                if len(_buffer) > LLM_TELEMETRY_MAX_BUFFER:
+                    del _buffer[: len(_buffer) - LLM_TELEMETRY_MAX_BUFFER]
+            return 0
+        return len(rows)
+    finally:
+        _flush_lock.release()
+
+
+def _flush_loop() -> None:
+    while True:
+        _wake.wait(LLM_TELEMETRY_FLUSH_SECONDS)
+        _wake.clear()
+        close_old_connections()
+        try:
+            flush()
+        except Exception:
+            logger.exception("llm telemetry flusher error")
+        finally:
+            close_old_connections()
+
+
+def _ensure_flusher() -> None:
+    """주기 저장 스레드 (프로세스당 1개, 처음 기록할 때 시작)."""
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="llm-telemetry", daemon=True)
+            _flusher.start()
+
+
+atexit.register(flush)
@@ -0,0 +1,149 @@
+"""
+작업별 GPT 모델 라우팅.
+
+기본은 작은 모델, 아래 경우에만 큰 모델을 쓴다.
+- settings.GPT_MODEL_PINS로 작업을 특정 모델에 고정한 경우
+- 규칙: 입력이 길거나(max_small_chars 초과), 엄격한 JSON이 필요한데 입력이 큰 경우
+- 관측치: 최근 작은 모델의 검증 실패율이 높거나, 큰 모델보다 느린 경우
+  (이때도 PROBE_EVERY번에 한 번은 작은 모델을 다시 시도해 통계를 갱신)
+- 승격: 작은 모델 응답이 validate()를 통과하지 못하면 큰 모델로 한 번 더
+complete() 1건마다 llm_telemetry에 한 줄 기록한다.
+"""
+import statistics, threading, time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Tuple
+from django.conf import settings
+from . import llm_telemetry
+
+MODEL_SMALL = getattr(settings, "GPT_MODEL_SMALL", "gpt-4o-mini")
+MODEL_LARGE = getattr(settings, "GPT_MODEL_LARGE", "gpt-4o")
+GPT_MODEL_PINS: Dict[str, str] = getattr(settings, "GPT_MODEL_PINS", {})   # {"tip": "gpt-4o"}
+
+ROUTER_WINDOW = getattr(settings, "GPT_ROUTER_WINDOW", 50)            # 작업·모델별 최근 호출 수
+ROUTER_MIN_SAMPLES = getattr(settings, "GPT_ROUTER_MIN_SAMPLES", 10)
+ROUTER_MAX_FAIL_RATE = getattr(settings, "GPT_ROUTER_MAX_FAIL_RATE", 0.3)
+ROUTER_JSON_SMALL_CHARS = getattr(settings, "GPT_ROUTER_JSON_SMALL_CHARS", 4000)
+PROBE_EVERY = getattr(settings, "GPT_ROUTER_PROBE_EVERY", 10)
+
+
+@dataclass(frozen=True)
+class Route:
+    default: str = MODEL_SMALL
+    max_small_chars: int = 12000
+
+
+ROUTES: Dict[str, Route] = {
+    "chat_cook": Route(max_small_chars=6000),         # 대화가 길어지면 큰 모델
+    "recipe_ingredients": Route(),                    # v1 (JSON 프롬프트)
+    "recipe_ingredients_v2": Route(),                 # v2 (허용 재료 매핑) — 통계 분리
+    "leftover_recipe": Route(),
+    "idea": Route(),
+    "idea_followup": Route(),
+    "tip": Route(),
+    "tip_batch": Route(),
+    "praise": Route(),
+}
+
+
+class _Stats:
+    """작업·모델별 최근 (지연, 검증 성공) 기록."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], Deque[Tuple[float, bool]]] = {}
+        self._probe: Dict[str, int] = {}
+
+    def record(self, task: str, model: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._calls.setdefault((task, model), deque(maxlen=ROUTER_WINDOW)).append((latency, ok))
+
+    def summary(self, task: str, model: str) -> Optional[Tuple[float, float]]:
+        """(p50 지연, 실패율). 표본이 모자라면 None."""
+        with self._lock:
+            calls = list(self._calls.get((task, model), ()))
+        if len(calls) < ROUTER_MIN_SAMPLES:
+            return None
+        p50 = statistics.median(lat for lat, _ in calls)
+        fail_rate = sum(1 for _, ok in calls if not ok) / len(calls)
+        return p50, fail_rate
+
+    def should_probe(self, task: str) -> bool:
+        with self._lock:
+            n = self._probe[task] = self._probe.get(task, 0) + 1
+        return n % PROBE_EVERY == 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._probe.clear()
+
+
+stats = _Stats()
+
+
+def choose_model(task: str, *, input_chars: int = 0, strict_json: bool = False) -> str:
+    if task in GPT_MODEL_PINS:
+        return GPT_MODEL_PINS[task]
+    route = ROUTES.get(task, Route())
+    if route.default == MODEL_LARGE:
+        return MODEL_LARGE
+    if input_chars > route.max_small_chars:
+        return MODEL_LARGE
+    if strict_json and input_chars > ROUTER_JSON_SMALL_CHARS:
+        return MODEL_LARGE
+
+    small = stats.summary(task, MODEL_SMALL)
+    if small is not None:
+        p50, fail_rate = small
+        large = stats.summary(task, MODEL_LARGE)
+        degraded = fail_rate >= ROUTER_MAX_FAIL_RATE or (large is not None and p50 > large[0])
+        if degraded and not stats.should_probe(task):
+            return MODEL_LARGE
+    return MODEL_SMALL
+
+
+def _attempt(task: str, model: str, create: Callable[[str], str], validate) -> Tuple[str, bool]:
+    t0 = time.monotonic()
+    text = create(model)
+    ok = validate(text) if validate is not None else bool(text)
+    stats.record(task, model, time.monotonic() - t0, ok)
+    return text, ok
+
+
+def complete(
+    task: str,
+    create: Callable[[str], str],
+    *,
+    validate: Optional[Callable[[str], bool]] = None,
+    escalate: Optional[Callable[[str], str]] = None,
+    input_chars: int = 0,
+    strict_json: bool = False,
+    model: Optional[str] = None,
+) -> str:
+    """
+    create(model) → 응답 텍스트. 고른 모델로 한 번 호출하고,
+    validate를 통과하지 못하면 큰 모델로 한 번 더(escalate가 있으면 그걸로) 호출한다.
+    - 처음부터 큰 모델이었다면 escalate(보강 프롬프트)가 있을 때만 재시도
+    - model을 주면 라우팅 없이 그 모델로 한 번만 호출 (호출측이 모델을 고정한 경우, 기록은 똑같이)
+    - 마지막 응답은 검증 결과와 관계없이 그대로 반환(후처리는 호출측 몫)
+    """
+    llm_telemetry.reset_usage()
+    t0 = time.monotonic()
+    pinned = model is not None
+    if not pinned:
+        model = choose_model(task, input_chars=input_chars, strict_json=strict_json)
+    retries, ok = 0, False
+    try:
+        text, ok = _attempt(task, model, create, validate)
+        if not pinned and not (ok or (model == MODEL_LARGE and escalate is None)):
+            retries, model = 1, MODEL_LARGE
+            text, ok = _attempt(task, model, escalate or create, validate)
+        return text
+    finally:
+        prompt_tokens, completion_tokens = llm_telemetry.take_usage()
+        llm_telemetry.record(
+            task, model=model, latency=time.monotonic() - t0,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+            retries=retries, parse_ok=ok,
+        )
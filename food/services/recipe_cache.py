@@ -0,0 +1,54 @@
+"""
+남은 재료 레시피 캐시 (내용 주소 기반).
+
+키 = 재료 조합 해시(ids_seed) + 정규화한 추가 요청 + 프롬프트 버전
+- 키마다 여러 변형(variant)을 저장 → 상한만큼 채워지면 그중 하나를 무작위로 반환
+  (그 전까지는 GPT로 새 변형을 만들어 추가 → 인기 조합도 다양성 유지,
+   GPT가 같은 답을 주면 중복은 저장하지 않되 채운 횟수로는 셈)
+- 키마다 RECIPE_CACHE_TTL 슬라이딩 만료 (읽을 때 cache.touch) → 안 쓰이는 조합은 저절로 사라짐
+  키 수 상한은 캐시 백엔드의 자체 제거(LocMem MAX_ENTRIES, redis maxmemory-policy)에 맡김
+  (공용 LRU 목록을 매번 읽고-고쳐-쓰지 않음), 키당 변형 수는 상한 (오래된 것부터 밀어냄)
+"""
+import hashlib, random, re, unicodedata
+from typing import List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+RECIPE_VARIANTS_PER_KEY = getattr(settings, "RECIPE_VARIANTS_PER_KEY", 3)
+RECIPE_CACHE_TTL = getattr(settings, "RECIPE_CACHE_TTL", 60 * 60 * 24 * 7)
+
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.~…,]+$")
+
+
+def normalize_followup(text: Optional[str]) -> str:
+    """'매운 버전도 돼요?? ' 와 '매운 버전도 돼요' 를 같은 요청으로."""
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    text = " ".join(text.split())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def variant_key(seed: str, followup: str = "", *, version: int) -> str:
+    q = normalize_followup(followup)
+    q_hash = hashlib.sha1(q.encode("utf-8")).hexdigest()[:16] if q else "-"
+    return f"recipe_variants:v{version}:{seed}:{q_hash}"
+
+
+def lookup(key: str) -> Tuple[Optional[str], bool]:
+    """(무작위 변형 또는 None, 상한만큼 채워졌는지)."""
+    entry = cache.get(key) or {}
+    variants: List[str] = entry.get("variants") or []
+    if not variants:
+        return None, False
+    cache.touch(key, RECIPE_CACHE_TTL)
+    return random.choice(variants), entry.get("fills", 0) >= RECIPE_VARIANTS_PER_KEY
+
+
+def add_variant(key: str, text: str) -> None:
+    text = (text or "").strip()
+    if not text:
+        return
+    entry = cache.get(key) or {}
+    variants: List[str] = entry.get("variants") or []
+    if text not in variants:
+        variants = (variants + [text])[-RECIPE_VARIANTS_PER_KEY:]
+    cache.set(key, {"variants": variants, "fills": entry.get("fills", 0) + 1}, RECIPE_CACHE_TTL)
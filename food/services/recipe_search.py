@@ -0,0 +1,291 @@
+"""
+저장한 레시피(SavedRecipe) 전문 검색.
+
+한국어는 띄어쓰기/조사 때문에 단어 단위 색인이 잘 안 맞으므로 2-gram으로 색인한다.
+  '김치찌개' → '김치 치찌 찌개 개'  (끝 글자도 1개 토큰으로 → 모든 글자가 어떤 토큰의 첫 글자)
+검색어도 같은 방식으로 쪼개 '연속된 2-gram 구(phrase)'로 찾으므로 부분 문자열 검색과 같은 결과.
+1글자 검색어는 접두 검색('국' → 국*, '된장국'은 끝 글자 토큰 '국'으로 찾음).
+
+- SQLite: FTS5 가상 테이블 food_savedrecipe_fts (title/body 2-gram, user_id), bm25 순위 (제목 가중치↑)
+- PostgreSQL: food_savedrecipe_search (tsvector 'simple' + GIN), ts_rank 순위
+- 그 외 DB 또는 FTS5가 없는 SQLite: icontains (제목 일치 우선)
+색인 테이블은 처음 쓸 때 만들고, SavedRecipe 저장/삭제 시그널로 동기화 (food/signals.py).
+색인 테이블을 새로 만들면 기존 레시피 채우기는 백그라운드 작업(recipe_index_rebuild)으로 넘기고
+(요청 안에서 전체 사용자를 색인하지 않음, 그 사이 검색은 일부만 나올 수 있음), 전체 재색인은 rebuild_recipe_index 명령.
+하이라이트/스니펫은 원문에서 검색어를 찾아 <mark>로 감싼다 (원문은 escape).
+"""
+import logging, re, threading, unicodedata
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+logger = logging.getLogger(__name__)
+
+RECIPE_SEARCH_LIMIT = getattr(settings, "RECIPE_SEARCH_LIMIT", 100)
+SNIPPET_CHARS = 40
+TITLE_WEIGHT = 5.0
+
+_WORD_RE = re.compile(r"\w+")
+
+SQLITE_TABLE = "food_savedrecipe_fts"
+PG_TABLE = "food_savedrecipe_search"
+
+
+# =============================================================================
+# A. 2-gram 토큰화
+# =============================================================================
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(unicodedata.normalize("NFC", str(text or "")).casefold())
+
+
+def word_grams(word: str) -> List[str]:
+    return [word] if len(word) <= 2 else [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def gram_text(text: str) -> str:
+    """색인용: 단어별 2-gram + 끝 글자를 공백으로 이은 문자열."""
+    return " ".join(g for w in words(text) for g in (word_grams(w) + [w[-1]] if len(w) > 1 else [w]))
+
+
+# =============================================================================
+# B. 백엔드 (테이블 준비 / 색인 / 검색)
+# =============================================================================
+
+_ready = False
+_backend: Optional[str] = None
+_lock = threading.Lock()
+
+
+def backend() -> str:
+    """'fts5' | 'postgres' | 'basic'"""
+    global _backend
+    if _backend is None:
+        if connection.vendor == "sqlite":
+            try:
+                with connection.cursor() as cur:
+                    cur.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+                    cur.execute("DROP TABLE temp.fts5_probe")
+                _backend = "fts5"
+            except Exception:
+                _backend = "basic"
+        elif connection.vendor == "postgresql":
+            _backend = "postgres"
+        else:
+            _backend = "basic"
+    return _backend
+
+
+def ensure_index(backfill: bool = True) -> bool:
+    """
+    색인 테이블이 없으면 만든다. 새로 만들었으면 True.
+    backfill이면 기존 레시피 채우기를 백그라운드 작업으로 예약 (rebuild는 직접 채우므로 False).
+    """
+    global _ready
+    if _ready or backend() == "basic":
+        return False
+    with _lock:
+        if _ready:
+            return False
+        tables = connection.introspection.table_names()
+        created = False
+        with connection.cursor() as cur:
+            if backend() == "fts5" and SQLITE_TABLE not in tables:
+                cur.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} "
+                    "USING fts5(title, body, user_id UNINDEXED, tokenize='unicode61')"
+                )
+                created = True
+            elif backend() == "postgres" and PG_TABLE not in tables:
+                cur.execute(
+                    f"CREATE TABLE IF NOT EXISTS {PG_TABLE} ("
+                    "recipe_id bigint PRIMARY KEY, user_id bigint NOT NULL, document tsvector NOT NULL)"
+                )
+                cur.execute(f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_doc ON {PG_TABLE} USING GIN (document)")
+                cur.execute(f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_user ON {PG_TABLE} (user_id)")
+                created = True
+        _ready = True
+    if created and backfill:
+        _schedule_rebuild()
+    return created
+
+
+def _schedule_rebuild() -> None:
+    from django.db import transaction
+    from .job_queue import QueueFull, enqueue
+
+    def submit():
+        try:
+            enqueue("recipe_index_rebuild", {})
+        except QueueFull:
+            logger.warning("recipe_index_rebuild skipped (queue full): run rebuild_recipe_index")
+
+    transaction.on_commit(submit, robust=True)
+
+
+def _write(cur, recipe) -> None:
+    title, body = gram_text(recipe.title), gram_text(recipe.description)
+    if backend() == "fts5":
+        cur.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [recipe.pk])
+        cur.execute(f"INSERT INTO {SQLITE_TABLE} (rowid, title, body, user_id) VALUES (%s, %s, %s, %s)",
+                    [recipe.pk, title, body, recipe.user_id])
+    else:
+        cur.execute(
+            f"INSERT INTO {PG_TABLE} (recipe_id, user_id, document) VALUES (%s, %s, "
+            "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+            "ON CONFLICT (recipe_id) DO UPDATE SET user_id = EXCLUDED.user_id, document = EXCLUDED.document",
+            [recipe.pk, recipe.user_id, title, body],
+        )
+
+
+def index_recipe(recipe_id: int) -> None:
+    from food.models import SavedRecipe
+    if backend() == "basic":
+        return
+    ensure_index()
+    recipe = SavedRecipe.objects.filter(pk=recipe_id).only("id", "user_id", "title", "description").first()
+    if recipe is None:
+        return remove_recipe(recipe_id)
+    with connection.cursor() as cur:
+        _write(cur, recipe)
+
+
+def remove_recipe(recipe_id: int) -> None:
+    if backend() == "basic":
+        return
+    ensure_index()
+    with connection.cursor() as cur:
+        if backend() == "fts5":
+            cur.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [recipe_id])
+        else:
+            cur.execute(f"DELETE FROM {PG_TABLE} WHERE recipe_id = %s", [recipe_id])
+
+
+def rebuild() -> int:
+    """색인을 비우고 전체 레시피로 다시 채움. 색인한 수를 반환."""
+    from django.db import transaction
+    from food.models import SavedRecipe
+    if backend() == "basic":
+        return 0
+    ensure_index(backfill=False)
+    count = 0
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {SQLITE_TABLE if backend() == 'fts5' else PG_TABLE}")
+        for recipe in SavedRecipe.objects.only("id", "user_id", "title", "description").iterator(chunk_size=500):
+            _write(cur, recipe)
+            count += 1
+    return count
+
+
+def _match_query(q: str) -> Optional[str]:
+    """검색어 → FTS5 MATCH / to_tsquery 문자열. 단어는 AND, 단어 안의 2-gram은 연속(구)."""
+    parts = []
+    for w in words(q):
+        grams = word_grams(w)
+        if backend() == "fts5":
+            parts.append(f"{w}*" if len(w) == 1 else '"' + " ".join(grams) + '"')
+        else:
+            parts.append(f"{w}:*" if len(w) == 1 else "(" + " <-> ".join(grams) + ")")
+    if not parts:
+        return None
+    return " AND ".join(parts) if backend() == "fts5" else " & ".join(parts)
+
+
+def _ranked_ids(user_id: int, q: str, limit: int) -> List[int]:
+    match = _match_query(q)
+    if not match:
+        return []
+    with connection.cursor() as cur:
+        if backend() == "fts5":
+            cur.execute(
+                f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s AND user_id = %s "
+                f"ORDER BY bm25({SQLITE_TABLE}, {TITLE_WEIGHT}, 1.0) LIMIT %s",
+                [match, user_id, limit],
+            )
+        else:
+            cur.execute(
+                f"SELECT recipe_id FROM {PG_TABLE} WHERE user_id = %s AND document @@ to_tsquery('simple', %s) "
+                "ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC LIMIT %s",
+                [user_id, match, match, limit],
+            )
+        return [row[0] for row in cur.fetchall()]
+
+
+# =============================================================================
+# C. 검색 + 하이라이트
+# =============================================================================
+
+@dataclass
+class Hit:
+    recipe: object
+    title_html: SafeString
+    snippet_html: SafeString
+
+
+def _term_re(q: str):
+    terms = sorted(set(words(q)), key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, terms)), re.IGNORECASE) if terms else None
+
+
+def highlight(text: str, q: str) -> SafeString:
+    """원문 text에서 검색어 부분을 <mark>로 (나머지는 escape)."""
+    text = str(text or "")
+    pattern = _term_re(q)
+    if pattern is None:
+        return escape(text)
+    out, pos = [], 0
+    for m in pattern.finditer(text):
+        out.append(escape(text[pos:m.start()]))
+        out.append(f"<mark>{escape(m.group())}</mark>")
+        pos = m.end()
+    out.append(escape(text[pos:]))
+    return mark_safe("".join(out))
+
+
+def snippet(text: str, q: str, chars: int = SNIPPET_CHARS) -> SafeString:
+    """검색어가 처음 나오는 곳 앞뒤 chars자 (없으면 앞부분), 하이라이트 포함."""
+    text = " ".join(str(text or "").split())
+    pattern = _term_re(q)
+    m = pattern.search(text) if pattern else None
+    if m is None:
+        return escape(text[:chars * 2] + ("…" if len(text) > chars * 2 else ""))
+    start, end = max(0, m.start() - chars), min(len(text), m.end() + chars)
+    body = highlight(text[start:end], q)
+    return mark_safe(("…" if start else "") + body + ("…" if end < len(text) else ""))
+
+
+def search(user, q: str, limit: int = RECIPE_SEARCH_LIMIT) -> List[Hit]:
+    """user의 저장 레시피 중 q와 맞는 것, 관련도순."""
+    from food.models import SavedRecipe
+    q = (q or "").strip()
+    if not q:
+        return []
+    recipes = SavedRecipe.objects.filter(user=user)
+    ids: Optional[List[int]] = None
+    if backend() != "basic":
+        try:
+            ensure_index()
+            ids = _ranked_ids(user.pk, q, limit)
+        except Exception:
+            logger.exception("recipe search index failed, falling back to icontains")
+    if ids is None:
+        return [Hit(r, highlight(r.title, q), snippet(r.description, q)) for r in _basic(recipes, q, limit)]
+    by_id = recipes.in_bulk(ids)
+    return [Hit(by_id[i], highlight(by_id[i].title, q), snippet(by_id[i].description, q))
+            for i in ids if i in by_id]
+
+
+def _basic(recipes, q: str, limit: int) -> Iterable:
+    from django.db.models import Case, IntegerField, Q, Value, When
+    cond = Q()
+    for w in words(q):
+        cond &= Q(title__icontains=w) | Q(description__icontains=w)
+    title_hit = Q()
+    for w in words(q):
+        title_hit &= Q(title__icontains=w)
+    return (recipes.filter(cond)
+            .annotate(title_hit=Case(When(title_hit, then=Value(0)), default=Value(1), output_field=IntegerField()))
+            .order_by("title_hit", "-created_at")[:limit])
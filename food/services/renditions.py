@@ -0,0 +1,186 @@
+"""
+이미지 리사이즈본(rendition) 생성/조회 (Pillow).
+
+원본 옆 _r/ 폴더에 고정 너비별 WebP + JPEG를 만들어 둔다.
+  ingredients/onion.png → ingredients/_r/onion.png.96w.webp, ingredients/_r/onion.png.96w.jpg
+- 원본보다 큰 너비는 만들지 않음 (확대 안 함). 원본이 가장 작은 너비보다 작으면 리사이즈본 없음
+- 업로드: 모델 저장 시그널(이미지가 바뀐 경우만) → 전용 스레드 풀(generate_async)로 1장씩
+  (GPT 작업 큐와 분리 → GptJob 행/큐 자리를 쓰지 않고, 큐가 차도 리사이즈는 밀리지 않음)
+- 일괄: build_renditions 명령 → 프로세스 풀 (render_file은 Django 없이 도는 순수 함수)
+- 템플릿: {% responsive_img %} (food/templatetags/images.py)가 있는 너비만 srcset으로
+  있는 너비 목록은 캐시에 두고, 생성 직후 갱신
+FileSystemStorage(경로가 있는 저장소)만 지원, 그 외 저장소에서는 원본을 그대로 씀.
+"""
+import hashlib, logging, os, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+RENDITION_WIDTHS: Tuple[int, ...] = tuple(getattr(settings, "IMAGE_RENDITION_WIDTHS", (96, 160, 320, 640, 960)))
+RENDITION_QUALITY = getattr(settings, "IMAGE_RENDITION_QUALITY", 80)
+RENDITION_CACHE_TTL = getattr(settings, "IMAGE_RENDITION_CACHE_TTL", 60 * 60 * 24)
+RENDITION_WORKERS = getattr(settings, "IMAGE_RENDITION_WORKERS", 1)
+RENDITION_DIR = "_r"
+FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+logger = logging.getLogger(__name__)
+
+
+def rendition_name(name: str, width: int, ext: str) -> str:
+    head, tail = os.path.split(name)
+    return "/".join(p for p in (head, RENDITION_DIR, f"{tail}.{width}w.{ext}") if p)
+
+
+# =============================================================================
+# A. 생성 (프로세스 풀 워커에서도 도는 순수 함수)
+# =============================================================================
+
+def render_file(src: str, widths: Sequence[int] = RENDITION_WIDTHS, quality: int = RENDITION_QUALITY,
+                force: bool = False) -> Tuple[List[int], int]:
+    """
+    원본 절대경로 src의 리사이즈본을 만들고, (만들어져 있는 너비 목록, 원본 너비)를 반환.
+    이미 있고 원본보다 새 파일이면 건너뜀 (force면 다시 만듦).
+    """
+    from PIL import Image, ImageOps
+
+    head, tail = os.path.split(src)
+    out_dir = os.path.join(head, RENDITION_DIR)
+    src_mtime = os.path.getmtime(src)
+    done: List[int] = []
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+        rgba = im.convert("RGBA" if has_alpha else "RGB")
+        for w in sorted(set(widths)):
+            if w >= rgba.width:
+                break
+            targets = {ext: os.path.join(out_dir, f"{tail}.{w}w.{ext}") for ext in FORMATS}
+            if not force and all(os.path.exists(p) and os.path.getmtime(p) >= src_mtime for p in targets.values()):
+                done.append(w)
+                continue
+            os.makedirs(out_dir, exist_ok=True)
+            h = max(1, round(rgba.height * w / rgba.width))
+            resized = rgba.resize((w, h), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            resized.save(targets["webp"], "WEBP", quality=quality, method=4)
+            if has_alpha:
+                flat = Image.new("RGB", resized.size, (255, 255, 255))
+                flat.paste(resized, mask=resized.getchannel("A"))
+                resized = flat
+            resized.save(targets["jpg"], "JPEG", quality=quality, optimize=True, progressive=True)
+            done.append(w)
+    return done, rgba.width
+
+
+def render_job(args) -> Tuple[str, List[int], int, Optional[str]]:
+    """ProcessPoolExecutor.map용: (name, 절대경로, force) → (name, 너비 목록, 원본 너비, 오류)."""
+    name, src, force = args
+    try:
+        return (name, *render_file(src, force=force), None)
+    except Exception as e:
+        return name, [], 0, f"{type(e).__name__}: {e}"
+
+
+# =============================================================================
+# B. 저장소/캐시 연결
+# =============================================================================
+
+def _storage():
+    from django.core.files.storage import default_storage
+    return default_storage
+
+
+def source_path(name: str) -> Optional[str]:
+    try:
+        return _storage().path(name)
+    except NotImplementedError:
+        return None
+
+
+def _cache_key(name: str) -> str:
+    return "renditions:" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:20]
+
+
+def remember(name: str, widths: Iterable[int], width: int) -> None:
+    cache.set(_cache_key(name), (sorted(widths), width), RENDITION_CACHE_TTL)
+
+
+def generate(name: str, force: bool = False) -> List[int]:
+    """이 프로세스에서 바로 1장 생성 (업로드 작업용)."""
+    src = source_path(name)
+    if not src or not os.path.exists(src):
+        return []
+    widths, width = render_file(src, force=force)
+    remember(name, widths, width)
+    return widths
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _generate_logged(name: str) -> None:
+    try:
+        generate(name)
+    except Exception:
+        # 놓친 것은 build_renditions 명령이 채움
+        logger.exception("image renditions failed: %s", name)
+
+
+def generate_async(name: str) -> None:
+    """업로드 직후 백그라운드로 1장 생성 (프로세스당 RENDITION_WORKERS개 스레드)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=RENDITION_WORKERS, thread_name_prefix="renditions")
+    _executor.submit(_generate_logged, name)
+
+
+def manifest(name: str) -> Tuple[List[int], int]:
+    """(만들어져 있는 너비, 원본 너비). 캐시, 없으면 파일/헤더 확인 후 캐시. 모르면 ([], 0)."""
+    if not name:
+        return [], 0
+    key = _cache_key(name)
+    found = cache.get(key)
+    if found is None:
+        src = source_path(name)
+        widths, width = [], 0
+        if src and os.path.exists(src):
+            storage = _storage()
+            widths = [w for w in RENDITION_WIDTHS if storage.exists(rendition_name(name, w, "webp"))]
+            if widths:
+                from PIL import Image
+                try:
+                    with Image.open(src) as im:   # 헤더만 읽음
+                        width = im.width
+                except Exception:
+                    widths = []
+        found = (widths, width)
+        cache.set(key, found, RENDITION_CACHE_TTL)
+    return found
+
+
+def delete_for(name: str) -> None:
+    storage = _storage()
+    for w in RENDITION_WIDTHS:
+        for ext in FORMATS:
+            r = rendition_name(name, w, ext)
+            try:
+                if storage.exists(r):
+                    storage.delete(r)
+            except NotImplementedError:
+                return
+    cache.delete(_cache_key(name))
+
+
+def srcset(name: str, ext: str) -> str:
+    """'url 96w, url 160w, ...' (jpg는 원본도 마지막 후보로). 리사이즈본이 없으면 ''."""
+    widths, width = manifest(name)
+    if not widths:
+        return ""
+    storage = _storage()
+    parts = [f"{storage.url(rendition_name(name, w, ext))} {w}w" for w in widths]
+    if ext == "jpg" and width:
+        parts.append(f"{storage.url(name)} {width}w")
+    return ", ".join(parts)
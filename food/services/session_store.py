@@ -0,0 +1,176 @@
+"""
+세션 저장소 (SESSION_ENGINE = "food.services.session_store").
+
+Django cached_db에 쓰기 정책만 더한 것:
+- 읽기: 캐시 먼저, 캐시 미스일 때만 DB 1회 (읽은 값은 캐시에 채움)
+- 쓰기(dirty-only): 불러온 시점과 내용이 같으면 저장하지 않음
+  (뷰가 같은 값을 다시 넣어 modified만 켜진 경우 → SQLite 쓰기 락을 잡지 않음)
+- 쓰기(write-behind): SESSION_WRITE_BEHIND_SECONDS > 0이면 캐시에는 바로, DB에는 모아서 주기적으로
+  (프로세스당 저장 스레드 1개). 이미 있는 행만 고침 — 새 세션은 바로 만들고(must_create),
+  로그아웃 등으로 지워진 세션은 되살리지 않음
+  캐시가 프로세스 간 공유(redis/memcached)일 때만 켤 것. LocMem이면 다른 프로세스가 옛 값을 봄
+- 직렬화: FastJSONSerializer (orjson이 설치돼 있으면 사용, 없으면 compact json)
+
+SESSION_BACKEND 환경변수로 db / cached_db(이 모듈) / cache / signed_cookies 중 선택 (settings.py).
+bench_sessions 명령으로 백엔드별 초당 세션 저장 수를 비교할 수 있다.
+"""
+import atexit, hashlib, json, logging, threading, time
+from typing import Any, Dict, Optional, Set, Tuple
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.db import close_old_connections
+
+try:
+    import orjson
+except ImportError:   # 선택 의존성
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+SESSION_WRITE_BEHIND_SECONDS = getattr(settings, "SESSION_WRITE_BEHIND_SECONDS", 0)
+
+
+class FastJSONSerializer:
+    """
+    JSON bytes (UTF-8), orjson이 있으면 더 빠르게.
+    orjson은 한글을 UTF-8 그대로 쓰므로 읽기도 항상 UTF-8 (워커마다 orjson 유무가 달라도 같은 값).
+    """
+
+    def dumps(self, obj) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data.decode("utf-8"))
+
+
+def _digest(data: Dict[str, Any]) -> bytes:
+    return hashlib.blake2b(FastJSONSerializer().dumps(data), digest_size=16).digest()
+
+
+# write-behind 대기열: session_key → (세션 dict, 만료 시각)
+_pending: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+_in_flight: Set[str] = set()   # 저장 중인 키
+_deleted: Set[str] = set()     # 저장 중에 지워진 키 (실패해도 다시 넣지 않음)
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+class SessionStore(CachedDBStore):
+    write_behind = SESSION_WRITE_BEHIND_SECONDS
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_digest = None
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = _digest(data)
+        return data
+
+    def is_unchanged(self) -> bool:
+        return (
+            self._loaded_digest is not None
+            and self.session_key is not None
+            and not getattr(settings, "SESSION_SAVE_EVERY_REQUEST", False)
+            and _digest(self._get_session()) == self._loaded_digest
+        )
+
+    def save(self, must_create=False):
+        if not must_create and self.is_unchanged():
+            return
+        if must_create or not self.write_behind or self.session_key is None:
+            super().save(must_create)
+            with _lock:
+                _pending.pop(self.session_key, None)
+        else:
+            data = self._get_session()
+            try:
+                self._cache.set(self.cache_key, data, self.get_expiry_age())
+            except Exception:
+                logger.exception("Error saving to cache (%s)", self._cache)
+                return super().save(must_create)
+            _defer(self.session_key, dict(data), self.get_expiry_date())
+        self._loaded_digest = _digest(self._get_session())
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key:
+            with _lock:
+                _pending.pop(key, None)
+                if key in _in_flight:
+                    _deleted.add(key)
+        super().delete(session_key)
+
+
+def _defer(session_key: str, data: Dict[str, Any], expire_date) -> None:
+    with _lock:
+        _pending[session_key] = (data, expire_date)
+    _ensure_flusher()
+
+
+def flush() -> int:
+    """대기 중인 세션을 DB에 반영 (있는 행만 update). 반영한 세션 수를 반환."""
+    if not _flush_lock.acquire(blocking=False):
+        return 0
+    try:
+        with _lock:
+            batch = list(_pending.items())
+            _pending.clear()
+            _in_flight.update(key for key, _ in batch)
+        if not batch:
+            return 0
+        from django.db import transaction
+        model = SessionStore.get_model_class()
+        encoder = SessionStore()
+        written = 0
+        try:
+            with transaction.atomic():
+                for key, (data, expire_date) in batch:
+                    # 행이 없으면(로그아웃/만료 정리로 지워짐) 만들지 않고 버림
+                    written += model.objects.filter(session_key=key).update(
+                        session_data=encoder.encode(data), expire_date=expire_date)
+        except Exception:
+            logger.exception("session write-behind flush failed")
+            with _lock:
+                for key, value in batch:
+                    if key not in _deleted:
+                        _pending.setdefault(key, value)   # 다음 flush에 다시 (그 사이 새 값이 있으면 그것)
+            return 0
+        finally:
+            with _lock:
+                _in_flight.clear()
+                _deleted.clear()
+        return written
+    finally:
+        _flush_lock.release()
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(max(SessionStore.write_behind, 1))
+        close_old_connections()
+        try:
+            flush()
+        except Exception:
+            logger.exception("session write-behind flush failed")
+        finally:
+            close_old_connections()
+
+
+def _ensure_flusher() -> None:
+    """주기 저장 스레드 (프로세스당 1개, 처음 미룰 때 시작)."""
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="session-flush", daemon=True)
+            _flusher.start()
+
+
+atexit.register(flush)
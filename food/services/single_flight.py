@@ -0,0 +1,108 @@
+"""
+Single-flight: 같은 캐시 키에 대한 동시 생성 요청을 한 번의 호출로 합친다.
+
+- 스레드 간: 프로세스 내 in-flight 표(Event)로 대기 → 리더 결과를 그대로 받음
+- 프로세스 간: cache.add() 기반 락(lease 만료) → 팔로워는 캐시에 결과가 올라올 때까지 폴링
+  (프로세스 간 합치기는 CACHES가 공유 백엔드(redis/memcached/DB)일 때만 효과가 있음)
+- 리더가 실패하거나 lease가 만료되면 다음 대기자가 리더를 이어받는다.
+"""
+import threading, time, uuid
+from typing import Any, Callable, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+
+SINGLE_FLIGHT_LEASE = getattr(settings, "SINGLE_FLIGHT_LEASE", 30)   # 초, 락 유지 시간
+SINGLE_FLIGHT_POLL = getattr(settings, "SINGLE_FLIGHT_POLL", 0.1)    # 초, 팔로워 폴링 간격
+
+
+class _Call:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+_inflight: Dict[str, _Call] = {}
+_inflight_lock = threading.Lock()
+
+
+def get_or_generate(
+    key: str,
+    generate: Callable[[], Any],
+    *,
+    timeout: int,
+    lease: Optional[int] = None,
+    wait: Optional[float] = None,
+) -> Any:
+    """
+    cache[key]가 있으면 그대로 반환, 없으면 한 호출자만 generate()를 실행해 캐시에 저장.
+    - timeout: 결과 캐시 TTL(초)
+    - lease: 프로세스 간 락 유지 시간(초). 리더가 죽어도 이 시간이 지나면 풀림
+    - wait: 팔로워 최대 대기(초). 넘기면 직접 생성 (기본: lease)
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lease = lease or SINGLE_FLIGHT_LEASE
+    wait = lease if wait is None else wait
+
+    with _inflight_lock:
+        call = _inflight.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = _inflight[key] = _Call()
+
+    if not is_leader:
+        if call.event.wait(wait):
+            if call.error is not None:
+                raise call.error
+            return call.value
+        # 리더가 너무 오래 걸림: 캐시를 다시 보고, 리더와 같은 락/캐시 경로로 직접 생성 (결과 공유)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        return _generate_locked(key, generate, timeout=timeout, lease=lease, wait=0)
+
+    try:
+        call.value = _generate_locked(key, generate, timeout=timeout, lease=lease, wait=wait)
+        return call.value
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.event.set()
+
+
+def _generate_locked(key: str, generate: Callable[[], Any], *, timeout: int, lease: int, wait: float) -> Any:
+    """프로세스 간 락을 잡은 쪽만 생성. 나머지는 캐시에 결과가 생길 때까지 대기."""
+    lock_key = f"sf:lock:{key}"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+
+    while True:
+        if cache.add(lock_key, token, lease):
+            try:
+                # 락을 잡는 사이 다른 리더가 끝냈을 수 있음
+                value = cache.get(key)
+                if value is None:
+                    value = generate()
+                    cache.set(key, value, timeout)
+                return value
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() >= deadline:
+            # 리더가 너무 오래 걸리면 직접 생성 (결과는 공유)
+            value = generate()
+            cache.set(key, value, timeout)
+            return value
+        time.sleep(SINGLE_FLIGHT_POLL)
@@ -0,0 +1,72 @@
+"""
+정적 파일 파이프라인 (STORAGES["staticfiles"]).
+
+collectstatic 때:
+- 내용 해시가 들어간 파일명 (ManifestStaticFilesStorage: main.css → main.3f2a9c1b7e4d.css, CSS 안 url()도 치환)
+- 텍스트 계열 파일은 .gz(+ brotli 모듈이 있으면 .br) 미리 압축본을 옆에 저장 (원본보다 작을 때만)
+서빙은 food.middleware.PrecompressedStaticMiddleware가 Accept-Encoding을 보고 압축본을 고른다.
+
+collectstatic 전(개발/테스트)에는 manifest가 없으므로 해시 없는 원래 이름으로 돌려준다.
+"""
+import gzip, os
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:   # 선택 의존성: 없으면 gzip만
+    brotli = None
+
+STATIC_COMPRESS_EXTENSIONS = tuple(getattr(settings, "STATIC_COMPRESS_EXTENSIONS", (
+    ".css", ".js", ".html", ".svg", ".json", ".txt", ".xml", ".map", ".ico", ".ttf", ".otf",
+)))
+STATIC_COMPRESS_MIN_SIZE = getattr(settings, "STATIC_COMPRESS_MIN_SIZE", 512)
+
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))   # 선호 순서
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # 원본을 찾을 수 없는 url() 참조가 있어도 collectstatic을 멈추지 않음 (참조는 그대로 둠)
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is None and filename is None:
+                return name   # CSS url()이 가리키는 파일이 없음
+            raise
+
+    def post_process(self, paths, dry_run=False, **options):
+        compressed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+            if dry_run or isinstance(processed, Exception) or not hashed_name:
+                continue
+            for target in (name, hashed_name):
+                if target not in compressed and self._compress(target):
+                    compressed.add(target)
+
+    def _compress(self, name: str) -> bool:
+        if not name.lower().endswith(STATIC_COMPRESS_EXTENSIONS):
+            return False
+        path = self.path(name)
+        with open(path, "rb") as f:
+            raw = f.read()
+        if len(raw) < STATIC_COMPRESS_MIN_SIZE:
+            return False
+        variants = {".gz": gzip.compress(raw, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(raw, quality=11)
+        for suffix, data in variants.items():
+            if len(data) < len(raw):
+                with open(path + suffix, "wb") as f:
+                    f.write(data)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return True
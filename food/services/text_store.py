@@ -0,0 +1,184 @@
+"""
+재료별 생성 텍스트(구매 TIP / 요리 아이디어) 조회·저장.
+
+조회 순서: 캐시(24h) → GeneratedText(영구 저장소) → GPT 생성(single-flight)
+오프라인 배치(pregenerate_texts)가 저장소를 미리 채워 두면 대화형 요청은 거의 GPT를 기다리지 않는다.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from food.models import GeneratedText
+from food.utils import IDEA_PROMPT_VERSION, generate_recipe_chat
+from . import llm_telemetry
+from market.utils import TIP_PROMPT_VERSION, generate_tip_text, generate_tip_texts_batch
+from .single_flight import get_or_generate
+
+logger = logging.getLogger(__name__)
+
+TEXT_CACHE_TTL = 60 * 60 * 24
+TEXT_REFRESH_HOURS = getattr(settings, "PREGEN_REFRESH_HOURS", 24 * 7)
+TIP_BATCH_SIZE = getattr(settings, "TIP_BATCH_SIZE", 8)
+TIP_PENDING_TTL = getattr(settings, "GPT_JOB_STALE_SECONDS", 180)
+
+
+@dataclass(frozen=True)
+class TextKind:
+    kind: str
+    version: int
+    generate: Callable[[str], str]
+
+
+TEXT_KINDS = {
+    GeneratedText.Kind.TIP: TextKind(GeneratedText.Kind.TIP, TIP_PROMPT_VERSION, lambda name: generate_tip_text(name)),
+    GeneratedText.Kind.IDEA: TextKind(GeneratedText.Kind.IDEA, IDEA_PROMPT_VERSION, lambda name: generate_recipe_chat(name)),
+}
+
+
+def text_key(name: str) -> str:
+    return (name or "").strip().lower()
+
+
+def cache_key(kind: str, name: str) -> str:
+    """tip:v{버전}:{name} / idea:v{버전}:{name} — 프롬프트 버전이 오르면 예전 캐시는 안 읽힘"""
+    return f"{kind}:v{TEXT_KINDS[kind].version}:{text_key(name)}"
+
+
+def get_stored_text(kind: str, name: str) -> Optional[str]:
+    """
+    저장소에서 현재 프롬프트 버전의 텍스트 조회.
+    refresh_at이 지났어도 반환한다(갱신은 배치 담당).
+    """
+    spec = TEXT_KINDS[kind]
+    return (
+        GeneratedText.objects
+        .filter(kind=kind, name=text_key(name), version__gte=spec.version)
+        .values_list("text", flat=True)
+        .first()
+    )
+
+
+def store_text(kind: str, name: str, text: str, *, refresh_hours: Optional[int] = None) -> None:
+    """저장소 upsert + 캐시 채우기."""
+    spec = TEXT_KINDS[kind]
+    hours = TEXT_REFRESH_HOURS if refresh_hours is None else refresh_hours
+    GeneratedText.objects.update_or_create(
+        kind=kind, name=text_key(name),
+        defaults={
+            "text": text,
+            "version": spec.version,
+            "refresh_at": timezone.now() + timedelta(hours=hours),
+        },
+    )
+    cache.set(cache_key(kind, name), text, TEXT_CACHE_TTL)
+
+
+def get_or_generate_text(kind: str, name: str) -> str:
+    """캐시 → 저장소 → GPT(single-flight) 순으로 텍스트를 얻는다."""
+    spec = TEXT_KINDS[kind]
+    cached = cache.get(cache_key(kind, name))
+    if cached is not None:
+        llm_telemetry.record_cache_hit(kind)
+        return cached
+
+    def load():
+        stored = get_stored_text(kind, name)
+        if stored is not None:
+            llm_telemetry.record_cache_hit(kind)
+            return stored
+        text = spec.generate(name)
+        if text:
+            store_text(kind, name, text)
+        return text
+
+    return get_or_generate(cache_key(kind, name), load, timeout=TEXT_CACHE_TTL)
+
+
+def _ordered_names(names: Sequence[str]) -> List[str]:
+    seen, ordered = set(), []
+    for n in names:
+        n = (n or "").strip()
+        if n and text_key(n) not in seen:
+            seen.add(text_key(n))
+            ordered.append(n)
+    return ordered
+
+
+def get_stored_tips(names: Sequence[str]) -> Dict[str, str]:
+    """
+    여러 재료의 구매 TIP 중 이미 있는 것만: 캐시(get_many) → 저장소(쿼리 1번). GPT는 부르지 않음.
+    반환 순서는 입력 순서, 없는 재료는 빠짐.
+    """
+    kind = GeneratedText.Kind.TIP
+    ordered = _ordered_names(names)
+    if not ordered:
+        return {}
+
+    keys = {cache_key(kind, n): n for n in ordered}
+    out: Dict[str, str] = {keys[k]: v for k, v in cache.get_many(list(keys)).items() if v is not None}
+    for _ in out:
+        llm_telemetry.record_cache_hit(kind)
+
+    missing = [n for n in ordered if n not in out]
+    if missing:
+        stored = dict(
+            GeneratedText.objects
+            .filter(kind=kind, name__in=[text_key(n) for n in missing], version__gte=TEXT_KINDS[kind].version)
+            .values_list("name", "text")
+        )
+        found = {n: stored[text_key(n)] for n in missing if text_key(n) in stored}
+        if found:
+            cache.set_many({cache_key(kind, n): t for n, t in found.items()}, TEXT_CACHE_TTL)
+            out.update(found)
+            for _ in found:
+                llm_telemetry.record_cache_hit(kind)
+
+    return {n: out[n] for n in ordered if n in out}
+
+
+def claim_tip_generation(names: Sequence[str]) -> List[str]:
+    """
+    생성 작업을 넣을 재료만 골라냄 (같은 재료를 여러 화면이 동시에 요청해도 작업은 한 번).
+    표시는 TIP_PENDING_TTL 뒤 풀림 → 작업이 실패해도 다음 요청이 다시 넣음.
+    """
+    return [n for n in _ordered_names(names)
+            if cache.add(f"tip:pending:{text_key(n)}", 1, TIP_PENDING_TTL)]
+
+
+def release_tip_generation(names: Sequence[str]) -> None:
+    cache.delete_many([f"tip:pending:{text_key(n)}" for n in names])
+
+
+def get_or_generate_tips(names: Sequence[str]) -> Dict[str, str]:
+    """
+    여러 재료의 구매 TIP을 한 번에 (백그라운드 작업/배치용 — GPT를 기다림).
+    저장본(get_stored_tips) → 배치 GPT(TIP_BATCH_SIZE개씩) → 파싱 실패분만 개별 생성.
+    반환 순서는 입력 순서, 끝내 실패한 재료는 빠짐.
+    """
+    kind = GeneratedText.Kind.TIP
+    ordered = _ordered_names(names)
+    out = get_stored_tips(ordered)
+
+    missing = [n for n in ordered if n not in out]
+    for i in range(0, len(missing), TIP_BATCH_SIZE):
+        chunk = missing[i:i + TIP_BATCH_SIZE]
+        try:
+            batch = generate_tip_texts_batch(chunk) if len(chunk) > 1 else {}
+        except Exception:
+            logger.exception("tip batch failed (%s)", ", ".join(chunk))
+            batch = {}
+        for n, text in batch.items():
+            store_text(kind, n, text)
+            out[n] = text
+
+    # 배치 응답에서 빠졌거나 파싱 실패한 재료만 개별 생성
+    for n in [n for n in ordered if n not in out]:
+        try:
+            out[n] = get_or_generate_text(kind, n)
+        except Exception:
+            logger.exception("tip generation failed (%s)", n)
+
+    return {n: out[n] for n in ordered if n in out}
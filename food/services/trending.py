@@ -0,0 +1,255 @@
+"""
+동네별 인기 검색어/담기 집계 (스트리밍, 메모리 상한 고정).
+
+- 집계 대상은 카탈로그 재료명으로 풀리는 검색어뿐 (사용자가 친 임의 문자열은 동네에 노출하지 않음)
+- record(): 검색 1번 / 재료 담기 1번마다 호출. (동, 시간 창)별 count-min sketch에 더하고
+  추정치가 큰 항목만 top-k 후보로 유지 → 검색어 종류가 아무리 많아도 메모리는 일정
+- flush(): 프로세스당 1개인 저장 스레드가 TRENDING_FLUSH_SECONDS마다 top-k의 증가분만 SearchTrend에 더함
+  (요청이 없어도 주기적으로 저장 → 끝난 창이 다음 요청까지 남지 않음,
+   프로세스마다 따로 세고 DB에서 합쳐짐), 끝난 시간 창은 저장 후 메모리에서 버림
+  (저장 실패 시 다시 넣어 다음 flush에서 재시도)
+- popular_terms(): 최근 TRENDING_LOOKBACK_WINDOWS개 창 합계를 flush 때 미리 계산해 캐시에 둠
+  → 화면에서는 캐시 한 번 읽기
+"""
+import atexit, hashlib, logging, threading, time, unicodedata
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from .catalog import get_catalog
+
+logger = logging.getLogger(__name__)
+
+TRENDING_ENABLED = getattr(settings, "TRENDING_ENABLED", True)
+TRENDING_WINDOW_SECONDS = getattr(settings, "TRENDING_WINDOW_SECONDS", 60 * 60)
+TRENDING_LOOKBACK_WINDOWS = getattr(settings, "TRENDING_LOOKBACK_WINDOWS", 24)
+TRENDING_FLUSH_SECONDS = getattr(settings, "TRENDING_FLUSH_SECONDS", 60)
+TRENDING_TOP_K = getattr(settings, "TRENDING_TOP_K", 50)
+TRENDING_SKETCH_WIDTH = getattr(settings, "TRENDING_SKETCH_WIDTH", 2048)
+TRENDING_SKETCH_DEPTH = getattr(settings, "TRENDING_SKETCH_DEPTH", 4)
+TRENDING_CACHE_TTL = getattr(settings, "TRENDING_CACHE_TTL", 60 * 10)
+TERM_MAX_LEN = 30
+
+# 담기는 검색보다 구매 의도가 분명하므로 가중치를 더 줌
+WEIGHTS = {"search": 1, "cart": 2}
+
+
+def normalize_term(term: str) -> str:
+    """카탈로그 재료명이면 DB 원본명, 아니면 '' (집계 안 함)."""
+    text = " ".join(unicodedata.normalize("NFC", str(term or "")).split())
+    if not text or len(text) > TERM_MAX_LEN:
+        return ""
+    return get_catalog().resolve(text) or ""
+
+
+def window_start(ts: Optional[float] = None) -> int:
+    ts = time.time() if ts is None else ts
+    return int(ts // TRENDING_WINDOW_SECONDS * TRENDING_WINDOW_SECONDS)
+
+
+class CountMinSketch:
+    """고정 크기 빈도 추정기 (과대 추정만 있고 과소 추정은 없음)."""
+
+    def __init__(self, width: int = TRENDING_SKETCH_WIDTH, depth: int = TRENDING_SKETCH_DEPTH):
+        self.width, self.depth = width, depth
+        self.rows = [array("L", [0]) * width for _ in range(depth)]
+
+    def _cells(self, term: str):
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=4 * self.depth).digest()
+        for d in range(self.depth):
+            yield d, int.from_bytes(digest[4 * d:4 * d + 4], "little") % self.width
+
+    def add(self, term: str, n: int = 1) -> int:
+        """n만큼 더하고 새 추정치를 반환."""
+        est = None
+        for d, i in self._cells(term):
+            v = self.rows[d][i] + n
+            self.rows[d][i] = v
+            est = v if est is None else min(est, v)
+        return est or 0
+
+    def estimate(self, term: str) -> int:
+        return min(self.rows[d][i] for d, i in self._cells(term))
+
+
+class HeavyHitters:
+    """count-min sketch + 추정치 상위 k개 후보."""
+
+    def __init__(self, k: int = TRENDING_TOP_K):
+        self.k = k
+        self.sketch = CountMinSketch()
+        self.top: Dict[str, int] = {}
+        self.flushed: Dict[str, int] = {}   # 이미 DB에 반영한 추정치
+        self._min: Optional[Tuple[int, str]] = None
+
+    def add(self, term: str, n: int = 1) -> None:
+        est = self.sketch.add(term, n)
+        if term in self.top or len(self.top) < self.k:
+            self.top[term] = est
+            self._min = None
+            return
+        if self._min is None:
+            self._min = min((c, t) for t, c in self.top.items())
+        if est > self._min[0]:
+            del self.top[self._min[1]]
+            self.top[term] = est
+            self._min = None
+
+    def pending(self) -> Dict[str, int]:
+        """마지막 flush 이후 늘어난 양 {term: 증가분}."""
+        out = {}
+        for term, est in self.top.items():
+            delta = est - self.flushed.get(term, 0)
+            if delta > 0:
+                out[term] = delta
+        return out
+
+    def mark_flushed(self, deltas: Dict[str, int]) -> None:
+        for term, delta in deltas.items():
+            self.flushed[term] = self.flushed.get(term, 0) + delta
+
+
+_partitions: Dict[Tuple[str, int], HeavyHitters] = {}
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+
+
+def record(user, term: str, *, kind: str = "search") -> None:
+    """검색/담기 1건 집계. user의 addr_level3(동) 기준, 동 정보가 없으면 ''."""
+    if not TRENDING_ENABLED:
+        return
+    term = normalize_term(term)
+    if not term:
+        return
+    dong = (getattr(user, "addr_level3", "") or "").strip()
+    key = (dong, window_start())
+    with _lock:
+        hh = _partitions.get(key)
+        if hh is None:
+            hh = _partitions[key] = HeavyHitters()
+        hh.add(term, WEIGHTS.get(kind, 1))
+    _ensure_flusher()
+
+
+def _cache_key(dong: str) -> str:
+    return "trending:" + hashlib.sha1(dong.encode("utf-8")).hexdigest()[:16]
+
+
+def _compute(dong: str, limit: int) -> List[str]:
+    from django.db.models import Sum
+    from food.models import SearchTrend
+
+    since = datetime.fromtimestamp(window_start() - (TRENDING_LOOKBACK_WINDOWS - 1) * TRENDING_WINDOW_SECONDS,
+                                   tz=dt_timezone.utc)
+    rows = (SearchTrend.objects.filter(dong=dong, window_start__gte=since)
+            .values("term").annotate(total=Sum("count")).order_by("-total", "term")[:limit])
+    return [r["term"] for r in rows]
+
+
+def refresh_popular(dong: str, limit: int = 10) -> List[str]:
+    catalog = get_catalog()
+    terms = [t for t in _compute(dong, limit * 3) if t in catalog][:limit]
+    cache.set(_cache_key(dong), terms, TRENDING_CACHE_TTL)
+    return terms
+
+
+def popular_terms(dong: Optional[str], limit: int = 10) -> List[str]:
+    """
+    동네 인기 검색어 (캐시 한 번 읽기, 캐시가 비었을 때만 DB 집계).
+    지금 카탈로그에 있는 재료명만 (예전에 쌓인 임의 문자열/삭제된 재료는 빼고 보여줌).
+    """
+    dong = (dong or "").strip()
+    terms = cache.get(_cache_key(dong))
+    if terms is None:
+        try:
+            terms = refresh_popular(dong)
+        except Exception:
+            logger.exception("trending lookup failed")
+            return []
+    catalog = get_catalog()
+    return [t for t in terms if t in catalog][:limit]
+
+
+def flush() -> int:
+    """증가분을 DB에 더하고 갱신된 동의 인기 목록 캐시를 다시 계산. 반영한 항목 수를 반환."""
+    if not _flush_lock.acquire(blocking=False):
+        return 0
+    try:
+        current = window_start()
+        with _lock:
+            batch = [(key, hh, hh.pending()) for key, hh in _partitions.items()]
+            finished = {key: hh for key, hh, _ in batch if key[1] < current}
+            for key in finished:
+                _partitions.pop(key, None)   # 끝난 창: 이번이 마지막 저장
+        batch = [(key, hh, deltas) for key, hh, deltas in batch if deltas]
+        if not batch:
+            return 0
+
+        from django.db import transaction
+        from django.db.models import F
+        from food.models import SearchTrend
+
+        written = 0
+        try:
+            with transaction.atomic():
+                for (dong, start), hh, deltas in batch:
+                    ws = datetime.fromtimestamp(start, tz=dt_timezone.utc)
+                    for term, delta in deltas.items():
+                        updated = SearchTrend.objects.filter(dong=dong, window_start=ws, term=term).update(
+                            count=F("count") + delta)
+                        if not updated:
+                            SearchTrend.objects.create(dong=dong, window_start=ws, term=term, count=delta)
+                        written += 1
+        except Exception:
+            logger.exception("trending flush failed")
+            # 끝난 창을 되돌려 놓음 → 다음 flush에서 증가분(아직 mark_flushed 전)을 다시 저장
+            with _lock:
+                for key, hh in finished.items():
+                    _partitions.setdefault(key, hh)
+            return 0
+
+        with _lock:
+            for _, hh, deltas in batch:
+                hh.mark_flushed(deltas)
+        for dong in {key[0] for key, _, _ in batch}:
+            refresh_popular(dong)
+        return written
+    finally:
+        _flush_lock.release()
+
+
+def prune(days: int = 30) -> int:
+    """오래된 창 삭제."""
+    from food.models import SearchTrend
+    cutoff = datetime.now(dt_timezone.utc) - timedelta(days=days)
+    return SearchTrend.objects.filter(window_start__lt=cutoff).delete()[0]
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(TRENDING_FLUSH_SECONDS)
+        close_old_connections()
+        try:
+            flush()
+        except Exception:
+            logger.exception("trending flusher error")
+        finally:
+            close_old_connections()
+
+
+def _ensure_flusher() -> None:
+    """주기 저장 스레드 (프로세스당 1개, 처음 기록할 때 시작)."""
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="trending-flush", daemon=True)
+            _flusher.start()
+
+
+atexit.register(flush)
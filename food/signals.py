@@ -0,0 +1,99 @@
+"""
+모델 변경 → 캐시/스냅샷 무효화.
+"""
+import logging
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.core.cache import cache
+from market.models import Market, NearbyPlace
+from point.models import UserPoint
+from .models import FoodBanner, Ingredient, SavedRecipe
+from .services.banner_cache import invalidate_banners
+from .services import recipe_search, renditions
+from .services.catalog import invalidate_catalog
+from .services.flow_state import clear_user_flow
+from .utils import saved_recipe_kb_key, user_point_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    # 커밋 전에 다시 읽으면 옛 데이터로 새 버전을 만들 수 있으므로 커밋 후에
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver([post_save, post_delete], sender=UserPoint)
+def user_point_changed(sender, instance, **kwargs):
+    # 헤더에 쓰는 보유 포인트 캐시
+    transaction.on_commit(lambda: cache.delete(user_point_cache_key(instance.user_id)))
+
+
+@receiver([post_save, post_delete], sender=FoodBanner)
+def food_banner_changed(sender, **kwargs):
+    # 메인 배너 캐시 + 템플릿 조각 캐시 (세대 키 증가)
+    transaction.on_commit(invalidate_banners)
+
+
+@receiver(post_save, sender=SavedRecipe)
+def saved_recipe_saved(sender, instance, **kwargs):
+    # 요리법 보관함 전문 검색 색인 (food.services.recipe_search)
+    pk, user_id = instance.pk, instance.user_id
+    # 색인 실패가 저장 요청이나 다른 on_commit 콜백을 깨뜨리지 않게 robust (예외는 로그만)
+    transaction.on_commit(lambda: recipe_search.index_recipe(pk), robust=True)
+    transaction.on_commit(lambda: cache.delete(saved_recipe_kb_key(user_id)))
+
+
+@receiver(post_delete, sender=SavedRecipe)
+def saved_recipe_deleted(sender, instance, **kwargs):
+    pk, user_id = instance.pk, instance.user_id
+    transaction.on_commit(lambda: recipe_search.remove_recipe(pk), robust=True)
+    transaction.on_commit(lambda: cache.delete(saved_recipe_kb_key(user_id)))
+
+
+@receiver(user_logged_out)
+def user_flow_logged_out(sender, request, user, **kwargs):
+    # 대화 기록 등 사용자 단위 흐름 상태는 로그아웃과 함께 지움 (세션처럼)
+    if user is not None:
+        clear_user_flow(user)
+
+
+# 이미지 리사이즈본 (food.services.renditions): 이미지가 바뀌면 백그라운드로 생성, 삭제 시 같이 삭제
+IMAGE_MODELS = (Ingredient, FoodBanner, Market, NearbyPlace)
+
+
+def _image_untouched(update_fields) -> bool:
+    return update_fields is not None and "image" not in update_fields
+
+
+def image_pre_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    # 저장 전 DB의 이미지 이름 (이름이 같으면 다시 만들지 않음)
+    if raw or _image_untouched(update_fields) or instance.pk is None:
+        instance._previous_image = None
+        return
+    instance._previous_image = (sender.objects.filter(pk=instance.pk)
+                                .values_list("image", flat=True).first())
+
+
+def image_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or _image_untouched(update_fields) or not instance.image:
+        return
+    name = instance.image.name
+    if name == getattr(instance, "_previous_image", None):
+        return
+    transaction.on_commit(lambda: renditions.generate_async(name))
+
+
+def image_deleted(sender, instance, **kwargs):
+    if not instance.image:
+        return
+    name = instance.image.name
+    transaction.on_commit(lambda: renditions.delete_for(name))
+
+
+for _model in IMAGE_MODELS:
+    pre_save.connect(image_pre_save, sender=_model, dispatch_uid=f"renditions_pre_save_{_model._meta.label}")
+    post_save.connect(image_saved, sender=_model, dispatch_uid=f"renditions_save_{_model._meta.label}")
+    post_delete.connect(image_deleted, sender=_model, dispatch_uid=f"renditions_delete_{_model._meta.label}")
@@ -0,0 +1,61 @@
+"""
+백그라운드 GPT 작업 정의 (food).
+각 함수는 job_queue 워커 스레드에서 실행되며, 결과는 GptJob.result(JSON)로 저장된다.
+세션 반영은 뷰가 결과를 읽을 때 처리한다.
+"""
+from .services.catalog import get_catalog
+from .services.job_queue import register_task
+from .utils import (
+    call_gpt,
+    extract_ingredients_from_recipe,
+    extract_ingredients_from_recipe_v2,
+    extract_recipe_name_from_gpt_response,
+    gpt_conversational_cook,
+    remember_recipe_ingredients,
+)
+
+
+@register_task("recipe_ai_reply")
+def recipe_ai_reply(chat_history):
+    """대화형 요리 제안 + (요리명이 있으면) 재료 v2 분석까지 한 번에."""
+    reply = gpt_conversational_cook(chat_history)
+    recipe_name = extract_recipe_name_from_gpt_response(reply)
+
+    basic, optional = [], []
+    if recipe_name:
+        try:
+            catalog = get_catalog()
+            basic_v2, optional_v2 = extract_ingredients_from_recipe_v2(
+                recipe_name, allowed_ingredients=catalog.names
+            )
+            basic = catalog.filter_names(basic_v2)
+            optional = catalog.filter_names(optional_v2)
+            remember_recipe_ingredients(recipe_name, basic, optional)
+        except Exception:
+            pass
+
+    return {"reply": reply, "recipe_name": recipe_name, "basic": basic, "optional": optional}
+
+
+@register_task("recipe_ingredients")
+def recipe_ingredients(recipe_name):
+    """요리명 → DB에 있는 재료만 남긴 (basic, optional)."""
+    basic_raw, optional_raw = extract_ingredients_from_recipe(recipe_name)
+    catalog = get_catalog()
+    basic = catalog.filter_names(basic_raw or [])
+    optional = catalog.filter_names(optional_raw or [])
+    remember_recipe_ingredients(recipe_name, basic, optional)
+    return {"recipe": recipe_name, "basic": basic, "optional": optional}
+
+
+@register_task("leftover_recipe")
+def leftover_recipe(selected_names, followup="", seed=None, user_id=None):
+    """남은 재료 레시피 (call_gpt는 실패 시 폴백 텍스트를 돌려줌)."""
+    return {"text": call_gpt(selected_names, followup, seed=seed, user_id=user_id), "followup": followup}
+
+
+@register_task("recipe_index_rebuild")
+def recipe_index_rebuild():
+    """요리법 보관함 전문 검색 색인 채우기 (색인 테이블을 새로 만든 직후 1회)."""
+    from .services.recipe_search import rebuild
+    return {"indexed": rebuild()}
@@ -0,0 +1,49 @@
+"""
+{% load images %}
+{% responsive_img it.ingredient.image alt=it.ingredient.name sizes="48px" class="item-pic" %}
+
+ImageField 값(FieldFile)이나 MEDIA_URL 아래 URL 문자열을 받아
+리사이즈본이 있으면 <picture>(WebP source + JPEG srcset), 없으면 원본 <img> 하나를 그린다.
+"""
+from django import template
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from urllib.parse import unquote
+from food.services import renditions
+
+register = template.Library()
+
+
+def _name_and_url(image):
+    if isinstance(image, FieldFile):
+        return (image.name, image.url) if image else (None, None)
+    url = str(image or "")
+    if url.startswith(settings.MEDIA_URL):
+        return unquote(url[len(settings.MEDIA_URL):]), url
+    return None, url or None
+
+
+@register.simple_tag
+def responsive_img(image, alt="", sizes="100vw", **attrs):
+    name, url = _name_and_url(image)
+    if not url:
+        return ""
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    jpg = renditions.srcset(name, "jpg") if name else ""
+    if not jpg:
+        return format_html('<img src="{}" alt="{}"{}>', url, alt, flatatt(attrs))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        renditions.srcset(name, "webp"), sizes, url, jpg, sizes, alt, flatatt(attrs),
+    )
+
+
+@register.filter
+def srcset(image, ext="webp"):
+    """{{ image|srcset:"webp" }} → 'url 96w, url 160w' (리사이즈본이 없으면 '')."""
+    name, _ = _name_and_url(image)
+    return renditions.srcset(name, ext) if name else ""
@@ -1,3 +1,1170 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.db import transaction
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from market.models import ShoppingList, ShoppingListIngredient
+from point.models import UserPoint
+from .context_processors import header
+from .middleware import PrecompressedStaticMiddleware
+from .models import FlowState, FoodBanner, GptJob, Ingredient, LlmCall, SavedRecipe, SearchTrend
+from .services import (
+    banner_cache, cart_writer, job_queue, llm_telemetry, model_router, recipe_cache, recipe_search, renditions,
+    session_store, trending,
+)
+from .services.catalog import get_catalog, invalidate_catalog, normalize_key
+from .services.chat_memory import budget_messages, clip_to_tokens, estimate_tokens, message_tokens
+from .services.fake_llm import FakeLLMClient, detect_task
+from .services.flow_state import FlowStore, clear_user_flow, pack, unpack
+from .services.hedge import hedged_call
+from .services.ingredient_search import search_ingredients, to_choseong, to_jamo
+from .services.single_flight import get_or_generate
+from .services.static_storage import CompressedManifestStaticFilesStorage
+from .utils import (
+    RECIPE_PROMPT_VERSION, call_gpt, extract_ingredients_from_recipe_v2, local_recipe_text,
+    remember_recipe_ingredients,
+)
+
+User = get_user_model()
+
+
+def make_user(username="u"):
+    return User.objects.create_user(username=username, password="p", nickname=username,
+                                    latitude=37.6, longitude=127.0)
+
+
+def make_ingredients(*names):
+    Ingredient.objects.bulk_create([Ingredient(name=n) for n in names])
+    invalidate_catalog()   # TestCase 안에서는 on_commit 무효화가 돌지 않음
+
+
+def ask(client, prompt, **kwargs):
+    return client.chat.completions.create(model="gpt-4o-mini",
+                                          messages=[{"role": "user", "content": prompt}], **kwargs)
+
+
+# =============================================================================
+# 테스트 러너 / LLM 백엔드
+# =============================================================================
+
+class LLMBackendTests(TestCase):
+    def test_test_runner_uses_fake_backend(self):
+        self.assertEqual(settings.LLM_BACKEND, "fake")
+
+    def test_lazy_client_follows_settings(self):
+        from .utils import client
+        resolved = client._resolve()
+        self.assertIsInstance(getattr(resolved, "_inner", resolved), FakeLLMClient)
+        with override_settings(LLM_BACKEND="nope"):
+            with self.assertRaises(ValueError):
+                client.chat
+
+    def test_detect_task(self):
+        self.assertEqual(detect_task([{"content": '{"tips": [...]}'}]), "tip_batch")
+        self.assertEqual(detect_task([{"content": '"basic" / "optional" 로 나눠 줘'}]), "recipe_ingredients")
+        self.assertEqual(detect_task([{"content": "칭찬 문구 두 줄"}]), "praise")
+
+    def test_same_prompt_same_answer(self):
+        prompt = '레시피 재료를 {"basic": [], "optional": []} 로 나눠 줘'
+        a, b = ask(FakeLLMClient(), prompt), ask(FakeLLMClient(), prompt)
+        self.assertEqual(a.choices[0].message.content, b.choices[0].message.content)
+        self.assertGreater(a.usage.prompt_tokens, 0)
+
+    def test_stream_chunks_join_to_full_answer(self):
+        fake = FakeLLMClient({"responses": {"praise": "걷기 최고\n오늘도 알찬 한 끼"}})
+        chunks = ask(fake, "칭찬 두 줄", stream=True)
+        self.assertEqual("".join(c.choices[0].delta.content for c in chunks), "걷기 최고\n오늘도 알찬 한 끼")
+
+    def test_failure_injection(self):
+        import openai
+        fake = FakeLLMClient({"failure_rate": 1.0, "failure_kinds": ["connection"]})
+        with self.assertRaises(openai.APIConnectionError):
+            ask(fake, "칭찬 두 줄")
+        fake = FakeLLMClient({"failure_rate": 1.0, "failure_kinds": ["malformed"]})
+        with self.assertRaises(ValueError):
+            json.loads(ask(fake, '{"basic": [], "optional": []}').choices[0].message.content)
+
+
+# =============================================================================
+# 백그라운드 작업 큐 (job_queue)
+# =============================================================================
+
+@job_queue.register_task("test_echo")
+def _echo(value):
+    return {"value": value}
+
+
+@job_queue.register_task("test_fail")
+def _fail():
+    raise RuntimeError("boom")
+
+
+class InlineExecutor:
+    """submit 즉시 같은 스레드에서 실행 (테스트에서 작업 완료를 기다릴 필요 없음)."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class JobQueueTests(TransactionTestCase):
+    def setUp(self):
+        # 모듈 전역 스레드 풀/슬롯 대신 테스트마다 새 슬롯 + 인라인 실행
+        patches = [
+            mock.patch.object(job_queue, "_get_executor", return_value=InlineExecutor()),
+            mock.patch.object(job_queue, "_slots", threading.BoundedSemaphore(2)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def run_job(self, *args, **kwargs):
+        job = job_queue.enqueue(*args, **kwargs)
+        job.refresh_from_db()
+        return job
+
+    def test_runs_task_and_stores_result(self):
+        job = self.run_job("test_echo", {"value": 3})
+        self.assertEqual(job.status, GptJob.Status.DONE)
+        self.assertEqual(job.result, {"value": 3})
+        data = job_queue.job_to_dict(job)
+        self.assertEqual((data["status"], data["result"]), ("done", {"value": 3}))
+
+    def test_failure_is_recorded(self):
+        with self.assertLogs("food.services.job_queue", "ERROR"):
+            job = self.run_job("test_fail")
+        self.assertEqual(job.status, GptJob.Status.FAILED)
+        self.assertIn("boom", job.error)
+
+    def test_slot_released_after_run(self):
+        for value in range(3):
+            self.assertEqual(self.run_job("test_echo", {"value": value}).status, GptJob.Status.DONE)
+        self.assertTrue(job_queue._slots.acquire(blocking=False))
+
+    def test_unknown_task(self):
+        with self.assertRaises(KeyError):
+            job_queue.enqueue("no_such_task")
+
+    def test_queue_full(self):
+        while job_queue._slots.acquire(blocking=False):
+            pass
+        with self.assertRaises(job_queue.QueueFull):
+            job_queue.enqueue("test_echo", {"value": 1})
+        self.assertFalse(GptJob.objects.exists())
+
+    def test_submitted_after_commit_only(self):
+        with transaction.atomic():
+            job = job_queue.enqueue("test_echo", {"value": 1})
+            self.assertEqual(GptJob.objects.get(id=job.id).status, GptJob.Status.QUEUED)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GptJob.Status.DONE)
+
+        try:
+            with transaction.atomic():
+                job = job_queue.enqueue("test_echo", {"value": 2})
+                raise RuntimeError("rollback")
+        except RuntimeError:
+            pass
+        self.assertFalse(GptJob.objects.filter(id=job.id).exists())
+        self.assertTrue(job_queue._slots.acquire(blocking=False))   # 롤백돼도 슬롯은 새지 않음
+
+    def test_status_view_is_owner_only(self):
+        owner, other = make_user("a"), make_user("b")
+        job = self.run_job("test_echo", {"value": 1}, user=owner)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(job_queue.job_status_url(job)).status_code, 404)
+        self.client.force_login(owner)
+        self.assertEqual(self.client.get(job_queue.job_status_url(job)).json()["result"], {"value": 1})
+
+
+# =============================================================================
+# 같은 키 생성 합치기 (single_flight)
+# =============================================================================
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_hit_skips_generate(self):
+        cache.set("sf-test", "cached")
+        self.assertEqual(get_or_generate("sf-test", lambda: self.fail("generated"), timeout=60), "cached")
+
+    def test_concurrent_callers_share_one_call(self):
+        calls, started, release = [], threading.Event(), threading.Event()
+
+        def generate():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_or_generate("sf-test", generate, timeout=60)))
+                   for _ in range(5)]
+        threads[0].start()
+        started.wait(5)
+        for t in threads[1:]:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+        self.assertIsNone(cache.get("sf:lock:sf-test"))
+
+    def test_failure_is_not_cached(self):
+        def boom():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            get_or_generate("sf-test", boom, timeout=60)
+        self.assertEqual(get_or_generate("sf-test", lambda: "ok", timeout=60), "ok")
+
+    def test_lock_held_elsewhere_falls_back_after_wait(self):
+        cache.add("sf:lock:sf-test", "other-process", 30)
+        self.assertEqual(get_or_generate("sf-test", lambda: "mine", timeout=60, wait=0), "mine")
+        self.assertEqual(cache.get("sf-test"), "mine")
+        self.assertEqual(cache.get("sf:lock:sf-test"), "other-process")   # 남의 락은 건드리지 않음
+
+
+# =============================================================================
+# 대화 기록 토큰 예산 (chat_memory)
+# =============================================================================
+
+def chat(turns, system="너는 요리 도우미야."):
+    msgs = [{"role": "system", "content": system}]
+    for q, a in turns:
+        msgs.append({"role": "user", "content": q})
+        if a:
+            msgs.append({"role": "assistant", "content": a})
+    return msgs
+
+
+class ChatMemoryTests(TestCase):
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens("양파"), 2)
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        self.assertEqual(estimate_tokens(""), 0)
+
+    def test_short_history_is_unchanged(self):
+        msgs = chat([("김치 요리", '"김치볶음밥" 어때요?'), ("다른 거", None)])
+        self.assertEqual(budget_messages(msgs, budget=1000), msgs)
+
+    def test_old_turns_become_summary_within_budget(self):
+        turns = [(f"{i}번째 질문 " + "가" * 80, f'"요리{i}" 추천합니다 ' + "나" * 80) for i in range(6)]
+        msgs = chat(turns + [("마지막 질문", None)])
+        out = budget_messages(msgs, budget=400, keep_turns=2)
+        self.assertLessEqual(message_tokens(out), 400)
+        self.assertEqual(out[0], msgs[0])
+        self.assertEqual(out[-1], {"role": "user", "content": "마지막 질문"})
+        summary = [m["content"] for m in out if m["content"].startswith("이전 대화 요약")]
+        self.assertEqual(len(summary), 1)
+        self.assertIn('"요리3" 추천', summary[0])
+        self.assertEqual(len(msgs), 14)   # 원본은 그대로
+
+    def test_current_question_kept_over_budget(self):
+        msgs = chat([("가" * 500, None)])
+        self.assertEqual(budget_messages(msgs, budget=50)[-1], msgs[-1])
+
+    def test_long_system_prompt_is_clipped(self):
+        msgs = chat([("질문", None)], system="재료 목록: " + ", ".join(["양파"] * 400))
+        out = budget_messages(msgs, budget=200)
+        self.assertLessEqual(message_tokens(out[:1]), 100)
+        self.assertTrue(out[0]["content"].endswith("양파…"))
+
+    def test_clip_to_tokens_cuts_at_separator(self):
+        self.assertEqual(clip_to_tokens("양파, 대파, 쪽파", 6), "양파, 대파…")
+        self.assertEqual(clip_to_tokens("양파", 10), "양파")
+
+
+# =============================================================================
+# 마감 시간 있는 GPT 호출 / 로컬 레시피 (hedge)
+# =============================================================================
+
+class HedgedCallTests(TestCase):
+    def test_result_in_time(self):
+        self.assertEqual(hedged_call(lambda: "gpt", deadline=5, fallback=lambda: "local"), "gpt")
+
+    def test_error_uses_fallback(self):
+        def boom():
+            raise RuntimeError("boom")
+
+        with self.assertLogs("food.services.hedge", "WARNING"):
+            self.assertEqual(hedged_call(boom, deadline=5, fallback=lambda: "local"), "local")
+
+    def test_late_result_goes_to_on_late(self):
+        release, late = threading.Event(), []
+        arrived = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return "gpt"
+
+        def on_late(value):
+            late.append(value)
+            arrived.set()
+
+        self.assertEqual(hedged_call(slow, deadline=0.01, fallback=lambda: "local", on_late=on_late), "local")
+        release.set()
+        self.assertTrue(arrived.wait(5))
+        self.assertEqual(late, ["gpt"])
+
+
+class LocalRecipeTextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_ingredients("두부", "대파", "된장", "애호박", "양파")
+        self.user, self.other = make_user("a"), make_user("b")
+
+    def test_reuses_own_saved_recipe(self):
+        desc = "필요한 재료:\n- 두부 1모\n- 대파(흰 부분) 1대\n- 된장 2큰술\n조리 방법:\n1) 끓인다"
+        SavedRecipe.objects.create(user=self.user, title="된장찌개", description=desc)
+        text = local_recipe_text(["두부", "대파", "된장"], user_id=self.user.id)
+        self.assertTrue(text.startswith("된장찌개\n"))
+        self.assertFalse(local_recipe_text(["두부", "대파", "된장"], user_id=self.other.id).startswith("된장찌개"))
+
+    def test_uses_analyzed_recipe_when_basic_ingredients_are_there(self):
+        remember_recipe_ingredients("애호박볶음", ["애호박"], ["양파", "대파"])
+        text = local_recipe_text(["애호박", "양파"])
+        self.assertTrue(text.startswith("애호박볶음\n"))
+        self.assertIn("- 양파", text)
+        self.assertNotIn("- 대파", text)
+
+    def test_fallback_template(self):
+        text = local_recipe_text(["두부"])
+        self.assertIn("필요한 재료:\n- 두부", text)
+        self.assertIn("조리 방법:", text)
+
+    @override_settings(FAKE_LLM={"latency": {"dist": "fixed", "value": 0.3}})
+    def test_call_gpt_answers_locally_past_deadline(self):
+        text = call_gpt(["애호박"], seed="hedge-test", deadline=0.01)
+        self.assertIn("필요한 재료:\n- 애호박", text)
+
+
+# =============================================================================
+# 작업별 모델 라우팅 (model_router)
+# =============================================================================
+
+class ModelRouterTests(TestCase):
+    small, large = model_router.MODEL_SMALL, model_router.MODEL_LARGE
+
+    def setUp(self):
+        model_router.stats.reset()
+        self.addCleanup(model_router.stats.reset)
+        self.calls = []
+
+    def create(self, answers):
+        def create(model):
+            self.calls.append(model)
+            return answers.get(model, "")
+        return create
+
+    def test_small_model_first(self):
+        text = model_router.complete("test_task", self.create({self.small: "ok"}))
+        self.assertEqual((text, self.calls), ("ok", [self.small]))
+
+    def test_invalid_small_answer_escalates_once(self):
+        create = self.create({self.small: "bad", self.large: "good"})
+        text = model_router.complete("test_task", create, validate=lambda t: t == "good")
+        self.assertEqual((text, self.calls), ("good", [self.small, self.large]))
+
+    def test_large_model_retries_only_with_escalate_prompt(self):
+        create = self.create({self.large: "bad"})
+        model_router.complete("test_task", create, validate=lambda t: False, input_chars=20000)
+        self.assertEqual(self.calls, [self.large])
+
+        text = model_router.complete("test_task", create, validate=lambda t: t == "fixed",
+                                     escalate=lambda m: "fixed", input_chars=20000)
+        self.assertEqual(text, "fixed")
+
+    def test_rules_pick_large_model(self):
+        self.assertEqual(model_router.choose_model("chat_cook", input_chars=7000), self.large)
+        self.assertEqual(model_router.choose_model("tip", input_chars=7000), self.small)
+        self.assertEqual(model_router.choose_model("tip", input_chars=5000, strict_json=True), self.large)
+
+    def test_failing_small_model_is_skipped_but_probed(self):
+        for _ in range(model_router.ROUTER_MIN_SAMPLES):
+            model_router.stats.record("tip", self.small, 0.1, False)
+        picks = [model_router.choose_model("tip") for _ in range(model_router.PROBE_EVERY)]
+        self.assertEqual(picks.count(self.small), 1)
+        self.assertEqual(picks[-1], self.small)
+
+
+# =============================================================================
+# 남은 재료 레시피 변형 캐시 (recipe_cache)
+# =============================================================================
+
+class RecipeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_key_normalizes_followup(self):
+        key = recipe_cache.variant_key("1-2", "매운 버전도 돼요?? ", version=1)
+        self.assertEqual(key, recipe_cache.variant_key("1-2", "매운  버전도 돼요", version=1))
+        self.assertNotEqual(key, recipe_cache.variant_key("1-2", "매운 버전도 돼요", version=2))
+        self.assertNotEqual(key, recipe_cache.variant_key("1-2", "", version=1))
+
+    def test_full_after_enough_fills(self):
+        key = recipe_cache.variant_key("1-2", version=1)
+        self.assertEqual(recipe_cache.lookup(key), (None, False))
+        recipe_cache.add_variant(key, "A")
+        recipe_cache.add_variant(key, "A")   # 같은 답은 한 번만 저장, 채운 횟수로는 셈
+        self.assertEqual(recipe_cache.lookup(key), ("A", False))
+        recipe_cache.add_variant(key, "B")
+        text, full = recipe_cache.lookup(key)
+        self.assertIn(text, {"A", "B"})
+        self.assertTrue(full)
+        self.assertEqual(cache.get(key)["variants"], ["A", "B"])
+
+    def test_variants_are_capped(self):
+        key = recipe_cache.variant_key("1-2", version=1)
+        for i in range(recipe_cache.RECIPE_VARIANTS_PER_KEY + 2):
+            recipe_cache.add_variant(key, f"v{i}")
+        self.assertEqual(len(cache.get(key)["variants"]), recipe_cache.RECIPE_VARIANTS_PER_KEY)
+        self.assertNotIn("v0", cache.get(key)["variants"])
+
+    def test_call_gpt_serves_full_key_without_gpt(self):
+        key = recipe_cache.variant_key("seed-x", version=RECIPE_PROMPT_VERSION)
+        for i in range(recipe_cache.RECIPE_VARIANTS_PER_KEY):
+            recipe_cache.add_variant(key, f"저장된 레시피 {i}")
+        with mock.patch.object(model_router, "complete") as complete:
+            self.assertTrue(call_gpt(["양파"], seed="seed-x").startswith("저장된 레시피"))
+        complete.assert_not_called()
+
+    def test_call_gpt_adds_new_variant(self):
+        text = call_gpt(["양파"], seed="seed-y")
+        self.assertEqual(recipe_cache.lookup(recipe_cache.variant_key("seed-y", version=RECIPE_PROMPT_VERSION)),
+                         (text, False))
+
+
+# =============================================================================
+# GPT 호출 텔레메트리 (llm_telemetry)
+# =============================================================================
+
+class LlmTelemetryTests(TestCase):
+    flush = staticmethod(llm_telemetry.flush)
+
+    def setUp(self):
+        # 테스트마다 빈 버퍼, 저장 스레드는 멈춤 (이미 떠 있는 스레드의 flush도 no-op)
+        patches = [
+            mock.patch.object(llm_telemetry, "_buffer", []),
+            mock.patch.object(llm_telemetry, "_wake", threading.Event()),
+            mock.patch.object(llm_telemetry, "_ensure_flusher"),
+            mock.patch.object(llm_telemetry, "flush", return_value=0),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        model_router.stats.reset()
+
+    def test_records_are_buffered_until_flush(self):
+        llm_telemetry.record("tip", model="m", latency=0.25, prompt_tokens=3)
+        llm_telemetry.record_cache_hit("tip")
+        self.assertFalse(LlmCall.objects.exists())
+        self.assertEqual(self.flush(), 2)
+        self.assertEqual(list(LlmCall.objects.order_by("id").values_list("latency_ms", "cache_hit")),
+                         [(250, False), (0, True)])
+        self.assertEqual(self.flush(), 0)
+
+    def test_full_batch_wakes_flusher(self):
+        for _ in range(llm_telemetry.LLM_TELEMETRY_BATCH - 1):
+            llm_telemetry.record("tip")
+        self.assertFalse(llm_telemetry._wake.is_set())
+        llm_telemetry.record("tip")
+        self.assertTrue(llm_telemetry._wake.is_set())
+
+    def test_failed_flush_requeues_rows(self):
+        llm_telemetry.record("tip")
+        with mock.patch.object(LlmCall.objects, "bulk_create", side_effect=RuntimeError("db down")), \
+                self.assertLogs("food.services.llm_telemetry", "ERROR"):
+            self.assertEqual(self.flush(), 0)
+        self.assertEqual(len(llm_telemetry._buffer), 1)
+        self.assertEqual(self.flush(), 1)
+
+    def test_complete_records_model_tokens_and_retries(self):
+        model_router.complete("tip", lambda m: "bad" if m == model_router.MODEL_SMALL else "good",
+                              validate=lambda t: t == "good")
+        self.flush()
+        call = LlmCall.objects.get()
+        self.assertEqual((call.task, call.model, call.retries, call.parse_ok),
+                         ("tip", model_router.MODEL_LARGE, 1, True))
+
+    def test_usage_from_instrumented_client(self):
+        fake = llm_telemetry.instrument_client(FakeLLMClient())
+        llm_telemetry.reset_usage()
+        ask(fake, "칭찬 두 줄")
+        prompt, completion = llm_telemetry.take_usage()
+        self.assertGreater(prompt, 0)
+        self.assertGreater(completion, 0)
+        self.assertEqual(llm_telemetry.take_usage(), (0, 0))
+
+    def test_pinned_model_call_is_recorded_without_escalation(self):
+        calls = []
+        model_router.complete("tip", lambda m: calls.append(m) or "bad", validate=lambda t: False,
+                              model=model_router.MODEL_SMALL)
+        self.assertEqual(calls, [model_router.MODEL_SMALL])
+
+        basic, _ = extract_ingredients_from_recipe_v2("김치찌개", model="gpt-pinned")
+        self.assertTrue(basic)
+        self.flush()
+        self.assertEqual(list(LlmCall.objects.order_by("id").values_list("task", "model", "retries")),
+                         [("tip", model_router.MODEL_SMALL, 0), ("recipe_ingredients_v2", "gpt-pinned", 0)])
+
+
+# =============================================================================
+# 재료 카탈로그 (catalog)
+# =============================================================================
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        make_ingredients("양파", "대파", "Tofu")
+
+    def test_resolve_normalizes_spacing_and_case(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog.resolve("대 파"), "대파")
+        self.assertEqual(catalog.resolve("tofu"), "Tofu")
+        self.assertIsNone(catalog.resolve("감자"))
+        self.assertEqual(normalize_key(" 대 파 "), "대파")
+
+    def test_filter_names_keeps_order_and_drops_unknown(self):
+        self.assertEqual(get_catalog().filter_names(["양파", "감자", "양 파", "대파"]), ["양파", "대파"])
+
+    def test_invalidate_picks_up_new_rows(self):
+        before = get_catalog()
+        make_ingredients("감자")
+        after = get_catalog()
+        self.assertNotEqual(before.version, after.version)
+        self.assertIn("감자", after)
+        self.assertEqual(after.name_for(after.id_for("감자")), "감자")
+
+
+# =============================================================================
+# 재료 검색 (ingredient_search)
+# =============================================================================
+
+class IngredientSearchTests(TestCase):
+    def setUp(self):
+        make_ingredients("양파", "양배추", "대파", "쪽파", "닭갈비", "닭가슴살")
+
+    def test_jamo_and_choseong(self):
+        self.assertEqual(to_choseong("양파"), "ㅇㅍ")
+        self.assertEqual(to_jamo("닭"), "ㄷㅏㄹㄱ")
+
+    def test_prefix_while_typing(self):
+        self.assertEqual(search_ingredients("양ㅍ")[0], "양파")
+        self.assertEqual(search_ingredients("닭가")[:2], ["닭갈비", "닭가슴살"])
+
+    def test_exact_match_first(self):
+        self.assertEqual(search_ingredients("양파")[0], "양파")
+
+    def test_choseong_and_substring(self):
+        self.assertEqual(search_ingredients("ㅇㅍ"), ["양파"])
+        self.assertEqual(set(search_ingredients("파")), {"양파", "대파", "쪽파"})
+
+    def test_typo_and_exclude(self):
+        self.assertIn("양파", search_ingredients("양퍄"))
+        self.assertNotIn("양파", search_ingredients("파", exclude=["양파"]))
+        self.assertEqual(search_ingredients(""), [])
+
+
+class IngredientAutocompleteApiTests(TestCase):
+    def setUp(self):
+        make_ingredients("양파", "양배추", "대파")
+        self.user = make_user()
+        flow = FlowStore(self.user)
+        flow["extra_selected"] = ["양파"]
+        flow.save()
+        self.client.force_login(self.user)
+        self.url = reverse("food:ingredient_autocomplete")
+
+    def get(self, **params):
+        return self.client.get(self.url, {"scope": "recipe", **params})
+
+    def test_results_skip_selected(self):
+        data = self.get(q="양").json()
+        self.assertEqual([i["name"] for i in data["items"]], ["양배추"])
+        self.assertEqual(self.get(q="").json()["items"], [])
+
+    def test_etag_and_cache_headers(self):
+        sel = self.get(q="양").json()["sel"]
+        resp = self.get(q="양", sel=sel)
+        self.assertTrue(resp["Cache-Control"].startswith("private, max-age="))
+        again = self.client.get(self.url, {"scope": "recipe", "q": "양", "sel": sel}, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_stale_sel_is_not_cached(self):
+        self.assertEqual(self.get(q="양", sel="old")["Cache-Control"], "no-store")
+
+    def test_bad_scope_and_login(self):
+        self.assertEqual(self.get(q="양", scope="nope").status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.get(q="양").status_code, 302)
+
+
+# =============================================================================
+# 동네 인기 검색어 (trending)
+# =============================================================================
+
+class HeavyHittersTests(TestCase):
+    def test_sketch_never_underestimates(self):
+        sketch = trending.CountMinSketch(width=16, depth=2)
+        for i in range(200):
+            sketch.add(f"t{i % 40}")
+        self.assertTrue(all(sketch.estimate(f"t{i}") >= 5 for i in range(40)))
+
+    def test_keeps_top_k_and_pending_deltas(self):
+        hh = trending.HeavyHitters(k=2)
+        for term, n in [("양파", 5), ("대파", 3), ("감자", 1), ("두부", 4)]:
+            hh.add(term, n)
+        self.assertEqual(set(hh.top), {"양파", "두부"})
+        hh.mark_flushed(hh.pending())
+        hh.add("양파", 2)
+        self.assertEqual(hh.pending(), {"양파": 2})
+
+
+class TrendingTests(TestCase):
+    flush = staticmethod(trending.flush)
+
+    def setUp(self):
+        cache.clear()
+        make_ingredients("양파", "대파")
+        patches = [
+            mock.patch.object(trending, "_partitions", {}),
+            mock.patch.object(trending, "_ensure_flusher"),
+            mock.patch.object(trending, "flush", return_value=0),   # 이미 떠 있는 저장 스레드는 no-op
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.user = SimpleNamespace(addr_level3="망원동")
+
+    def test_only_catalog_terms_are_counted(self):
+        trending.record(self.user, "양 파")
+        trending.record(self.user, "아무말")
+        self.assertEqual(list(trending._partitions.values())[0].top, {"양파": 1})
+
+    def test_flush_adds_weighted_deltas_and_refreshes_popular(self):
+        trending.record(self.user, "양파")
+        trending.record(self.user, "대파", kind="cart")
+        self.assertEqual(self.flush(), 2)
+        trending.record(self.user, "양파")
+        trending.record(self.user, "양파")
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(dict(SearchTrend.objects.values_list("term", "count")), {"양파": 3, "대파": 2})
+        self.assertEqual(trending.popular_terms("망원동"), ["양파", "대파"])
+        self.assertEqual(trending.popular_terms("합정동"), [])
+
+    def test_finished_window_is_dropped_after_flush(self):
+        old = trending.window_start() - trending.TRENDING_WINDOW_SECONDS
+        trending._partitions[("망원동", old)] = hh = trending.HeavyHitters()
+        hh.add("양파")
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(trending._partitions, {})
+
+    def test_failed_flush_keeps_finished_window(self):
+        old = trending.window_start() - trending.TRENDING_WINDOW_SECONDS
+        trending._partitions[("망원동", old)] = hh = trending.HeavyHitters()
+        hh.add("양파")
+        with mock.patch.object(SearchTrend.objects, "create", side_effect=RuntimeError("db down")), \
+                self.assertLogs("food.services.trending", "ERROR"):
+            self.assertEqual(self.flush(), 0)
+        self.assertIn(("망원동", old), trending._partitions)
+        self.assertEqual(self.flush(), 1)
+
+
+# =============================================================================
+# 장바구니 일괄 변경 API (cart_batch_api)
+# =============================================================================
+
+class CartBatchApiTests(TestCase):
+    def setUp(self):
+        make_ingredients("양파", "대파", "두부")
+        self.user = make_user()
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(trending, "record")
+        self.record = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, scope, ops, version=None):
+        body = {"scope": scope, "ops": [{"op": op, "name": name} for op, name in ops]}
+        if version is not None:
+            body["version"] = version
+        return self.client.post(reverse("food:cart_batch_api"), json.dumps(body), content_type="application/json")
+
+    def names(self, resp):
+        return [i["name"] for i in resp.json()["items"]]
+
+    def test_ingredient_scope_writes_cart_in_one_request(self):
+        resp = self.post("ingredient", [("add", "양파"), ("add", "대 파"), ("add", "감자"), ("remove", "양파"),
+                                        ("add", "양파"), ("add", "두부"), ("remove", "두부")], version=0)
+        data = resp.json()
+        self.assertEqual((data["added"], data["unknown"], data["version"]), (["대파", "양파"], ["감자"], 1))   # 마지막 조작 순
+        self.assertEqual(self.names(resp), ["대파", "양파"])
+        self.assertEqual(ShoppingList.objects.get(user=self.user).item_count, 2)
+        self.assertEqual(FlowStore(self.user).get("optional_selected"), ["대파", "양파"])
+        self.assertEqual([c.kwargs["kind"] for c in self.record.call_args_list], ["cart", "cart"])
+
+    def test_ingredient_scope_version_conflict(self):
+        self.post("ingredient", [("add", "양파")], version=0)
+        resp = self.post("ingredient", [("add", "대파")], version=0)
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual((self.names(resp), resp.json()["version"]), (["양파"], 1))
+
+    def test_selection_scope_uses_flow_version(self):
+        self.assertEqual(self.post("recipe", [("add", "양파")], version=0).json()["version"], 1)
+        resp = self.post("recipe", [("add", "양파"), ("remove", "없음")], version=1)
+        self.assertEqual((resp.json()["version"], resp.json()["added"]), (1, []))   # 바뀐 게 없으면 그대로
+        self.assertEqual(self.post("recipe", [("add", "대파")], version=0).status_code, 409)
+
+    def test_leftover_form_views_bump_version(self):
+        self.client.post(reverse("food:leftover_add_extra_ingredient"), {"ingredient": "양파"})
+        self.assertEqual(self.post("leftover", [("add", "대파")], version=0).status_code, 409)
+        resp = self.post("leftover", [("add", "대파")], version=1)
+        self.assertEqual((self.names(resp), resp.json()["version"]), (["대파", "양파"], 2))
+
+        self.client.post(reverse("food:leftover_delete_extra_ingredient", args=["양파"]))
+        self.assertEqual(self.post("leftover", [("remove", "대파")], version=2).status_code, 409)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.post("nope", []).status_code, 400)
+        self.assertEqual(self.post("recipe", [("toggle", "양파")]).status_code, 400)
+
+
+# =============================================================================
+# 장바구니 쓰기 (cart_writer)
+# =============================================================================
+
+class CartWriterTests(TestCase):
+    def setUp(self):
+        make_ingredients("양파", "대파", "두부")
+        self.sl = ShoppingList.objects.create(user=make_user())
+
+    def names(self):
+        return sorted(ShoppingListIngredient.objects.filter(shopping_list=self.sl)
+                      .values_list("ingredient__name", flat=True))
+
+    def test_add_and_remove_bump_version(self):
+        change = cart_writer.add_names(self.sl, ["양파", "대 파", "감자"])
+        self.assertEqual(change.added, ["양파", "대파"])
+        self.assertEqual(change.unknown, ["감자"])
+        self.assertEqual(change.version, 1)
+        self.assertEqual(self.names(), ["대파", "양파"])
+
+        change = cart_writer.remove_names(self.sl, ["양파"])
+        self.assertEqual(change.removed, ["양파"])
+        self.assertEqual(change.names, ["대파"])
+        self.sl.refresh_from_db()
+        self.assertEqual((self.sl.version, self.sl.item_count), (2, 1))
+
+    def test_noop_keeps_version(self):
+        cart_writer.add_names(self.sl, ["양파"])
+        change = cart_writer.add_names(self.sl, ["양파"])
+        self.assertFalse(change.changed)
+        self.assertEqual(change.version, 1)
+
+    def test_replace(self):
+        cart_writer.add_names(self.sl, ["양파", "대파"])
+        change = cart_writer.replace_names(self.sl, ["대파", "두부"])
+        self.assertEqual(change.removed, ["양파"])
+        self.assertEqual(self.names(), ["대파", "두부"])
+
+    def test_add_wins_over_remove(self):
+        change = cart_writer.apply(self.sl, add=["양파"], remove=["양파"])
+        self.assertEqual(change.names, ["양파"])
+
+    def test_version_conflict(self):
+        cart_writer.add_names(self.sl, ["양파"])
+        with self.assertRaises(cart_writer.CartVersionConflict) as ctx:
+            cart_writer.apply(self.sl, add=["대파"], expected_version=0)
+        self.assertEqual(ctx.exception.current.names, ["양파"])
+        self.assertEqual(ctx.exception.current.version, 1)
+        self.assertEqual(self.names(), ["양파"])
+
+
+# =============================================================================
+# 공통 헤더 컨텍스트 (장바구니 수 / 보유 포인트)
+# =============================================================================
+
+class HeaderContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_ingredients("양파", "대파")
+        self.user = make_user()
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_anonymous_gets_nothing(self):
+        self.request.user = AnonymousUser()
+        self.assertEqual(header(self.request), {})
+
+    def test_lazy_and_computed_once_per_request(self):
+        with self.assertNumQueries(0):
+            ctx = header(self.request)
+        cart_writer.add_names(ShoppingList.objects.create(user=self.user), ["양파", "대파"])
+        with self.assertNumQueries(1):
+            self.assertEqual(ctx["cart_items_count"](), 2)
+            self.assertEqual(ctx["items_count"](), 2)
+
+    def test_point_cache_follows_user_point_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            point = UserPoint.objects.create(user=self.user, total_point=100)
+        self.assertEqual(header(self.request)["total_point"](), 100)
+        with self.assertNumQueries(0):
+            self.assertEqual(header(self.request)["total_point"](), 100)
+        with self.captureOnCommitCallbacks(execute=True):
+            point.total_point = 250
+            point.save()
+        self.assertEqual(header(self.request)["total_point"](), 250)
+
+
+# =============================================================================
+# 화면 흐름 상태 (flow_state)
+# =============================================================================
+
+class FlowStoreTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def test_defaults(self):
+        flow = FlowStore(self.user)
+        self.assertEqual(flow.get("basic"), [])
+        self.assertEqual(flow.get("extra_selected_version"), 0)
+        self.assertIsNone(flow.get("chat_history"))
+        self.assertNotIn("chat_history", flow)
+        with self.assertRaises(KeyError):
+            flow.get("unknown")
+
+    def test_save_only_changed_fields(self):
+        flow = FlowStore(self.user)
+        flow.get("chat_history")
+        self.assertEqual(flow.save(), set())
+        flow["chat_history"] = [{"role": "user", "content": "안녕"}]
+        flow["optional_selected"] = ["양파"]
+        self.assertEqual(flow.save(), {"chat_history", "optional_selected"})
+
+        again = FlowStore(self.user)
+        self.assertEqual(again["chat_history"][0]["content"], "안녕")
+        self.assertEqual(again.get("optional_selected"), ["양파"])
+        self.assertEqual(FlowState.objects.filter(user=self.user).count(), 2)   # 사용자 행 + 장바구니 행
+
+    def test_in_place_change_is_saved(self):
+        flow = FlowStore(self.user)
+        flow["recipe_chat"] = []
+        flow.save()
+        flow = FlowStore(self.user)
+        flow["recipe_chat"].append({"role": "assistant", "content": "x"})
+        self.assertEqual(flow.save(), {"recipe_chat"})
+        self.assertEqual(len(FlowStore(self.user)["recipe_chat"]), 1)
+
+    def test_cart_fields_follow_active_list(self):
+        flow = FlowStore(self.user)
+        flow["basic"] = ["양파"]
+        flow.save()
+        ShoppingList.objects.filter(user=self.user).update(is_done=True)
+        self.assertEqual(FlowStore(self.user).get("basic", []), [])
+
+    def test_pack_roundtrip(self):
+        big = {"x": "가" * 500}
+        self.assertEqual(pack(big)[:1], b"z")
+        self.assertEqual(pack([1])[:1], b"j")
+        self.assertEqual(unpack(pack(big)), big)
+        self.assertIsNone(unpack(b""))
+
+    def test_clear_user_flow_keeps_cart_rows(self):
+        flow = FlowStore(self.user)
+        flow["chat_history"] = [{"role": "user", "content": "x"}]
+        flow["basic"] = ["양파"]
+        flow.save()
+        self.assertEqual(clear_user_flow(self.user), 1)
+        self.assertEqual(FlowState.objects.get(user=self.user).basic, ["양파"])
+
+    def test_logout_clears_user_flow(self):
+        flow = FlowStore(self.user)
+        flow["chat_history"] = [{"role": "user", "content": "x"}]
+        flow.save()
+        self.client.force_login(self.user)
+        self.client.get("/accounts/logout/")
+        self.assertFalse(FlowState.objects.filter(user=self.user, shopping_list=None).exists())
+
+
+# =============================================================================
+# 세션 저장소 (session_store)
+# =============================================================================
+
+class SessionStoreTests(TestCase):
+    flush = staticmethod(session_store.flush)
+
+    def setUp(self):
+        cache.clear()
+        patches = [
+            mock.patch.object(session_store, "_pending", {}),
+            mock.patch.object(session_store, "_ensure_flusher"),
+            mock.patch.object(session_store, "flush", return_value=0),   # 이미 떠 있는 저장 스레드는 no-op
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        store = session_store.SessionStore()
+        store["cart"] = ["양파"]
+        store.save(must_create=True)
+        self.key = store.session_key
+
+    def stored(self):
+        return Session.objects.get(session_key=self.key).get_decoded()
+
+    def test_serializer_roundtrip_is_utf8(self):
+        ser = session_store.FastJSONSerializer()
+        data = ser.dumps({"name": "양파", "n": 1})
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(ser.loads(data), {"name": "양파", "n": 1})
+        self.assertEqual(ser.loads('{"name":"양파"}'.encode("utf-8")), {"name": "양파"})
+
+    def test_unchanged_session_is_not_saved(self):
+        store = session_store.SessionStore(self.key)
+        store["cart"] = ["양파"]   # 같은 값을 다시 넣어 modified만 켜진 경우
+        with self.assertNumQueries(0):
+            store.save()
+        store["cart"] = ["양파", "대파"]
+        store.save()
+        self.assertEqual(self.stored()["cart"], ["양파", "대파"])
+
+    def test_write_behind_updates_cache_now_and_db_on_flush(self):
+        with mock.patch.object(session_store.SessionStore, "write_behind", 5):
+            store = session_store.SessionStore(self.key)
+            store["cart"] = ["대파"]
+            store.save()
+        self.assertEqual(self.stored()["cart"], ["양파"])
+        self.assertEqual(session_store.SessionStore(self.key)["cart"], ["대파"])   # 캐시에서 읽음
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.stored()["cart"], ["대파"])
+
+    def test_deleted_session_is_not_resurrected(self):
+        with mock.patch.object(session_store.SessionStore, "write_behind", 5):
+            store = session_store.SessionStore(self.key)
+            store["cart"] = ["대파"]
+            store.save()
+            store.delete()
+        self.assertEqual(self.flush(), 0)
+        self.assertFalse(Session.objects.filter(session_key=self.key).exists())
+
+
+# =============================================================================
+# 메인 배너 캐시 (banner_cache)
+# =============================================================================
+
+class BannerCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(renditions, "generate_async")   # 리사이즈본 생성은 이 테스트와 무관
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = SimpleNamespace(addr_level3="망원동")
+
+    def add(self, title, category="mart", dong=""):
+        with self.captureOnCommitCallbacks(execute=True):
+            return FoodBanner.objects.create(title=title, category=category, dong=dong, image=f"banners/{title}.jpg")
+
+    def titles(self, tab=None, user=None):
+        return [b["title"] for b in banner_cache.banners_for(user or self.user, tab)]
+
+    def test_dong_category_and_order(self):
+        self.add("전체 마트")
+        self.add("망원 카페", "cafe", "망원동")
+        self.add("합정 마트", dong="합정동")
+        self.add("망원 마트", dong="망원동")
+        self.assertEqual(self.titles(), ["망원 마트", "망원 카페", "전체 마트"])
+        self.assertEqual(self.titles("mart"), ["망원 마트", "전체 마트"])
+        self.assertEqual(self.titles(user=SimpleNamespace(addr_level3="")), ["전체 마트"])
+
+    def test_cached_until_banner_changes(self):
+        banner = self.add("전체 마트")
+        self.titles()
+        key = banner_cache.fragment_key(self.user, None)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles(), ["전체 마트"])
+
+        self.add("새 배너")
+        self.assertEqual(self.titles(), ["새 배너", "전체 마트"])
+        self.assertNotEqual(banner_cache.fragment_key(self.user, None), key)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            banner.is_active = False
+            banner.save()
+        self.assertEqual(self.titles(), ["새 배너"])
+
+
+# =============================================================================
+# 이미지 리사이즈본 (renditions / responsive_img)
+# =============================================================================
+
+class RenditionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media, MEDIA_URL="/media/")
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(media, "ingredients"))
+        self.src = os.path.join(media, "ingredients", "onion.png")
+        Image.new("RGBA", (400, 200), (255, 0, 0, 128)).save(self.src)
+        self.name = "ingredients/onion.png"
+
+    def render(self, image, **kwargs):
+        args = " ".join(f'{k}="{v}"' for k, v in kwargs.items())
+        return Template("{% load images %}{% responsive_img image " + args + " %}").render(Context({"image": image}))
+
+    def test_render_file_never_upscales(self):
+        widths, width = renditions.render_file(self.src)
+        self.assertEqual((widths, width), ([96, 160, 320], 400))
+        self.assertTrue(os.path.exists(os.path.join(os.path.dirname(self.src), "_r", "onion.png.320w.webp")))
+        self.assertEqual(renditions.rendition_name(self.name, 96, "jpg"), "ingredients/_r/onion.png.96w.jpg")
+
+    def test_plain_img_without_renditions(self):
+        html = self.render("/media/" + self.name, alt="양파", sizes="48px")
+        self.assertEqual(html, '<img src="/media/ingredients/onion.png" alt="양파" decoding="async" loading="lazy">')
+
+    def test_picture_with_srcset_after_generate(self):
+        self.assertEqual(renditions.generate(self.name), [96, 160, 320])
+        html = self.render("/media/" + self.name, alt="양파", sizes="48px", **{"class": "item-pic"})
+        self.assertTrue(html.startswith('<picture><source type="image/webp" srcset="/media/ingredients/_r/onion.png.96w.webp 96w'))
+        self.assertIn("/media/ingredients/onion.png 400w", html)   # jpg 후보 마지막은 원본
+        self.assertIn('class="item-pic"', html)
+
+    def test_manifest_from_files_and_delete(self):
+        renditions.render_file(self.src)
+        self.assertEqual(renditions.manifest(self.name), ([96, 160, 320], 400))
+        renditions.delete_for(self.name)
+        self.assertEqual(renditions.manifest(self.name), ([], 0))
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(self.src), "_r", "onion.png.96w.jpg")))
+
+
+# =============================================================================
+# 미리 압축한 정적 파일 (static_storage / PrecompressedStaticMiddleware)
+# =============================================================================
+
+CSS = b"body { color: #333; }\n" * 100
+
+
+class PrecompressedStaticTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        os.makedirs(os.path.join(self.root, "css"))
+        for name in ("css/app.css", "css/app.0123456789ab.css"):
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(CSS)
+        with override_settings(STATIC_ROOT=self.root):
+            self.middleware = PrecompressedStaticMiddleware(lambda request: HttpResponse("next", status=404))
+        self.middleware._hashed = {"css/app.0123456789ab.css"}
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        self.assertTrue(storage._compress("css/app.css"))
+        self.assertTrue(storage._compress("css/app.0123456789ab.css"))
+        with open(os.path.join(self.root, "css", "app.css.br"), "wb") as f:
+            f.write(b"br-bytes")   # brotli 모듈이 없어도 선택 순서 확인용
+
+    def get(self, path, encoding="", **headers):
+        return self.middleware(RequestFactory().get(path, HTTP_ACCEPT_ENCODING=encoding, **headers))
+
+    def test_compress_writes_gzip_only_when_worth_it(self):
+        with open(os.path.join(self.root, "css", "app.css.gz"), "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), CSS)
+        with open(os.path.join(self.root, "css", "tiny.css"), "wb") as f:
+            f.write(b"a{}")
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        self.assertFalse(storage._compress("css/tiny.css"))
+        self.assertFalse(storage._compress("css/app.png"))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "css", "tiny.css.gz")))
+
+    def test_picks_encoding_from_accept_encoding(self):
+        resp = self.get("/static/css/app.css", "gzip, deflate, br")
+        self.assertEqual((resp["Content-Encoding"], b"".join(resp.streaming_content)), ("br", b"br-bytes"))
+        resp = self.get("/static/css/app.css", "gzip;q=1.0")
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(resp.streaming_content)), CSS)
+        resp = self.get("/static/css/app.css")
+        self.assertFalse(resp.has_header("Content-Encoding"))
+        self.assertEqual(resp["Content-Type"], "text/css")
+        self.assertEqual(resp["Vary"], "Accept-Encoding")
+
+    def test_cache_control_and_etag(self):
+        hashed = self.get("/static/css/app.0123456789ab.css", "gzip")
+        self.assertEqual(hashed["Cache-Control"], "public, max-age=31536000, immutable")
+        plain = self.get("/static/css/app.css", "gzip")
+        self.assertEqual(plain["Cache-Control"], "public, max-age=3600")
+        self.assertNotEqual(plain["ETag"], self.get("/static/css/app.css")["ETag"])   # 인코딩별 ETag
+        again = self.get("/static/css/app.css", "gzip", HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_other_requests_pass_through(self):
+        self.assertEqual(self.get("/static/css/missing.css").content, b"next")
+        self.assertEqual(self.get("/static/../settings.py").content, b"next")
+        self.assertEqual(self.get("/food/").content, b"next")
+        post = self.middleware(RequestFactory().post("/static/css/app.css"))
+        self.assertEqual(post.content, b"next")
+
+
+# =============================================================================
+# 저장 레시피 전문 검색 (recipe_search)
+# =============================================================================
+
+class RecipeSearchTests(TestCase):
+    def setUp(self):
+        recipe_search._ready = False   # 테스트 DB마다 색인 테이블을 새로 만듦
+        recipe_search.ensure_index(backfill=False)
+        self.user, self.other = make_user("a"), make_user("b")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stew = SavedRecipe.objects.create(user=self.user, title="김치찌개", description="묵은지와 돼지고기")
+            self.soup = SavedRecipe.objects.create(user=self.user, title="된장국", description="두부 <b>조금</b>")
+            SavedRecipe.objects.create(user=self.other, title="김치볶음밥", description="김치")
+
+    def titles(self, q):
+        return [h.recipe.title for h in recipe_search.search(self.user, q)]
+
+    def test_gram_text(self):
+        self.assertEqual(recipe_search.gram_text("김치찌개"), "김치 치찌 찌개 개")
+
+    def test_substring_and_single_char(self):
+        self.assertEqual(self.titles("찌개"), ["김치찌개"])
+        self.assertEqual(self.titles("국"), ["된장국"])
+        self.assertEqual(self.titles("묵은지"), ["김치찌개"])
+        self.assertEqual(self.titles("없는말"), [])
+
+    def test_only_own_recipes(self):
+        self.assertEqual(self.titles("김치"), ["김치찌개"])
+
+    def test_follows_update_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soup.title = "된장찌개"
+            self.soup.save()
+        self.assertEqual(set(self.titles("찌개")), {"김치찌개", "된장찌개"})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stew.delete()
+        self.assertEqual(self.titles("찌개"), ["된장찌개"])
+
+    def test_highlight_escapes_source(self):
+        hit = recipe_search.search(self.user, "두부")[0]
+        self.assertIn("<mark>두부</mark>", hit.snippet_html)
+        self.assertIn("&lt;b&gt;", hit.snippet_html)
+
+    def test_rebuild(self):
+        self.assertEqual(recipe_search.rebuild(), 3)
+        self.assertEqual(self.titles("찌개"), ["김치찌개"])
@@ -27,6 +27,7 @@ urlpatterns = [
     path('ingredient/result/', ingredient_result_view, name='ingredient_result'),
     path("ingredient/idea/", ingredient_idea_page, name="ingredient_idea_page"),
     path("ingredient/idea/api/", ingredient_idea_api, name="ingredient_idea_api"),
+    path("ingredient/autocomplete/", ingredient_autocomplete_api, name="ingredient_autocomplete"),
 
     # 3. 남은 식재료로 요리 추천받기
     path("leftover/select/", select_recent_ingredients, name="select_recent_ingredients"),
@@ -46,4 +47,8 @@ urlpatterns = [
 
     #4. 장바구니
     path("cart/", cart_view, name="cart_view"),
+    path("cart/api/", cart_batch_api, name="cart_batch_api"),
+
+    # 백그라운드 GPT 작업 상태(폴링)
+    path("jobs/<uuid:job_id>/", job_status_api, name="job_status"),
 ]
\ No newline at end of file
@@ -5,19 +5,24 @@ from django.shortcuts import redirect
 from django.urls import reverse
 from django.apps import apps
 from django.conf import settings
-from openai import OpenAI
-from .models import Ingredient, FoodBanner
-from market.models import ShoppingList, ShoppingListIngredient
+from django.core.cache import cache
+from .models import Ingredient, SavedRecipe
+from .services import banner_cache, cart_writer, llm_telemetry, model_router, recipe_cache
+from .services.catalog import get_catalog
+from .services.ingredient_search import search_ingredients
+from .services.llm_backend import get_llm_client
+from .services.hedge import deadline_for, hedged_call
+from market.models import ShoppingList
 from point.models import UserPoint
 
 
 
 # =============================================================================
 # A. 외부 클라이언트/설정
-#    - OpenAI 클라이언트 초기화
+#    - LLM 클라이언트 초기화 (settings.LLM_BACKEND: openai | fake)
 # =============================================================================
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client = get_llm_client()
 
 
 # =============================================================================
@@ -86,6 +91,14 @@ def redirect_with_query(url_name: str, param: str, value: Optional[str]):
         return redirect(f"{base}?{urlencode({param: value})}")
     return redirect(base)
 
+def wants_json(request) -> bool:
+    """
+    AJAX(fetch) 요청인지 판별. X-Requested-With 헤더 또는 Accept: application/json.
+    """
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return True
+    return "application/json" in (request.headers.get("Accept") or "")
+
 
 # =============================================================================
 # C. 화면/텍스트 유틸
@@ -165,30 +178,22 @@ def ids_seed(ids: Sequence[int | str]) -> str:
 #    - 모델 조회/정렬 (변경 없음)
 # =============================================================================
 
-def search_ingredients_by_name(query: str, exclude_names: Optional[Sequence[str]] = None):
+def search_ingredients_by_name(query: str, exclude_names: Optional[Sequence[str]] = None) -> List[Dict[str, Optional[str]]]:
     """
-    Ingredient 이름 부분일치 검색 + 지정된 이름은 제외.
-    읽기 전용이며, 아무것도 못 찾으면 빈 QuerySet.
+    재료 검색(메모리 인덱스: 접두/초성/부분일치/오타 허용) + 지정된 이름은 제외.
+    순위순 [{"name", "image_url"}], 아무것도 못 찾으면 빈 리스트.
     """
-    qs = Ingredient.objects.all()
-    if query:
-        qs = qs.filter(name__icontains=query)
-    if exclude_names:
-        qs = qs.exclude(name__in=list(exclude_names))
-    return qs.order_by("name")
+    if not query:
+        return []
+    names = search_ingredients(query, exclude=exclude_names or ())
+    return get_catalog().to_ctx(names)
 
 def get_banners_for_main(user, tab: Optional[str], limit: int = 5):
     """
-    메인 배너 조회. FoodBanner 커스텀 매니저 사용(읽기 전용).
+    메인 배너 조회. (동, 카테고리)별 캐시(banner_cache)에서 읽음, 캐시 미스 때만 쿼리 1번.
+    [{"title", "link_url", "image_url", "created_at"}]
     """
-    qs = FoodBanner.objects.active().for_user(user)
-    if tab:
-        # 매니저에 for_category가 없으면 AttributeError 가능성 → 방어적으로 처리
-        try:
-            qs = qs.for_category(tab)
-        except Exception:
-            pass
-    return list(qs.order_by("-created_at")[: int(limit) if limit else 5])
+    return banner_cache.banners_for(user, tab, int(limit) if limit else 5)
 
 def ingredients_qs_to_ctx(qs) -> List[Dict[str, Optional[str]]]:
     """
@@ -221,16 +226,17 @@ def get_shopping_list_ingredients(shopping_list):
     ).order_by('name')
 
 def add_ingredients_to_list(shopping_list, ingredient_names):
-    added = []
-    for name in ingredient_names:
-        ing, _ = Ingredient.objects.get_or_create(name=name)
-        if not ShoppingListIngredient.objects.filter(shopping_list=shopping_list, ingredient=ing).exists():
-            ShoppingListIngredient.objects.create(shopping_list=shopping_list, ingredient=ing)
-        added.append({
-            'name': ing.name,
-            'image_url': ing.image.url if ing.image else None
-        })
-    return added
+    """
+    장바구니에 재료 추가(cart_writer 경유). 카탈로그에 없는 이름은 만들지 않고 건너뜀.
+    담겨 있는(원래 있던 것 포함) 요청 재료들을 [{"name", "image_url"}]로 반환.
+    """
+    catalog = get_catalog()
+    cart_writer.add_names(shopping_list, ingredient_names)
+    return catalog.to_ctx(catalog.filter_names(ingredient_names))
+
+def bump_selection_version(store, key: str) -> None:
+    """선택 목록(key)이 바뀌었음을 표시. store는 request.flow (세션과 같은 dict 인터페이스)."""
+    store[f"{key}_version"] = store.get(f"{key}_version", 0) + 1
 
 def get_active_shopping_list_from_session(request):
     list_id = request.session.get('shopping_list_id')
@@ -244,23 +250,37 @@ def get_active_shopping_list_from_session(request):
     request.session['shopping_list_id'] = sl.id
     return sl
 
+USER_POINT_CACHE_TTL = getattr(settings, "USER_POINT_CACHE_TTL", 60 * 10)
+
+def user_point_cache_key(user_id) -> str:
+    return f"user_point:{user_id}"
+
 def get_user_total_point(user):
-    """해당 사용자의 보유 포인트를 정수로 반환. 없으면 0."""
+    """해당 사용자의 보유 포인트를 정수로 반환. 없으면 0. (UserPoint 변경 시그널로 캐시 무효화)"""
     if not getattr(user, "is_authenticated", False):
         return 0
-    val = (
-        UserPoint.objects
-        .filter(user=user)
-        .values_list("total_point", flat=True)
-        .first()
-    )
-    return int(val) if val is not None else 0
+    key = user_point_cache_key(user.pk)
+    val = cache.get(key)
+    if val is None:
+        val = (
+            UserPoint.objects
+            .filter(user=user)
+            .values_list("total_point", flat=True)
+            .first()
+        ) or 0
+        cache.set(key, int(val), USER_POINT_CACHE_TTL)
+    return int(val)
 
 def cart_items_count(user) -> int:
-    shopping_list = (ShoppingList.objects.filter(user=user, is_done=False).order_by('-created_at').first())
-    if not shopping_list:
-        return 0
-    return ShoppingListIngredient.objects.filter(shopping_list=shopping_list).count()
+    """진행 중 장바구니의 재료 수 (ShoppingList.item_count, 쿼리 1번)."""
+    count = (
+        ShoppingList.objects
+        .filter(user=user, is_done=False)
+        .order_by('-created_at')
+        .values_list('item_count', flat=True)
+        .first()
+    )
+    return count or 0
 
 
 # =============================================================================
@@ -284,12 +304,32 @@ def cart_items_count(user) -> int:
 def _all_ingredient_names(max_items: int | None = None) -> str:
     """
     DB의 재료 이름을 ", "로 이어 붙인 문자열.
-    GPT 프롬프트에 넘길 전체 재료 목록.
+    GPT 프롬프트에 넘길 전체 재료 목록 (카탈로그 스냅샷 기준).
     """
-    qs = Ingredient.objects.values_list("name", flat=True).order_by("name")
+    catalog = get_catalog()
     if max_items:
-        qs = qs[:max_items]
-    return ", ".join(qs)
+        return ", ".join(catalog.names[:max_items])
+    return catalog.names_csv
+
+
+_TEMPLATE_STEPS = [
+    "재료를 손질합니다.",
+    "팬을 달구고 기름을 살짝 둘러요.",
+    "재료를 넣고 3~5분간 볶거나 데칩니다.",
+    "소금/후추 등 간을 맞춰요.",
+    "그릇에 담아 완성합니다.",
+]
+
+
+def _template_recipe_text(title: str, ingredient_names: Sequence[str]) -> str:
+    """화면에서 기대하는 형식(제목/재료/조리방법)의 템플릿 레시피."""
+    ing_lines = "\n".join(f"- {n}" for n in ingredient_names)
+    step_lines = "\n".join(f"{i+1}) {s}" for i, s in enumerate(_TEMPLATE_STEPS))
+    return (
+        f"{title}\n"
+        f"필요한 재료:\n{ing_lines}\n"
+        f"조리 방법:\n{step_lines}"
+    )
 
 
 def _fallback_recipe_text(selected_names: list[str]) -> str:
@@ -298,22 +338,123 @@ def _fallback_recipe_text(selected_names: list[str]) -> str:
     텍스트 포맷은 화면에서 기대하는 형식(제목/재료/조리방법)을 그대로 맞춤.
     """
     names = [str(n).strip() for n in selected_names if str(n).strip()]
-    title = " / ".join(names[:3]) + " 간단 요리"
-    ing_lines = "\n".join(f"- {n}" for n in names)
-    steps = [
-        "재료를 손질합니다.",
-        "팬을 달구고 기름을 살짝 둘러요.",
-        "재료를 넣고 3~5분간 볶거나 데칩니다.",
-        "소금/후추 등 간을 맞춰요.",
-        "그릇에 담아 완성합니다.",
+    return _template_recipe_text(" / ".join(names[:3]) + " 간단 요리", names)
+
+
+# ---- 로컬 레시피 생성 (GPT 마감 초과 시 즉시 응답용) ---------------------------
+
+# 요리명 → 재료(basic/optional) 캐시. 요리명 해시로 고정 슬롯(RECIPE_KB_SLOTS개)에 하나씩 저장
+# → 쓰기는 키 1개 set뿐(읽고-고쳐-쓰기 없음), 같은 슬롯에 온 다른 요리가 예전 것을 밀어냄
+RECIPE_KB_PREFIX = "recipe_kb"
+RECIPE_KB_SLOTS = 300
+RECIPE_KB_TTL = 60 * 60 * 24 * 30
+SAVED_RECIPE_KB_TTL = 600
+_QTY_RE = re.compile(r"\(.*?\)|\[.*?\]")
+
+
+def _recipe_kb_key(slot: int) -> str:
+    return f"{RECIPE_KB_PREFIX}:{slot}"
+
+
+def remember_recipe_ingredients(recipe_name: str, basic: Sequence[str], optional: Sequence[str]) -> None:
+    """GPT가 분석한 요리명 → 재료 매핑을 캐시에 저장 (사용자와 무관한 공용 데이터)."""
+    if not recipe_name or not (basic or optional):
+        return
+    slot = int(hashlib.sha1(recipe_name.encode("utf-8")).hexdigest()[:8], 16) % RECIPE_KB_SLOTS
+    cache.set(_recipe_kb_key(slot), (recipe_name, list(basic), list(optional)), RECIPE_KB_TTL)
+
+
+def _recipe_kb() -> List[Tuple[str, List[str], List[str]]]:
+    return list(cache.get_many([_recipe_kb_key(i) for i in range(RECIPE_KB_SLOTS)]).values())
+
+
+def _parse_ingredient_lines(text: str) -> List[str]:
+    """레시피 본문에서 '필요한 재료:' 아래 '- 재료' 줄만 추출."""
+    out: List[str] = []
+    in_block = False
+    for line in (text or "").splitlines():
+        s = line.strip()
+        if s.startswith("필요한 재료"):
+            in_block = True
+            continue
+        if s.startswith("조리 방법"):
+            break
+        if in_block and s[:1] in ("-", "•"):
+            name = s.lstrip("-• ").strip()
+            if name:
+                out.append(name)
+    return out
+
+
+def _ingredient_name(line: str, catalog) -> Optional[str]:
+    """
+    재료 줄 → 카탈로그 재료명 ('양파 1개' / '대파(흰 부분) 1대' → '양파' / '대파').
+    괄호를 지우고 앞에서부터 가장 긴 단어 묶음이 카탈로그에 있으면 그 이름, 없으면 None.
+    """
+    parts = _QTY_RE.sub(" ", line).replace(":", " ").split()
+    for n in range(len(parts), 0, -1):
+        found = catalog.resolve(" ".join(parts[:n]))
+        if found:
+            return found
+    return None
+
+
+def saved_recipe_kb_key(user_id) -> str:
+    return f"saved_recipe_kb:{user_id}"
+
+
+def _saved_recipe_candidates(user_id) -> List[Tuple[str, str, List[str]]]:
+    """이 사용자의 최근 저장 레시피(제목, 본문, 카탈로그 재료명). 10분 캐시 (저장/삭제 시 비움)."""
+    key = saved_recipe_kb_key(user_id)
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+    catalog = get_catalog()
+    rows = []
+    recent = SavedRecipe.objects.filter(user_id=user_id).order_by("-created_at")
+    for title, desc in recent.values_list("title", "description")[:200]:
+        ings = list(dict.fromkeys(
+            n for n in (_ingredient_name(line, catalog) for line in _parse_ingredient_lines(desc)) if n
+        ))
+        if ings and "조리 방법" in desc:
+            rows.append((title, desc, ings))
+    cache.set(key, rows, SAVED_RECIPE_KB_TTL)
+    return rows
+
+
+def local_recipe_text(selected_names: Sequence[str], user_id=None) -> str:
+    """
+    GPT 없이 만드는 레시피 텍스트.
+    1) (user_id가 있으면) 그 사용자가 저장한 레시피 중 재료 대부분(60%↑)을 이미 가진 것 → 그대로 재사용
+    2) 분석해 둔 요리명→재료 캐시 중 기본 재료를 모두 가진 요리 → 템플릿 조리법
+    3) 둘 다 없으면 기본 폴백 템플릿
+    """
+    names = get_catalog().filter_names(str(n).strip() for n in selected_names) or [
+        str(n).strip() for n in selected_names if str(n).strip()
     ]
-    step_lines = "\n".join(f"{i+1}) {s}" for i, s in enumerate(steps))
+    have = set(names)
 
-    return (
-        f"{title}\n"
-        f"필요한 재료:\n{ing_lines}\n"
-        f"조리 방법:\n{step_lines}"
-    )
+    best, best_cov = None, 0.0
+    for title, desc, ings in (_saved_recipe_candidates(user_id) if user_id else []):
+        overlap = len(have & set(ings))
+        if overlap < min(2, len(have)):
+            continue
+        cov = overlap / len(ings)
+        if cov > best_cov:
+            best, best_cov = (title, desc), cov
+    if best and best_cov >= 0.6:
+        return f"{best[0]}\n{best[1]}"
+
+    pick = None
+    for recipe, basic, optional in _recipe_kb():
+        if basic and set(basic) <= have and (pick is None or len(basic) > len(pick[1])):
+            pick = (recipe, basic, optional)
+    if pick:
+        recipe, basic, optional = pick
+        ings = list(basic) + [o for o in optional if o in have and o not in basic]
+        return _template_recipe_text(recipe, ings)
+
+    return _fallback_recipe_text(names)
 
 
 # ===== F-2. JSON/텍스트 파싱 보정 ============================================
@@ -338,12 +479,16 @@ def _safe_json(content: str):
 # ===== F-3. 대화형 요리 제안 (대화 기록 기반) ================================
 
 def gpt_conversational_cook(chat_history):
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=chat_history,
-        temperature=0.7,
-    )
-    return response.choices[0].message.content
+    def create(model: str) -> str:
+        response = client.chat.completions.create(
+            model=model,
+            messages=chat_history,
+            temperature=0.7,
+        )
+        return response.choices[0].message.content
+
+    input_chars = sum(len(str(m.get("content") or "")) for m in chat_history)
+    return model_router.complete("chat_cook", create, input_chars=input_chars)
 
 
 # ===== F-4. 응답 후처리(레시피명 추출) =======================================
@@ -360,8 +505,7 @@ def extract_recipe_name_from_gpt_response(text):
 
 def extract_ingredients_from_recipe(recipe_name):
     # 모든 재료 이름을 문자열로 나열
-    ingredient_names = Ingredient.objects.values_list('name', flat=True)
-    ingredient_list_str = ', '.join(ingredient_names)
+    ingredient_list_str = get_catalog().names_csv
     prompt = (
         f'"{recipe_name}"를 만들기 위해 필요한 식재료를 아래 JSON 형식으로만 응답해줘.'
         f'조건은 무조건 우리 재료 DB 내에서만 조합해서 "{recipe_name}"를 만들기 위해 필요한 식재료들을 추천해야 돼'
@@ -374,20 +518,25 @@ def extract_ingredients_from_recipe(recipe_name):
         f'{{\n  "basic": ["된장", "두부"],\n  "optional": ["소고기", "고추"]\n}}'
     )
 
-    try:
+    def create(model: str) -> str:
         response = client.chat.completions.create(
-            model="gpt-4o", 
+            model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
         )
+        return (response.choices[0].message.content or "").strip()
 
-        content = response.choices[0].message.content.strip()
-
-        data = json.loads(content)  # JSON 파싱
+    try:
+        content = model_router.complete(
+            "recipe_ingredients", create,
+            validate=lambda t: isinstance(_safe_json(t), dict),
+            input_chars=len(prompt), strict_json=True,
+        )
+        data = _safe_json(content)  # JSON 파싱
+        if not isinstance(data, dict):
+            return [], []  # 파싱 실패 시 빈 리스트 반환
         return data.get("basic", []), data.get("optional", [])
 
-    except json.JSONDecodeError:
-        return [], []  # 파싱 실패 시 빈 리스트 반환
     except Exception as e:
         return [], []  # GPT 호출 실패 시도 빈 리스트 반환
     
@@ -395,10 +544,30 @@ def extract_ingredients_from_recipe(recipe_name):
 
 # ===== F-6. 레시피→재료 추출 v2 (허용 재료 매핑/정규화) ======================
 
-def extract_ingredients_from_recipe_v2(recipe_name, allowed_ingredients=None, model="gpt-4o"):
+def _parse_json_object(content: str):
+    """코드블록/잡텍스트를 걷어내고 첫 JSON 오브젝트를 파싱. 실패 시 None."""
+    content = (content or "").strip()
+    # ```json ... ``` 제거
+    if content.startswith("```"):
+        content = re.sub(r"^```(?:json)?\s*|\s*```$", "", content, flags=re.IGNORECASE | re.DOTALL)
+
+    # 혹시 앞뒤에 잡텍스트가 섞였으면 첫 번째 JSON 오브젝트만 추출
+    if not content.lstrip().startswith("{"):
+        m = re.search(r"\{[\s\S]*\}", content)
+        if m:
+            content = m.group(0)
+    try:
+        data = json.loads(content)
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def extract_ingredients_from_recipe_v2(recipe_name, allowed_ingredients=None, model=None):
     """
     주어진 요리명으로 필요한 재료를 GPT에 물어보고 (basic, optional) 리스트를 돌려준다.
     - allowed_ingredients가 주어지면 그 목록에 '정규화 매핑'으로 매칭되는 항목만 반환.
+    - model을 주지 않으면 model_router가 고름 (JSON 파싱 실패 시 큰 모델로 승격).
     - 항상 문자열 리스트 2개를 반환하며, 실패 시 ([], []).
     """
 
@@ -431,27 +600,26 @@ def extract_ingredients_from_recipe_v2(recipe_name, allowed_ingredients=None, mo
         },
     ]
 
-    try:
+    def create(model_name: str) -> str:
         res = client.chat.completions.create(
-            model=model,
+            model=model_name,
             messages=messages,
             temperature=0.2,
         )
-        content = (res.choices[0].message.content or "").strip()
-
-        # ```json ... ``` 제거
-        if content.startswith("```"):
-            content = re.sub(r"^```(?:json)?\s*|\s*```$", "", content, flags=re.IGNORECASE | re.DOTALL)
+        return (res.choices[0].message.content or "").strip()
 
-        # 혹시 앞뒤에 잡텍스트가 섞였으면 첫 번째 JSON 오브젝트만 추출
-        if not content.lstrip().startswith("{"):
-            m = re.search(r"\{[\s\S]*\}", content)
-            if m:
-                content = m.group(0)
-
-        data = json.loads(content)
+    try:
+        content = model_router.complete(
+            "recipe_ingredients_v2", create,
+            validate=lambda t: _parse_json_object(t) is not None,
+            input_chars=sum(len(m["content"]) for m in messages), strict_json=True,
+            model=model or None,
+        )
+        data = _parse_json_object(content)
     except Exception:
         return [], []
+    if data is None:
+        return [], []
 
     def clean_list(x):
         if not isinstance(x, list):
@@ -489,6 +657,10 @@ def extract_ingredients_from_recipe_v2(recipe_name, allowed_ingredients=None, mo
 
 # ===== F-7. 레시피 생성용 프롬프트 빌더 =====================================
 
+# 레시피 프롬프트/형식이나 모델을 바꾸면 올려주세요 (캐시된 레시피 변형 무효화)
+# 2: gpt-4o → model_router 기본(작은 모델)
+RECIPE_PROMPT_VERSION = 2
+
 def _build_prompt(selected_names: List[str], ingredient_db_list: str, followup: str = "") -> str:
     max_chars = 8000
     safe_db = (ingredient_db_list or "")[:max_chars]
@@ -511,11 +683,29 @@ def _build_prompt(selected_names: List[str], ingredient_db_list: str, followup:
 
 # ===== F-8. 최종 레시피 생성 호출(실패 시 폴백 포함) =========================
 
-def call_gpt(selected_names: List[str], followup: str = "") -> str:
+def call_gpt(
+    selected_names: List[str],
+    followup: str = "",
+    *,
+    seed: str | None = None,
+    deadline: float | None = None,
+    user_id: int | None = None,
+) -> str:
     """
     선택 재료 + (옵션) 추가 요구사항으로 레시피 텍스트 생성.
-    실패 시에도 폴백 텍스트를 반환하여 화면이 튕기지 않도록 함.
-    """
+    - 재료 조합(seed=ids_seed) + 추가 요청 + 프롬프트 버전 단위로 변형 캐시(recipe_cache)
+      변형이 상한만큼 모였으면 GPT 없이 그중 하나를 반환, 아니면 GPT로 새 변형 추가
+    - GPT가 마감 시간(GPT_DEADLINES['leftover_recipe']) 안에 못 오면 저장된 변형 또는
+      로컬 레시피로 즉시 응답, 늦게 온 GPT 결과는 변형으로 저장해 다음 요청에서 사용
+      (로컬 레시피의 저장 레시피 재사용은 user_id 본인 것만)
+    - 실패 시에도 폴백 텍스트를 반환하여 화면이 튕기지 않도록 함
+    """
+    key = recipe_cache.variant_key(seed or ids_seed(selected_names), followup, version=RECIPE_PROMPT_VERSION)
+    cached, full = recipe_cache.lookup(key)
+    if full:
+        llm_telemetry.record_cache_hit("leftover_recipe")
+        return cached
+
     try:
         prompt = _build_prompt(selected_names, _all_ingredient_names(), followup)
         system_msg = {
@@ -527,20 +717,43 @@ def call_gpt(selected_names: List[str], followup: str = "") -> str:
         }
         user_msg = {"role": "user", "content": prompt}
 
-        resp = client.chat.completions.create(
-            model="gpt-4o",
-            temperature=0.2,
-            max_tokens=700,
-            messages=[system_msg, user_msg],
+        def create(model: str) -> str:
+            resp = client.chat.completions.create(
+                model=model,
+                temperature=0.2,
+                max_tokens=700,
+                messages=[system_msg, user_msg],
+            )
+            return (resp.choices[0].message.content or "").strip()
+
+        def fetch() -> str:
+            text = model_router.complete(
+                "leftover_recipe", create,
+                validate=lambda t: "필요한 재료" in t and "조리 방법" in t,
+                input_chars=len(prompt),
+            )
+            if not text:
+                raise RuntimeError("빈 응답")
+            return text
+
+        def store(text: str) -> None:
+            recipe_cache.add_variant(key, text)
+
+        text = hedged_call(
+            fetch,
+            deadline=deadline if deadline is not None else deadline_for("leftover_recipe"),
+            fallback=lambda: None,
+            on_late=store,
         )
-        text = (resp.choices[0].message.content or "").strip()
-        if not text:
-            raise RuntimeError("빈 응답")
+        if text is None:
+            # 마감 초과/실패 → 저장된 변형 또는 로컬 레시피로 즉시 진행 (리다이렉트 X)
+            return cached or local_recipe_text(selected_names, user_id=user_id)
+        store(text)
         return text
 
     except Exception:
         # 어떤 이유로든 실패하면 즉시 폴백으로 진행 (리다이렉트 X)
-        return _fallback_recipe_text(selected_names)
+        return cached or _fallback_recipe_text(selected_names)
 
 
 # =============================================================================
@@ -549,14 +762,16 @@ def call_gpt(selected_names: List[str], followup: str = "") -> str:
 
 logger = logging.getLogger(__name__)
 
+# 초기 제안 프롬프트나 모델을 바꾸면 올려주세요 (저장된 아이디어 재생성 기준)
+# 2: gpt-4o → model_router 기본(작은 모델)
+IDEA_PROMPT_VERSION = 2
+
 def generate_recipe_chat(ingredient_name: str, followup: str | None = None, history: list | None = None) -> str:
     """
     - 초기: 재료를 반드시 사용하는 2가지 요리. 숫자 넘버링 + 불릿 + (선택)팁.
     - 후속: 자유 대화(1–2문장, 공감 톤). '추천' 요구가 없으면 레시피 제안 금지.
     - 사후검증: 응답에 재료명이 없으면 1회 재시도.
     """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
     ingredient = ingredient_name.strip()
     # 음료/액체/조미료 계열 힌트
     beverage_like = {"사이다", "콜라", "탄산수", "맥주", "와인", "소주", "식초", "간장", "케첩"}
@@ -596,15 +811,17 @@ def generate_recipe_chat(ingredient_name: str, followup: str | None = None, hist
             "role": "user",
             "content": f"재료: {ingredient}\n질문: {followup}"
         })
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.5,
-            max_tokens=140,
-            frequency_penalty=0.6,
-            messages=messages,
-        )
-        text = resp.choices[0].message.content.strip()
-        return text
+        def create_reply(model: str) -> str:
+            resp = client.chat.completions.create(
+                model=model,
+                temperature=0.5,
+                max_tokens=140,
+                frequency_penalty=0.6,
+                messages=messages,
+            )
+            return resp.choices[0].message.content.strip()
+
+        return model_router.complete("idea_followup", create_reply)
 
     # ---- 초기 제안 모드 ----
     messages.append({
@@ -632,32 +849,35 @@ def generate_recipe_chat(ingredient_name: str, followup: str | None = None, hist
 
     })
 
-    resp = client.chat.completions.create(
-        model="gpt-4o",
-        temperature=0.35,
-        max_tokens=520,
-        frequency_penalty=0.4,
-        messages=messages,
-    )
-    text = resp.choices[0].message.content.strip()
+    def create(model: str) -> str:
+        resp = client.chat.completions.create(
+            model=model,
+            temperature=0.35,
+            max_tokens=520,
+            frequency_penalty=0.4,
+            messages=messages,
+        )
+        return resp.choices[0].message.content.strip()
 
-    # ---- 사후검증: 재료명이 없으면 1회 재시도 ----
+    # ---- 사후검증: 재료명이 없으면 큰 모델로 1회 재시도 ----
     # (한글/영문 혼용 대비 소문자 비교도 수행)
-    if not re.search(re.escape(ingredient), text, flags=re.IGNORECASE):
-        messages.append({
-            "role": "system",
-            "content": (
-                f"응답에 '{ingredient}' 사용이 **반드시** 포함되어야 한다. "
-                "각 요리 블록에서 이 재료가 어디에 들어가는지 명확히 언급하라."
-                "말투는 상냥하면서 약간 귀엽게"
-            )
-        })
+    def mentions_ingredient(text: str) -> bool:
+        return bool(re.search(re.escape(ingredient), text, flags=re.IGNORECASE))
+
+    def retry(model: str) -> str:
         resp = client.chat.completions.create(
-            model="gpt-4o",
+            model=model,
             temperature=0.3,
             max_tokens=520,
-            messages=messages,
+            messages=messages + [{
+                "role": "system",
+                "content": (
+                    f"응답에 '{ingredient}' 사용이 **반드시** 포함되어야 한다. "
+                    "각 요리 블록에서 이 재료가 어디에 들어가는지 명확히 언급하라."
+                    "말투는 상냥하면서 약간 귀엽게"
+                )
+            }],
         )
-        text = resp.choices[0].message.content.strip()
+        return resp.choices[0].message.content.strip()
 
-    return text
\ No newline at end of file
+    return model_router.complete("idea", create, validate=mentions_ingredient, escalate=retry)
\ No newline at end of file
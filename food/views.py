@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from .utils import *
 from .models import *
 from market.models import ShoppingList, ShoppingListIngredient
+from market.services.cooccurrence import related_ingredients
 from point.models import UserPoint
 from django.contrib import messages
 from urllib.parse import urlencode
@@ -10,35 +11,51 @@ from django.views.decorators.http import require_POST, require_GET
 from django.urls import reverse
 from django.db import transaction
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseNotModified
+from django.conf import settings
 from openai import OpenAI
 from typing import List
 from django.core.cache import cache
-import hashlib, logging
+import hashlib, json, logging
 from django.utils.html import escape
 from typing import Iterable, List, Sequence, Optional, Set, Tuple, Dict, Any
 from typing import List
+from .services.job_queue import QueueFull, enqueue, get_job, session_job, job_status_url, job_to_dict
+from .services.text_store import cache_key as text_cache_key, get_or_generate_text
+from .services.chat_memory import budget_messages
+from .services import banner_cache, llm_telemetry, trending
+from .services.catalog import get_catalog
+from .services import cart_writer
+from .services.ingredient_search import search_ingredients
 
 
 # =============================================================================
 # Constants / Session Keys
 # =============================================================================
 PER_CART_SESSION_KEYS = (
-    'extra_selected',
-    'optional_selected',
     'ing_search_started',
     'optional_selected_snapshot',
     'ing_added_temp',
 )
 
-# leftover 전용 세션 키 (레시피 플로우와 완전 분리)
+# 백그라운드 GPT 작업(job id) 세션 키
+RECIPE_AI_JOB_KEY = "recipe_ai_job_id"
+RECIPE_ING_JOB_KEY = "recipe_ing_job_id"
+LEFTOVER_JOB_KEY = "leftover_job_id"
+QUEUE_FULL_MSG = "요청이 많아 잠시 후 다시 시도해 주세요."
+
+# leftover 전용 키 (레시피 플로우와 완전 분리)
+# 선택 목록/대화는 request.flow(FlowState), 나머지 작은 값은 세션
 LEFTOVER_EXTRA_SELECTED_KEY = "leftover_extra_selected"
+LEFTOVER_FLOW_KEYS = (
+    LEFTOVER_EXTRA_SELECTED_KEY,
+    'recipe_chat',
+    'last_recipe_text',
+)
 LEFTOVER_SESSION_KEYS = (
-    LEFTOVER_EXTRA_SELECTED_KEY,  # ← 기존 'extra_selected' 제거
     'selected_ingredient_ids',
     'selected_seed',
-    'recipe_chat',
-    'last_recipe_text',
+    LEFTOVER_JOB_KEY,
 )
 
 
@@ -59,8 +76,9 @@ def main(request):
     tab_raw = request.GET.get("tab")
     tab = normalize_tab(tab_raw, allowed)
 
-    # 배너 쿼리: 노출 중 + 사용자 동(동네) 타깃
-    banners = get_banners_for_main(user, tab, limit=5)
+    # 배너: 노출 중 + 사용자 동(동네) 타깃. 템플릿 조각 캐시가 살아 있으면 호출조차 안 됨
+    def banners():
+        return get_banners_for_main(user, tab, limit=5)
 
     # 진행 중 장바구니
     shopping_list = (
@@ -69,22 +87,16 @@ def main(request):
         .order_by('-created_at')
         .first()
     )
-    items_count = (
-        ShoppingListIngredient.objects
-        .filter(shopping_list=shopping_list)
-        .count()
-        if shopping_list else 0
-    )
-
-    total_point = get_user_total_point(user)
+    items_count = shopping_list.item_count if shopping_list else 0
 
     return render(request, "food/main.html", {
         "tab": tab,                         # None이면 '전체'로 취급
-        "banners": banners,                 # ← 템플릿에서 for 루프로 출력
+        "banners": banners,                 # ← 템플릿에서 for 루프로 출력 (조각 캐시 미스 때만 호출)
+        "banner_cache_key": banner_cache.fragment_key(user, tab),
+        "banner_cache_ttl": banner_cache.BANNER_CACHE_TTL,
         "shoppinglist_id": shopping_list.id if shopping_list else None,
         "has_active_cart": items_count > 0,
-        "cart_items_count": items_count,
-        "total_point": total_point,
+        "cart_items_count": items_count,    # 이미 읽은 값 (헤더 컨텍스트 대신)
     })
 
 
@@ -105,18 +117,14 @@ def recipe_input_view(request):
 
         # 새 요리를 입력했으므로 이전 재료들 초기화
         for k in ('basic', 'optional', 'extra_selected'):
-            request.session.pop(k, None)
+            request.flow.pop(k, None)
         return redirect('food:recipe_ingredients') 
         
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
     today = timezone.localdate()            # 날짜만 (로컬 타임존 기준)
     today_str = today.strftime('%Y년 %m월 %d일')  # 템플릿에서 문자열이 더 편하면 사용
 
     return render(request, 'food/recipe_input.html', {
         'initial_recipe': initial_recipe,
-        'cart_items_count': items_count,
-        'total_point': total_point,
         'today': today,        
         'today_str': today_str, 
     })
@@ -129,6 +137,7 @@ def recipe_ingredient_result(request):
         return redirect('food:recipe_input')
 
     # 장보기가 끝난 뒤 새 장보기를 시작하면 per-cart 세션키 초기화
+    # (선택 목록은 request.flow가 장바구니별로 따로 들고 있어 새 장바구니면 이미 비어 있음)
     try:
         sl = get_or_create_active_shopping_list(request.user)
     except Exception:
@@ -136,26 +145,25 @@ def recipe_ingredient_result(request):
     if sl:
         prev_sl_id = request.session.get('shopping_list_id')
         if prev_sl_id != sl.id:
-            for k in ('extra_selected', 'optional_selected',
-                      'ing_search_started', 'optional_selected_snapshot', 'ing_added_temp'):
+            for k in PER_CART_SESSION_KEYS:
                 request.session.pop(k, None)
             request.session['shopping_list_id'] = sl.id
 
     prev_recipe = request.session.get('recipe_input')
 
-    # 레시피 변경 시 세션 초기화
+    # 레시피 변경 시 흐름 상태 초기화
     if prev_recipe != recipe_name:
         request.session['recipe_input'] = recipe_name
         for k in ('basic', 'optional', 'optional_selected', 'extra_selected'):
-            request.session.pop(k, None)
+            request.flow.pop(k, None)
 
     if request.method == "POST":
         # 폼에서 체크된 재료들만 사용 (중복 제거 + 빈 값 제거)
         selected = extract_checked_names_from_post(request, key='ingredients')
         next_action = request.POST.get('next')
 
-        # 검색 화면에서 장바구니(선택 목록) 보여주기 위해 세션에 현재 선택 상태 저장
-        request.session['optional_selected'] = selected
+        # 검색 화면에서 장바구니(선택 목록) 보여주기 위해 현재 선택 상태 저장
+        request.flow['optional_selected'] = selected
 
         if next_action == 'search':
             return redirect('food:ingredient_search')
@@ -166,23 +174,10 @@ def recipe_ingredient_result(request):
                 return redirect('food:recipe_ingredients')
 
             shopping_list = get_active_shopping_list_from_session(request)
-
-            from django.db import transaction
-            with transaction.atomic():
-                # 기존 장바구니 비우고
-                ShoppingListIngredient.objects.filter(shopping_list=shopping_list).delete()
-                # 체크된 것만 저장
-                ing_map = {
-                    n: i for n, i in Ingredient.objects
-                    .filter(name__in=selected)
-                    .values_list('name', 'id')
-                }
-                bulk = [
-                    ShoppingListIngredient(shopping_list=shopping_list, ingredient_id=ing_map[n])
-                    for n in selected if n in ing_map
-                ]
-                if bulk:
-                    ShoppingListIngredient.objects.bulk_create(bulk)
+            # 체크된 것만 남기고 교체 저장
+            change = cart_writer.replace_names(shopping_list, selected)
+            if change.unknown:
+                messages.warning(request, f"찾을 수 없는 재료는 제외했어요: {', '.join(change.unknown)}")
 
             request.session['shopping_list_id'] = shopping_list.id
             return redirect('food:confirm_shopping_list')
@@ -191,8 +186,19 @@ def recipe_ingredient_result(request):
         return redirect('food:recipe_ingredients')
 
     # ---- GET 분기 ----
-    basic_filtered = request.session.get('basic')
-    optional_filtered = request.session.get('optional')
+    # 백그라운드 재료 분석 결과가 도착했으면 세션에 반영 (같은 요리일 때만)
+    job = session_job(request, RECIPE_ING_JOB_KEY)
+    job_failed = False
+    if job and job.is_finished and (job.payload or {}).get('recipe_name') == recipe_name:
+        if job.status == GptJob.Status.DONE:
+            request.flow['basic'] = job.result.get('basic', [])
+            request.flow['optional'] = job.result.get('optional', [])
+        else:
+            # 실패 시 빈 목록으로 두고 이번 요청에서는 재시도하지 않음(폴링 루프 방지)
+            job_failed = True
+
+    basic_filtered = request.flow.get('basic')
+    optional_filtered = request.flow.get('optional')
 
     need_fetch = (
         prev_recipe != recipe_name or
@@ -200,29 +206,30 @@ def recipe_ingredient_result(request):
         (len(basic_filtered or []) == 0 and len(optional_filtered or []) == 0)
     )
 
-    if need_fetch:
+    pending_job = None
+    if job and not job.is_finished and (job.payload or {}).get('recipe_name') == recipe_name:
+        pending_job = job
+    elif need_fetch and not job_failed:
         try:
-            basic_raw, optional_raw = extract_ingredients_from_recipe(recipe_name)
-            db_names = set(Ingredient.objects.values_list('name', flat=True))
-            basic_filtered    = [x for x in (basic_raw or [])    if x in db_names]
-            optional_filtered = [x for x in (optional_raw or []) if x in db_names]
-            request.session['basic'] = basic_filtered
-            request.session['optional'] = optional_filtered
-        except Exception:
-            basic_filtered = basic_filtered or []
-            optional_filtered = optional_filtered or []
-
-    items_count = cart_items_count(request.user)
-    total_point = get_user_total_point(request.user)
+            pending_job = enqueue('recipe_ingredients', {'recipe_name': recipe_name}, user=request.user)
+            request.session[RECIPE_ING_JOB_KEY] = str(pending_job.id)
+        except QueueFull:
+            messages.warning(request, QUEUE_FULL_MSG)
+
+    # 함께 많이 산 재료(미리 계산된 공동 출현 표, GPT 호출 없음)
+    related = related_ingredients(
+        (basic_filtered or []) + (optional_filtered or []),
+        exclude=request.flow.get('extra_selected', []),
+    ) if basic_filtered else []
 
     return render(request, 'food/recipe_ingredients.html', {
         'recipe': recipe_name,
         'basic': basic_filtered or [],
         'optional': optional_filtered or [],
-        'optional_selected': request.session.get('optional_selected', []),
-        'extra_ingredients': request.session.get('extra_selected', []),
-        'items_count' : items_count,
-        'total_point' : total_point,
+        'related': related,
+        'optional_selected': request.flow.get('optional_selected', []),
+        'extra_ingredients': request.flow.get('extra_selected', []),
+        'pending_job_url': job_status_url(pending_job) if pending_job else None,
     })
 
 # Step 3. 장바구니 저장
@@ -238,20 +245,9 @@ def confirm_shopping_list(request):
     if request.method == 'POST':
         selected_names = list(dict.fromkeys(request.POST.getlist('ingredients')))
         # 2) DB 갱신(교체 저장)
-        with transaction.atomic():
-            ShoppingListIngredient.objects.filter(shopping_list=shopping_list).delete()
-            if selected_names:
-                name_to_id = dict(
-                    Ingredient.objects.filter(name__in=selected_names).values_list('name', 'id')
-                )
-                bulk = [
-                    ShoppingListIngredient(shopping_list=shopping_list, ingredient_id=name_to_id[n])
-                    for n in selected_names if n in name_to_id
-                ]
-                if bulk:
-                    ShoppingListIngredient.objects.bulk_create(bulk)
+        cart_writer.replace_names(shopping_list, selected_names)
     else:
-        selected_names = list(dict.fromkeys(request.session.get('optional_selected', [])))
+        selected_names = list(dict.fromkeys(request.flow.get('optional_selected', [])))
 
     # 3) 화면 표시용 현재 장바구니 조회(확정된 DB 기준)
     items = (
@@ -269,20 +265,15 @@ def confirm_shopping_list(request):
     ]
 
     # 4) extra_ingredients는 '현재 확정된 것들' 중 extra 후보만 표시
-    extra_pool = set(request.session.get('extra_selected', []))
+    extra_pool = set(request.flow.get('extra_selected', []))
     checked_extra_ingredients = [d["name"] for d in ingredients_ctx if d["name"] in extra_pool]
 
     request.session['shopping_list_id'] = shopping_list.id
 
-    items_count = cart_items_count(request.user)
-    total_point = get_user_total_point(request.user)
-
     return render(request, 'food/recipe_result.html', {
         "shopping_list": shopping_list,
         "ingredients": ingredients_ctx,              # ← 템플릿의 ingredients와 동일
         "extra_ingredients": checked_extra_ingredients,
-        'cart_items_count': items_count,
-        "total_point": total_point,
     })
 
 
@@ -308,26 +299,30 @@ def ingredient_search_view(request):
         messages.warning(request, "검색어를 입력해주세요.")
         return redirect('food:ingredient_search')
 
-    # 최근 검색어 업데이트
+    # 최근 검색어 업데이트 + 동네 인기 검색어 집계
     if did_click_search and search_query:
         update_recent_searches(request.session, search_query, key='recent_searches', maxlen=6)
+        trending.record(request.user, search_query)
 
     # 장바구니 후보(세션 기반)
-    extra_selected = request.session.get('extra_selected', [])
+    extra_selected = request.flow.get('extra_selected', [])
     selected_ingredients = Ingredient.objects.filter(name__in=extra_selected).order_by('name')
 
     if search_query:
         category_ingredients = search_ingredients_by_name(search_query, exclude_names=extra_selected)
-        if did_click_search and not category_ingredients.exists():
+        if did_click_search and not category_ingredients:
             messages.info(request, f"‘{search_query}’에 해당하는 재료가 없습니다.")
     else:
-        category_ingredients = Ingredient.objects.none()
+        category_ingredients = []
 
     return render(request, 'food/recipe_ingredients_search.html', {
         'search_query': search_query,
         'category_ingredients': category_ingredients,
         'selected_ingredients': selected_ingredients,
         'recent_searches': request.session.get('recent_searches', []),
+        'popular_searches': trending.popular_terms(request.user.addr_level3),
+        'autocomplete_sel': autocomplete_sel(extra_selected),
+        'cart_version': request.flow.get('extra_selected_version', 0),
     })
 
 # 체크박스 클릭 → 즉시 '세션(extra_selected)'에만 추가
@@ -342,13 +337,15 @@ def add_extra_ingredient(request):
         return redirect_with_query('food:ingredient_search', 'search', search)
 
     # 유효성(존재 재료) 체크만
-    if not Ingredient.objects.filter(name=name).exists():
+    if name not in get_catalog():
         messages.error(request, f"{name} 재료를 찾을 수 없습니다.")
     else:
-        extra_selected = request.session.get('extra_selected', [])
+        extra_selected = request.flow.get('extra_selected', [])
         if name not in extra_selected:
             extra_selected.append(name)
-            request.session['extra_selected'] = extra_selected
+            request.flow['extra_selected'] = extra_selected
+            bump_selection_version(request.flow, 'extra_selected')
+            trending.record(request.user, name, kind="cart")
         else:
             messages.info(request, f"{name}은(는) 이미 담겨 있어요.")
 
@@ -362,10 +359,11 @@ def delete_extra_ingredient(request, name):
 
     search = (request.POST.get('search') or '').strip()
 
-    extra_selected = request.session.get('extra_selected', [])
+    extra_selected = request.flow.get('extra_selected', [])
     if name in extra_selected:
         extra_selected.remove(name)
-        request.session['extra_selected'] = extra_selected
+        request.flow['extra_selected'] = extra_selected
+        bump_selection_version(request.flow, 'extra_selected')
     else:
         messages.info(request, f"{name}은(는) 후보에 없어요.")
 
@@ -393,13 +391,10 @@ def cancel_ingredient_search(request):
 
         added = request.session.get('ing_added_temp', [])
         if added:
-            ShoppingListIngredient.objects.filter(
-                shopping_list=sl,
-                ingredient__name__in=added
-            ).delete()
+            cart_writer.remove_names(sl, added)
 
         snapshot = request.session.get('optional_selected_snapshot', [])
-        request.session['optional_selected'] = snapshot
+        request.flow['optional_selected'] = snapshot
 
         for k in ('ing_search_started', 'optional_selected_snapshot', 'ing_added_temp'):
             request.session.pop(k, None)
@@ -426,29 +421,28 @@ def ingredient_input_view(request):
     # 최근 검색어 업데이트(검색 버튼 눌렀을 때만)
     if did_click_search and search_query:
         update_recent_searches(request.session, search_query, key='recent_searches', maxlen=6)
+        trending.record(request.user, search_query)
 
     # 장바구니(확정된 항목): optional_selected 세션 기준
-    optional_selected = request.session.get('optional_selected', [])
+    optional_selected = request.flow.get('optional_selected', [])
     selected_ingredients = Ingredient.objects.filter(name__in=optional_selected).order_by('name')
 
     # 검색 버튼 눌렀을 때만 결과 계산/표시, 이미 담긴 것 제외
     if did_click_search and search_query:
         category_ingredients = search_ingredients_by_name(search_query, exclude_names=optional_selected)
-        if not category_ingredients.exists():
+        if not category_ingredients:
             messages.info(request, f"‘{search_query}’에 해당하는 재료가 없습니다.")
     else:
-        category_ingredients = Ingredient.objects.none()
-
-    items_count = cart_items_count(request.user)
-    total_point = get_user_total_point(request.user)
+        category_ingredients = []
 
     return render(request, 'food/ingredient_input.html', {
         'search_query': search_query,
         'category_ingredients': category_ingredients,
         'selected_ingredients': selected_ingredients,
         'recent_searches': request.session.get('recent_searches', []),
-        'cart_items_count': items_count,
-        'total_point': total_point,
+        'popular_searches': trending.popular_terms(request.user.addr_level3),
+        'autocomplete_sel': autocomplete_sel(optional_selected),
+        'cart_version': get_or_create_active_shopping_list(request.user).version,
     })
 
 # Step 1-1. 원하는 식재료 장바구니에 추가하기
@@ -464,27 +458,24 @@ def add_ingredient(request):
         messages.error(request, "내용을 입력해 주세요.")
         return redirect_with_query('food:ingredient_input', 'search', search)
 
-    try:
-        ingredient = Ingredient.objects.get(name=name)
-    except Ingredient.DoesNotExist:
-        messages.error(request, f"{name}은(는) 존재하지 않습니다.")
-        return redirect_with_query('food:ingredient_input', 'search', search)
-
     shopping_list = get_or_create_active_shopping_list(request.user)
 
-    # DB 추가 (중복 생성 방지)
-    _, created = ShoppingListIngredient.objects.get_or_create(
-        shopping_list=shopping_list,
-        ingredient=ingredient
-    )
+    # DB 추가 (중복 생성 방지, 없는 재료는 만들지 않음)
+    change = cart_writer.add_names(shopping_list, [name])
+    if change.unknown:
+        messages.error(request, f"{name}은(는) 존재하지 않습니다.")
+        return redirect_with_query('food:ingredient_input', 'search', search)
+    name = get_catalog().resolve(name)
 
     # 세션(optional_selected) 동기화
-    optional_selected = request.session.get('optional_selected', [])
+    optional_selected = request.flow.get('optional_selected', [])
     if name not in optional_selected:
         optional_selected.append(name)
-        request.session['optional_selected'] = optional_selected
+        request.flow['optional_selected'] = optional_selected
 
-    if not created:
+    if change.added:
+        trending.record(request.user, name, kind="cart")
+    else:
         messages.info(request, f"{name}은(는) 이미 추가되어 있어요.")
 
     return redirect_with_query('food:ingredient_input', 'search', search)
@@ -497,24 +488,20 @@ def delete_ingredient(request, name):
 
     search = (request.POST.get('search') or '').strip()
 
-    try:
-        ingredient = Ingredient.objects.get(name=name)
-    except Ingredient.DoesNotExist:
+    if name not in get_catalog():
         messages.error(request, f"{name}은(는) 존재하지 않습니다.")
         return redirect_with_query('food:ingredient_input', 'search', search)
 
     shopping_list = get_or_create_active_shopping_list(request.user)
 
     # DB 제거
-    ShoppingListIngredient.objects.filter(
-        shopping_list=shopping_list, ingredient=ingredient
-    ).delete()
+    cart_writer.remove_names(shopping_list, [name])
 
     # 세션(optional_selected) 동기화
-    optional_selected = request.session.get('optional_selected', [])
+    optional_selected = request.flow.get('optional_selected', [])
     if name in optional_selected:
         optional_selected.remove(name)
-        request.session['optional_selected'] = optional_selected
+        request.flow['optional_selected'] = optional_selected
 
     messages.success(request, f"{name}을(를) 장바구니에서 제거했어요.")
 
@@ -542,11 +529,8 @@ def ingredient_result_view(request):
     # 진행 중인 장바구니 가져오기 (없으면 생성)
     shopping_list = get_or_create_active_shopping_list(user)
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     return render(request, 'food/ingredient_result.html', {
-        'shopping_list': shopping_list, 'cart_items_count': items_count, 'total_point': total_point,
+        'shopping_list': shopping_list,
     })
 
 
@@ -554,89 +538,102 @@ def ingredient_result_view(request):
 # E. AI 대화형 추천 (감정/상황 → 요리 제안) + 아이디어 API
 # =============================================================================
 
+RECIPE_AI_GUIDE = (
+    "넌 사용자의 기분과 상황을 듣고 요리를 제안하는 친절한 요리 도우미야. "
+    "반드시 **하나의 요리만** 추천하고, 추천 끝에 요리명을 큰따옴표(\")로 감싸서 제시해. "
+    "간단한 설명과 필요한 재료도 덧붙여."
+    "추천 요리는 반드시 사용할 수 있는 재료 목록에서 만들 수 있는 요리만 추천해"
+    "재료도 마찬가지로 반드시 사용할 수 있는 재료 목록에서 설명해줘\n"
+    "한 문장이 끝나면 줄바꿈을 해"
+)
+
+
+def recipe_ai_messages(chat):
+    """
+    GPT에 보낼 대화: 가이드 + 현재 카탈로그 재료 목록(system) + 사용자/도우미 턴.
+    저장된 대화의 system 메시지(예전 재료 목록이 들어 있을 수 있음)는 쓰지 않음.
+    재료 목록이 길면 budget_messages가 예산에 맞춰 자름.
+    """
+    return [
+        {"role": "system", "content": RECIPE_AI_GUIDE},
+        {"role": "system", "content": f"- 사용할 수 있는 재료 목록: {get_catalog().names_csv}"},
+        *[m for m in chat if m.get("role") != "system"],
+    ]
+
+
 @login_required
 def recipe_ai(request):
     user = request.user
-    # 대화 세션 초기화 + system 가이드 주입
-    ingredient_names = list(Ingredient.objects.values_list('name', flat=True))
-    ingredient_list_str = ', '.join(ingredient_names)
-
-    if 'chat_history' not in request.session:
-        request.session['chat_history'] = [{
-            "role": "system",
-            "content": (
-                "넌 사용자의 기분과 상황을 듣고 요리를 제안하는 친절한 요리 도우미야. "
-                "반드시 **하나의 요리만** 추천하고, 추천 끝에 요리명을 큰따옴표(\")로 감싸서 제시해. "
-                "간단한 설명과 필요한 재료도 덧붙여."
-                "추천 요리는 반드시 사용할 수 있는 재료 목록에서 만들 수 있는 요리만 추천해"
-                "재료도 마찬가지로 반드시 사용할 수 있는 재료 목록에서 설명해줘"
-                f"- 사용할 수 있는 재료 목록: {ingredient_list_str}\n"
-                "한 문장이 끝나면 줄바꿈을 해"
-            )
-        }]
-
-    chat = request.session['chat_history']
+    # 대화 초기화 + system 가이드 주입 (재료 목록은 보낼 때마다 최신 카탈로그로 붙임)
+    if 'chat_history' not in request.flow:
+        request.flow['chat_history'] = [{"role": "system", "content": RECIPE_AI_GUIDE}]
+
+    chat = request.flow['chat_history']
+
+    # 백그라운드 GPT 응답이 도착했으면 대화/세션에 반영
+    job = session_job(request, RECIPE_AI_JOB_KEY)
+    if job and job.status == GptJob.Status.DONE:
+        result = job.result or {}
+        chat.append({"role": "assistant", "content": result.get("reply", "")})
+        request.flow['chat_history'] = chat
+
+        # 요리명이 있으면: 버튼용 저장 + v2 분석 결과(basic/optional) 세션 저장
+        recipe_name = result.get("recipe_name")
+        if recipe_name:
+            request.session['latest_recipe']  = recipe_name
+            request.session['recipe_input']   = recipe_name  # 이후 재료 페이지에서 사용
+            if result.get("basic") or result.get("optional"):
+                request.flow['basic']    = result.get("basic", [])
+                request.flow['optional'] = result.get("optional", [])
+    elif job and job.status == GptJob.Status.FAILED:
+        # 답을 못 받은 사용자 메시지는 대화에서 제거
+        if chat and chat[-1].get("role") == "user":
+            chat.pop()
+            request.flow['chat_history'] = chat
+        messages.error(request, f"AI 응답 실패: {job.error}")
+    pending_job = job if job and not job.is_finished else None
 
     if request.method == 'POST':
         user_msg = (request.POST.get('message') or '').strip()
-        if not user_msg:
+        if not user_msg or pending_job:
+            # 이전 답변을 기다리는 중이면 새 메시지는 받지 않음
+            if wants_json(request) and pending_job:
+                return JsonResponse({"ok": True, **job_to_dict(pending_job)}, status=202)
             return redirect('food:recipe_ai')
 
         # 1) 사용자 메시지 추가
         chat.append({"role": "user", "content": user_msg})
 
-        # 2) GPT 대화 호출 (모듈 함수 그대로 사용)
+        # 2) GPT 대화는 백그라운드 작업으로 (요청 스레드는 바로 반환)
+        #    보낼 대화는 토큰 예산 안으로: 최근 턴 원문 + 이전 턴 요약
         try:
-            gpt_reply = gpt_conversational_cook(chat)
-        except Exception as e:
-            messages.error(request, f"AI 응답 실패: {e}")
+            job = enqueue('recipe_ai_reply', {'chat_history': budget_messages(recipe_ai_messages(chat))}, user=user)
+        except QueueFull:
+            chat.pop()
+            if wants_json(request):
+                return JsonResponse({"ok": False, "error": QUEUE_FULL_MSG}, status=503)
+            messages.error(request, QUEUE_FULL_MSG)
             return redirect('food:recipe_ai')
 
-        # 3) GPT 응답 저장
-        chat.append({"role": "assistant", "content": gpt_reply})
-        request.session['chat_history'] = chat
+        request.flow['chat_history'] = chat
+        request.session[RECIPE_AI_JOB_KEY] = str(job.id)
         request.session.modified = True
 
-        # 4) 최신 응답에서 요리명 추출 (모듈 함수 그대로 사용)
-        recipe_name = extract_recipe_name_from_gpt_response(gpt_reply)
+        if wants_json(request):
+            return JsonResponse({"ok": True, **job_to_dict(job)}, status=202)
 
-        # 5) 요리명이 있으면: 버튼용 저장 + 재료 v2 분석 시도
-        if recipe_name:
-            request.session['latest_recipe']  = recipe_name
-            request.session['recipe_input']   = recipe_name  # 이후 재료 페이지에서 사용
-
-            # v2 분석기로 basic/optional 미리 세션에 저장
-            try:
-                # DB 재료 이름 리스트
-                allowed = list(Ingredient.objects.values_list('name', flat=True))
-                basic_v2, optional_v2 = extract_ingredients_from_recipe_v2(
-                    recipe_name, allowed_ingredients=allowed
-                )
-                if basic_v2 or optional_v2:
-                    allowed_set = set(allowed)
-                    basic_filtered    = [x for x in basic_v2    if x in allowed_set]
-                    optional_filtered = [x for x in optional_v2 if x in allowed_set]
-                    request.session['basic']    = basic_filtered
-                    request.session['optional'] = optional_filtered
-            except Exception:
-                pass
-
-        # 6) 다시 같은 페이지로 (대화 + 버튼 표시)
+        # 3) 다시 같은 페이지로 (대화 표시 + 응답 폴링)
         return redirect('food:recipe_ai')
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     # 화면용 채팅 정렬: 최신 턴이 위, 턴 안에서는 user → assistant
-    display_chat = format_chat_for_display(request.session['chat_history'], exclude_roles={'system'})
+    display_chat = format_chat_for_display(chat, exclude_roles={'system'})
 
     # GET 렌더
     return render(request, 'food/recipe_ai.html', {
         'chat_history': display_chat,
         'latest_recipe': request.session.get('latest_recipe'),
         'user' : user,
-        'cart_items_count': items_count,
-        'total_point': total_point,
+        'pending_job_url': job_status_url(pending_job) if pending_job else None,
     })
 
 
@@ -651,18 +648,11 @@ def ingredient_idea_page(request):
     if not name:
         return HttpResponseBadRequest("name required")
 
-    # 현재 재료의 히스토리/캐시 초기화
-    sess_key = f"idea_hist:{name.lower()}"
-    cache_key = f"idea:{name.lower()}"
-    request.session.pop(sess_key, None)
-    cache.delete(cache_key)
-
-    # (선택) 다른 재료 히스토리까지 모두 정리
-    for k in list(request.session.keys()):
-        if k.startswith("idea_hist:") and k != sess_key:
-            request.session.pop(k, None)
+    # 현재 재료의 캐시 초기화
+    cache.delete(text_cache_key("idea", name))
 
-    request.session.modified = True
+    # 히스토리(현재 재료 하나만 보관) 정리
+    request.flow.pop("idea_hist", None)
 
     return render(request, "food/ingredient_idea.html", {"name": name})
 
@@ -675,35 +665,37 @@ def ingredient_idea_api(request):
     if not name:
         return JsonResponse({"ok": False, "error": "name required"}, status=400)
 
-    sess_key = f"idea_hist:{name.lower()}"
-    hist = request.session.get(sess_key, [])
+    # 히스토리는 지금 보고 있는 재료 하나만 보관 ({재료명: 대화}) → 다른 재료 대화가 쌓여 blob이 커지지 않음
+    hist_key = name.lower()
+    hist = (request.flow.get("idea_hist") or {}).get(hist_key, [])
 
     try:
         if q:
-            text = generate_recipe_chat(name, followup=q, history=hist)
+            text = generate_recipe_chat(name, followup=q, history=budget_messages(hist))
 
             hist.extend([
                 {"role": "user", "content": f"재료: {name}\n질문: {q}"},
                 {"role": "assistant", "content": text},
             ])
-            request.session[sess_key] = hist[-20:]
-            request.session.modified = True
+            request.flow["idea_hist"] = {hist_key: hist[-20:]}
             return JsonResponse({"ok": True, "text": text})
 
         # ---- 초기: nocache 지원 ----
         nocache = request.GET.get("nocache") == "1"
-        key = f"idea:{name.lower()}"
+        key = text_cache_key("idea", name)
         text = None if nocache else cache.get(key)
-        cache_hit = text is not None
-        if text is None:
+        if text is not None:
+            llm_telemetry.record_cache_hit("idea")
+        elif nocache:
             text = generate_recipe_chat(name)
             cache.set(key, text, 60 * 60 * 24)
+        else:
+            # 사전 생성 저장소 → GPT(single-flight, 동시 미스는 한 번의 호출 결과를 공유)
+            text = get_or_generate_text("idea", name)
 
         if not hist:
-            request.session[sess_key] = [{"role": "assistant", "content": text}]
-            request.session.modified = True
+            request.flow["idea_hist"] = {hist_key: [{"role": "assistant", "content": text}]}
 
-        print(f"[idea_api][init] name={name} cache_hit={cache_hit} resp.head={text[:80].replace('\\n',' ')}")
         return JsonResponse({"ok": True, "text": text})
 
     except Exception as e:
@@ -720,6 +712,8 @@ def ingredient_idea_api(request):
 def reset_leftover_session(request):
     for k in LEFTOVER_SESSION_KEYS:
         request.session.pop(k, None)
+    for k in LEFTOVER_FLOW_KEYS:
+        request.flow.pop(k, None)
 
 @login_required
 def select_recent_ingredients(request):
@@ -732,12 +726,7 @@ def select_recent_ingredients(request):
         ShoppingList.objects.filter(user=user, is_done=True).first()
     )
     if not latest_list:
-        items_count = cart_items_count(user)
-        total_point = get_user_total_point(user)
-        return render(request, 'food/leftover_save_no_ingredients.html', {
-            "cart_items_count": items_count,
-            "total_point": total_point,
-        })
+        return render(request, 'food/leftover_save_no_ingredients.html')
 
     recent_ingredients = (
         ShoppingListIngredient.objects
@@ -746,7 +735,7 @@ def select_recent_ingredients(request):
     )
 
     # leftover 전용 추가 재료
-    extra_names = request.session.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
+    extra_names = request.flow.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
     extra_ingredients = Ingredient.objects.filter(name__in=extra_names).order_by('name')
 
     if request.method == 'POST':
@@ -758,25 +747,19 @@ def select_recent_ingredients(request):
         # 1) 세션 저장(기존 동작)
         request.session['selected_ingredient_ids'] = selected_ids
         request.session['selected_seed'] = ids_seed(selected_ids)
-        request.session['recipe_chat'] = []
-        request.session['last_recipe_text'] = None
-        request.session.modified = True 
+        request.flow['recipe_chat'] = []
+        request.flow.pop('last_recipe_text', None)
 
         # 2) 우회: 쿼리스트링으로도 함께 전달
         url = reverse('food:chat_with_selected_ingredients')
         qs  = urlencode({'ids': ','.join(selected_ids)})
         return redirect(f'{url}?{qs}')
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     selected_ids = request.session.pop('selected_ingredient_ids', [])
 
     return render(request, 'food/leftover_select_recent_ingredients.html', {
         'recent_ingredients': recent_ingredients,
         'extra_ingredients': extra_ingredients,
-        "cart_items_count": items_count,
-        "total_point": total_point,
         "selected_ids": selected_ids,
 
     })
@@ -788,16 +771,17 @@ def leftover_extra_ingredient_search_view(request):
     # 최근 검색어
     if search_query:
         update_recent_searches(request.session, search_query, key="recent_searches", maxlen=10)
+        trending.record(request.user, search_query)
 
     # 검색 결과
-    category_ingredients = Ingredient.objects.none()
+    category_ingredients = []
     if search_query:
         category_ingredients = search_ingredients_by_name(search_query)
 
     # leftover 전용 선택 목록 (중복 방지)
-    extra_selected = request.session.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
+    extra_selected = request.flow.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
     extra_selected = dedupe_keep_order(extra_selected)
-    request.session[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
+    request.flow[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
 
     selected_ingredients = Ingredient.objects.filter(
         name__in=extra_selected
@@ -808,11 +792,13 @@ def leftover_extra_ingredient_search_view(request):
         "category_ingredients": category_ingredients,
         "selected_ingredients": selected_ingredients,
         "recent_searches": request.session.get("recent_searches", []),
+        "popular_searches": trending.popular_terms(request.user.addr_level3),
+        "autocomplete_sel": autocomplete_sel(extra_selected),
     })
 
 @login_required
 def leftover_add_extra_ingredient(request):
-    """leftover 전용 세션에만 추가"""
+    """leftover 전용 선택 목록에만 추가"""
     if request.method != 'POST':
         return redirect('food:leftover_extra_ingredient_search')
 
@@ -821,13 +807,15 @@ def leftover_add_extra_ingredient(request):
     if not name:
         return redirect_with_query('food:leftover_extra_ingredient_search', 'search', search)
 
-    if not Ingredient.objects.filter(name=name).exists():
+    if name not in get_catalog():
         messages.error(request, f"{name} 재료를 찾을 수 없습니다.")
     else:
-        extra_selected = request.session.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
+        extra_selected = request.flow.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
         if name not in extra_selected:
             extra_selected.append(name)
-            request.session[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
+            request.flow[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
+            bump_selection_version(request.flow, LEFTOVER_EXTRA_SELECTED_KEY)
+            trending.record(request.user, name, kind="cart")
         else:
             messages.info(request, f"{name}은(는) 이미 담겨 있어요.")
 
@@ -836,10 +824,11 @@ def leftover_add_extra_ingredient(request):
 @login_required
 def leftover_remove_extra_ingredient(request, ingredient_name):
     """leftover 전용 추가 재료 제거 (GET/POST 둘 다 허용)"""
-    extra_selected = request.session.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
+    extra_selected = request.flow.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
     if ingredient_name in extra_selected:
         extra_selected.remove(ingredient_name)
-        request.session[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
+        request.flow[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
+        bump_selection_version(request.flow, LEFTOVER_EXTRA_SELECTED_KEY)
     return redirect('food:leftover_extra_ingredient_search')
 
 # (post로 부르는 삭제 뷰를 계속 쓸 거면 아래도 같은 키로 정렬)
@@ -849,10 +838,11 @@ def leftover_delete_extra_ingredient(request, name):
         return redirect('food:leftover_extra_ingredient_search')
 
     search = (request.POST.get('search') or '').strip()
-    extra_selected = request.session.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
+    extra_selected = request.flow.get(LEFTOVER_EXTRA_SELECTED_KEY, [])
     if name in extra_selected:
         extra_selected.remove(name)
-        request.session[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
+        request.flow[LEFTOVER_EXTRA_SELECTED_KEY] = extra_selected
+        bump_selection_version(request.flow, LEFTOVER_EXTRA_SELECTED_KEY)
     else:
         messages.info(request, f"{name}은(는) 후보에 없어요.")
 
@@ -889,9 +879,7 @@ def chat_with_selected_ingredients(request):
             if selected_ids:
                 request.session['selected_ingredient_ids'] = selected_ids
                 request.session['selected_seed'] = ids_seed(selected_ids)  # utils의 ids_seed
-                request.session.setdefault('recipe_chat', [])
-                request.session.setdefault('last_recipe_text', None)
-                request.session.modified = True
+                request.flow.setdefault('recipe_chat', [])
 
     # 그래도 없으면 선택 화면으로
     if not selected_ids:
@@ -904,42 +892,65 @@ def chat_with_selected_ingredients(request):
     ingredients = Ingredient.objects.filter(id__in=selected_ids).order_by('name')
     selected_names = [i.name for i in ingredients]
 
-    chat = request.session.get('recipe_chat', [])
-    last_recipe = request.session.get('last_recipe_text')
-
-    # 첫 진입이면 자동 추천 1회
-    if not chat:
+    chat = request.flow.get('recipe_chat') or []
+    last_recipe = request.flow.get('last_recipe_text')
+
+    # 백그라운드 레시피 결과가 도착했으면 반영 (같은 재료 조합일 때만)
+    job = session_job(request, LEFTOVER_JOB_KEY)
+    if job and job.is_finished and (job.payload or {}).get('selected_names') == selected_names:
+        if job.status == GptJob.Status.DONE:
+            text = (job.result or {}).get('text', '')
+            followup = (job.result or {}).get('followup', '')
+            if followup:
+                chat.append({"role": "user", "content": followup})
+                chat.append({"role": "assistant", "content": text})
+            else:
+                chat = [{"role": "assistant", "content": text}]
+            request.flow['recipe_chat'] = chat
+            request.flow['last_recipe_text'] = text
+            last_recipe = text
+        elif not chat:
+            messages.error(request, job.error or "레시피를 불러오지 못했어요.")
+            return redirect('food:select_recent_ingredients')
+        else:
+            messages.error(request, job.error or "답변을 받지 못했어요.")
+    pending_job = job if job and not job.is_finished else None
+
+    def _enqueue_recipe(followup: str = ""):
+        job = enqueue('leftover_recipe', {
+            'selected_names': selected_names,
+            'followup': followup,
+            'seed': ids_seed(selected_ids),
+            'user_id': user.id,
+        }, user=user)
+        request.session[LEFTOVER_JOB_KEY] = str(job.id)
+        return job
+
+    # 첫 진입이면 자동 추천 1회 (백그라운드)
+    if not chat and pending_job is None:
         try:
-            first = call_gpt(selected_names)
-        except Exception as e:
-            messages.error(request, str(e))
+            pending_job = _enqueue_recipe()
+        except QueueFull:
+            messages.error(request, QUEUE_FULL_MSG)
             return redirect('food:select_recent_ingredients')
-        chat = [{"role": "assistant", "content": first}]
-        request.session['recipe_chat'] = chat
-        request.session['last_recipe_text'] = first
-        last_recipe = first
 
     # 후속 질문
     if request.method == 'POST':
         followup = (request.POST.get('message') or '').strip()
-        if followup:
+        if followup and pending_job is None:
             try:
-                answer = call_gpt(selected_names, followup)
-            except Exception as e:
-                messages.error(request, str(e))
+                pending_job = _enqueue_recipe(followup)
+            except QueueFull:
+                if wants_json(request):
+                    return JsonResponse({"ok": False, "error": QUEUE_FULL_MSG}, status=503)
+                messages.error(request, QUEUE_FULL_MSG)
                 return redirect('food:chat_with_selected_ingredients')
-
-            chat.append({"role": "user", "content": followup})
-            chat.append({"role": "assistant", "content": answer})
-            request.session['recipe_chat'] = chat
-            request.session['last_recipe_text'] = answer
+        if wants_json(request) and pending_job:
+            return JsonResponse({"ok": True, **job_to_dict(pending_job)}, status=202)
         return redirect('food:chat_with_selected_ingredients')
 
     saved_title = request.session.pop('just_saved_recipe_title', None)
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     display_chat = format_chat_for_display(chat)
 
     return render(request, 'food/leftover_chat_with_ingredients.html', {
@@ -948,14 +959,13 @@ def chat_with_selected_ingredients(request):
         'last_recipe': last_recipe,
         'last_recipe_title': parse_title_and_description(last_recipe)[0] if last_recipe else None,
         'saved_title': saved_title,
-        "cart_items_count": items_count,
-        "total_point": total_point,
+        'pending_job_url': job_status_url(pending_job) if pending_job else None,
     })
 
 # ---------- 3) 저장 ----------
 @login_required
 def save_last_recipe(request):
-    text = request.session.get('last_recipe_text')
+    text = request.flow.get('last_recipe_text')
     if not text:
         messages.error(request, "저장할 레시피가 없습니다.")
         return redirect('food:chat_with_selected_ingredients')
@@ -972,8 +982,9 @@ def save_last_recipe(request):
 # (선택) 대화 초기화
 @login_required
 def clear_recipe_chat(request):
-    request.session.pop('recipe_chat', None)
-    request.session.pop('last_recipe_text', None)
+    request.flow.pop('recipe_chat', None)
+    request.flow.pop('last_recipe_text', None)
+    request.session.pop(LEFTOVER_JOB_KEY, None)
     messages.info(request, "대화를 초기화했어요.")
     return redirect('food:chat_with_selected_ingredients')
 
@@ -1010,11 +1021,9 @@ def cart_view(request):
 
         # 전체 비우기
         if action == "clear_all":
-            ShoppingListIngredient.objects.filter(
-                shopping_list=shopping_list
-            ).delete()
+            cart_writer.replace_names(shopping_list, [])
             # 선택 목록 세션도 초기화(선택)
-            request.session.pop("optional_selected", None)
+            request.flow.pop("optional_selected", None)
 
             # next가 있으면 거기로, 없으면 기존처럼 장바구니로
             if next_url:
@@ -1024,17 +1033,21 @@ def cart_view(request):
         # 선택 삭제
         if action == "remove_selected":
             if selected_ids:
-                ShoppingListIngredient.objects.filter(
-                    id__in=selected_ids, shopping_list=shopping_list
-                ).delete()
+                cart_writer.apply(shopping_list, remove_rows=[int(i) for i in selected_ids if i.isdigit()])
             return redirect("food:cart_view")
 
         # 개별 삭제
         remove_one_id = request.POST.get("remove_one")
         if remove_one_id:
-            ShoppingListIngredient.objects.filter(
-                id=remove_one_id, shopping_list=shopping_list
-            ).delete()
+            if remove_one_id.isdigit():
+                cart_writer.apply(shopping_list, remove_rows=[int(remove_one_id)])
+            return redirect("food:cart_view")
+
+        # 함께 많이 산 재료 하나 담기
+        add_related = request.POST.get("add_related")
+        if add_related:
+            if cart_writer.add_names(shopping_list, [add_related]).added:
+                trending.record(request.user, add_related, kind="cart")
             return redirect("food:cart_view")
 
         # 선택한 것만 confirm 으로
@@ -1051,8 +1064,200 @@ def cart_view(request):
                     .filter(shopping_list=shopping_list)
                     .values_list("ingredient__name", flat=True)
                 )
-            request.session["optional_selected"] = selected_names
+            request.flow["optional_selected"] = selected_names
             request.session.modified = True
             return redirect("food:confirm_shopping_list")
 
-    return render(request, "food/cart.html", {"shopping_list": shopping_list, "items": items})
\ No newline at end of file
+    related = related_ingredients([it.ingredient.name for it in items])
+    return render(request, "food/cart.html", {"shopping_list": shopping_list, "items": items, "related": related})
+
+
+# =============================================================================
+# H. 백그라운드 GPT 작업 상태 API (폴링)
+# =============================================================================
+
+@login_required
+@require_GET
+def job_status_api(request, job_id):
+    """
+    [작업 상태 API]
+    - 본인 작업만 조회. status: queued | running | done | failed
+    - done이면 result, failed면 error 포함
+    """
+    job = get_job(job_id, user=request.user)
+    if job is None:
+        return JsonResponse({"ok": False, "error": "job not found"}, status=404)
+    resp = JsonResponse({"ok": True, **job_to_dict(job)})
+    resp["Cache-Control"] = "no-store"
+    return resp
+
+
+# =============================================================================
+# I. 재료 자동완성 API (검색 화면 3곳에서 입력 중 제자리 갱신)
+# =============================================================================
+
+AUTOCOMPLETE_LIMIT = getattr(settings, "AUTOCOMPLETE_LIMIT", 8)
+AUTOCOMPLETE_MAX_LIMIT = 20
+AUTOCOMPLETE_MAX_AGE = getattr(settings, "AUTOCOMPLETE_MAX_AGE", 30)        # 브라우저 캐시(초)
+AUTOCOMPLETE_DEBOUNCE_MS = getattr(settings, "AUTOCOMPLETE_DEBOUNCE_MS", 150)
+
+# scope → 이미 담은 재료가 들어 있는 선택 목록 키 (request.flow)
+AUTOCOMPLETE_SCOPES = {
+    "recipe": "extra_selected",
+    "ingredient": "optional_selected",
+    "leftover": LEFTOVER_EXTRA_SELECTED_KEY,
+}
+
+
+def autocomplete_sel(names: Iterable[str]) -> str:
+    """선택 목록 요약값: 자동완성 URL에 붙여 선택이 바뀌면 브라우저 캐시도 갈리게."""
+    return ids_seed(list(names or []))[:12]
+
+
+@login_required
+@require_GET
+def ingredient_autocomplete_api(request):
+    """
+    [재료 자동완성 API]
+    - q: 입력 중인 검색어, scope: recipe | ingredient | leftover (제외할 선택 목록)
+    - limit: 기본 AUTOCOMPLETE_LIMIT, 최대 20
+    - 선택 목록(request.flow)은 읽기만 함(쓰기/리다이렉트 없음), 메모리 검색 인덱스로 응답
+    - Cache-Control private + ETag(카탈로그 버전·검색어·선택 목록) → 같은 입력은 304
+    - sel: 클라이언트가 아는 선택 목록 요약값(autocomplete_sel). 서버의 현재 값과 다르면
+      결과는 현재 선택 기준으로 주되 브라우저 캐시 금지(no-store) + 응답의 sel로 갈아 끼우게 함
+    """
+    q = (request.GET.get("q") or "").strip()
+    scope = request.GET.get("scope") or "recipe"
+    if scope not in AUTOCOMPLETE_SCOPES:
+        return JsonResponse({"ok": False, "error": "unknown scope"}, status=400)
+    try:
+        limit = int(request.GET.get("limit") or AUTOCOMPLETE_LIMIT)
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
+    catalog = get_catalog()
+    selected = request.flow.get(AUTOCOMPLETE_SCOPES[scope], [])
+    sel = autocomplete_sel(selected)
+    etag_src = "\x00".join([str(catalog.version), scope, q, str(limit), sel])
+    etag = '"%s"' % hashlib.sha1(etag_src.encode("utf-8")).hexdigest()[:20]
+
+    if request.headers.get("If-None-Match") == etag:
+        resp = HttpResponseNotModified()
+    else:
+        names = search_ingredients(q, exclude=selected, limit=limit) if q else []
+        resp = JsonResponse({
+            "ok": True,
+            "q": q,
+            "items": catalog.to_ctx(names),
+            "sel": sel,
+            "debounce_ms": AUTOCOMPLETE_DEBOUNCE_MS,
+        })
+    resp["ETag"] = etag
+    if request.GET.get("sel") == sel:
+        resp["Cache-Control"] = f"private, max-age={AUTOCOMPLETE_MAX_AGE}"
+    else:
+        # URL의 sel이 지금 선택 목록과 다름 → 이 URL로 캐시하면 나중에 틀린 결과를 재사용함
+        resp["Cache-Control"] = "no-store"
+    resp["Vary"] = "Cookie"
+    return resp
+
+
+# =============================================================================
+# J. 장바구니 일괄 변경 API (연속 클릭을 한 요청으로 묶어 반영)
+# =============================================================================
+
+CART_API_MAX_OPS = 50
+
+# scope → 선택 목록 키 (ingredient는 DB 장바구니 + 선택 목록 동기화, 나머지는 선택 목록만)
+CART_API_SCOPES = {
+    "ingredient": "optional_selected",
+    "recipe": "extra_selected",
+    "leftover": LEFTOVER_EXTRA_SELECTED_KEY,
+}
+
+
+def _coalesce_cart_ops(ops: List[Dict[str, Any]]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    [{"op": "add"|"remove", "name"}] → ({원본명: 마지막 op}, 카탈로그에 없는 이름들).
+    같은 재료를 여러 번 눌렀으면 마지막 동작만 남긴다.
+    """
+    catalog = get_catalog()
+    final: Dict[str, str] = {}
+    unknown: List[str] = []
+    for op in ops:
+        name = catalog.resolve((op.get("name") or "").strip())
+        if name is None:
+            unknown.append(op.get("name") or "")
+            continue
+        final.pop(name, None)
+        final[name] = op["op"]
+    return final, dedupe_keep_order(unknown)
+
+
+def _cart_state(names: Iterable[str], version: int, **extra) -> Dict[str, Any]:
+    return {"ok": True, "version": version, "items": get_catalog().to_ctx(sorted(names)), **extra}
+
+
+def _apply_to_selection(request, key: str, adds: Sequence[str], removes: Sequence[str]) -> List[str]:
+    selected = [n for n in request.flow.get(key, []) if n not in set(removes)]
+    selected += [n for n in adds if n not in selected]
+    request.flow[key] = selected
+    return selected
+
+
+@login_required
+@require_POST
+def cart_batch_api(request):
+    """
+    [장바구니 일괄 변경 API]
+    - body(JSON): {"scope": "ingredient"|"recipe"|"leftover", "version": n, "ops": [{"op": "add"|"remove", "name"}]}
+    - ingredient: 활성 장바구니(DB)를 한 트랜잭션에서 bulk 삭제/추가 + optional_selected 동기화
+      recipe/leftover: 각 플로우의 선택 목록(request.flow)만 변경
+    - version이 현재와 다르면 409 + 현재 상태(클라이언트가 다시 맞춘 뒤 재시도)
+    - 응답: 변경 후 목록, 새 version, 반영/무시 내역
+    """
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "invalid json"}, status=400)
+    scope = body.get("scope") or "ingredient"
+    ops = body.get("ops")
+    if scope not in CART_API_SCOPES or not isinstance(ops, list) or len(ops) > CART_API_MAX_OPS:
+        return JsonResponse({"ok": False, "error": "invalid request"}, status=400)
+    if any(not isinstance(op, dict) or op.get("op") not in ("add", "remove") for op in ops):
+        return JsonResponse({"ok": False, "error": "invalid op"}, status=400)
+
+    final, unknown = _coalesce_cart_ops(ops)
+    adds = [n for n, op in final.items() if op == "add"]
+    removes = [n for n, op in final.items() if op == "remove"]
+    expected = body.get("version")
+    flow_key = CART_API_SCOPES[scope]
+
+    if scope != "ingredient":
+        version_key = f"{flow_key}_version"
+        version = request.flow.get(version_key, 0)
+        current = request.flow.get(flow_key, [])
+        if expected is not None and expected != version:
+            return JsonResponse({**_cart_state(current, version), "ok": False, "error": "conflict"}, status=409)
+        added = [n for n in adds if n not in current]
+        removed = [n for n in removes if n in current]
+        if added or removed:
+            current = _apply_to_selection(request, flow_key, added, removed)
+            version = request.flow[version_key] = version + 1
+        for name in added:
+            trending.record(request.user, name, kind="cart")
+        return JsonResponse(_cart_state(current, version, added=added, removed=removed, unknown=unknown))
+
+    sl = get_or_create_active_shopping_list(request.user)
+    try:
+        change = cart_writer.apply(sl, add=adds, remove=removes, expected_version=expected)
+    except cart_writer.CartVersionConflict as e:
+        return JsonResponse({**_cart_state(e.current.names, e.current.version), "ok": False, "error": "conflict"}, status=409)
+
+    _apply_to_selection(request, flow_key, change.added, change.removed)
+    request.session['shopping_list_id'] = sl.id
+    for name in change.added:
+        trending.record(request.user, name, kind="cart")
+    return JsonResponse(_cart_state(change.names, change.version, added=change.added,
+                                    removed=change.removed, unknown=unknown))
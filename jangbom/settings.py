@@ -49,10 +49,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'food.middleware.PrecompressedStaticMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'food.middleware.FlowStateMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -69,6 +71,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'food.context_processors.header',
             ],
         },
     },
@@ -129,6 +132,13 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic: 내용 해시 파일명 + .gz/.br 미리 압축본 (food.services.static_storage)
+# 서빙: PrecompressedStaticMiddleware가 STATIC_ROOT에서 Accept-Encoding에 맞춰 응답
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'food.services.static_storage.CompressedManifestStaticFilesStorage'},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -139,6 +149,33 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# LLM 백엔드: openai | fake (FAKE_LLM으로 지연/장애 설정). manage.py test는 TEST_RUNNER가 fake로 바꿈
+LLM_BACKEND = os.getenv("LLM_BACKEND") or "openai"
+TEST_RUNNER = 'jangbom.test_runner.FakeLLMTestRunner'
 KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
 KAKAO_JS_API_KEY = os.getenv("KAKAO_JS_API_KEY")
-TMAP_API_KEY = os.getenv("TMAP_API_KEY")
\ No newline at end of file
+TMAP_API_KEY = os.getenv("TMAP_API_KEY")
+
+# 캐시: REDIS_URL이 있으면 프로세스 간 공유 캐시(redis), 없으면 Django 기본(프로세스별 LocMem)
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+SHARED_CACHE = bool(REDIS_URL)
+
+# 세션: SESSION_BACKEND=db | cached_db | cache | signed_cookies (기본 db)
+# cached_db(food.services.session_store: 캐시 먼저 읽기 + 바뀐 경우에만 저장)와 cache는
+# 공유 캐시가 있을 때만 — LocMem은 프로세스별이라 다른 워커가 옛 세션을 읽으므로 db로 대신함
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'food.services.session_store',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = os.getenv("SESSION_BACKEND") or 'db'
+if SESSION_BACKEND not in SESSION_ENGINES or (SESSION_BACKEND in ('cached_db', 'cache') and not SHARED_CACHE):
+    SESSION_BACKEND = 'db'
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+SESSION_SERIALIZER = 'food.services.session_store.FastJSONSerializer'
+# 0보다 크면 캐시에는 바로, DB에는 이 간격(초)으로 모아서 저장 (cached_db + 공유 캐시일 때만)
+SESSION_WRITE_BEHIND_SECONDS = (int(os.getenv("SESSION_WRITE_BEHIND_SECONDS") or 0)
+                                if SESSION_BACKEND == 'cached_db' else 0)
@@ -0,0 +1,36 @@
+"""
+테스트 러너: 실제 OpenAI를 부르지 않도록 LLM_BACKEND를 fake로 바꿔서 실행.
+(LLM_BACKEND 환경변수나 .env 값과 관계없이 적용, 개별 테스트는 override_settings로 다시 바꿀 수 있음)
+GPT 텔레메트리/인기 검색어/세션 write-behind의 주기 저장 스레드는 띄우지 않음
+(테스트 트랜잭션 도중 다른 스레드가 같은 DB에 쓰지 않게). 쌓인 것은 테스트 DB를 지우기 전에 저장해 비움
+(종료 시 atexit 저장이 테스트 DB가 아닌 실제 DB로 가지 않도록).
+"""
+from unittest import mock
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def _background_flushers():
+    from food.services import llm_telemetry, session_store, trending
+    return llm_telemetry, trending, session_store
+
+
+class FakeLLMTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._llm_override = override_settings(LLM_BACKEND="fake", FAKE_LLM=None)
+        self._llm_override.enable()
+        self._flusher_patches = [mock.patch.object(m, "_ensure_flusher") for m in _background_flushers()]
+        for p in self._flusher_patches:
+            p.start()
+
+    def teardown_databases(self, old_config, **kwargs):
+        for module in _background_flushers():
+            module.flush()
+        super().teardown_databases(old_config, **kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        for p in self._flusher_patches:
+            p.stop()
+        self._llm_override.disable()
+        super().teardown_test_environment(**kwargs)
@@ -7,4 +7,5 @@ admin.site.register(ShoppingList)
 admin.site.register(ShoppingListIngredient)
 admin.site.register(ActivityLog)
 admin.site.register(NearbyPlace)
-admin.site.register(MarketFilterSetting)
\ No newline at end of file
+admin.site.register(MarketFilterSetting)
+admin.site.register(IngredientNeighbor)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MarketConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'market'
+
+    def ready(self):
+        # 백그라운드 GPT 작업 등록
+        from . import tasks  # noqa: F401
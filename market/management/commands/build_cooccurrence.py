@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from market.models import IngredientNeighbor
+from market.services.cooccurrence import COOCCUR_TOP_K, basket_count, rebuild_all
+
+
+class Command(BaseCommand):
+    help = f"완료된 장보기로 재료별 '함께 많이 산 재료'(상위 {COOCCUR_TOP_K}개, lift)를 다시 계산합니다."
+
+    def handle(self, *args, **opts):
+        written = rebuild_all()
+        ingredients = IngredientNeighbor.objects.values("ingredient_id").distinct().count()
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: 장보기 {basket_count()}건 → 재료 {ingredients}개, 이웃 {written}행"
+        ))
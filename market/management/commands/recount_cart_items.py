@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from market.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = "ShoppingList.item_count(헤더용 담긴 재료 수)를 실제 행 수로 다시 맞춥니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="완료된 장보기까지 (기본: 진행 중만)")
+
+    def handle(self, *args, **opts):
+        qs = ShoppingList.objects.all() if opts["all"] else ShoppingList.objects.filter(is_done=False)
+        fixed = 0
+        for sl_id, stored, actual in qs.annotate(n=Count("shoppinglistingredient")).values_list("id", "item_count", "n").iterator():
+            if stored != actual:
+                ShoppingList.objects.filter(pk=sl_id).update(item_count=actual)
+                fixed += 1
+        self.stdout.write(self.style.SUCCESS(f"완료: {fixed}건 수정"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from market.models import Market
+from market.services.praise_pool import PRAISE_POOL_SIZE, get_pool, market_pool_key, refill_pool
+
+
+class Command(BaseCommand):
+    help = "마켓별/동별 도착 칭찬 문구 풀을 미리 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--market", type=int, action="append", help="특정 마켓 id만 (여러 번 지정 가능)")
+        parser.add_argument("--count", type=int, default=PRAISE_POOL_SIZE, help="마켓당 생성할 문구 쌍 수")
+        parser.add_argument("--only-missing", action="store_true", help="풀이 비어 있는 마켓만")
+
+    def handle(self, *args, **opts):
+        markets = Market.objects.all().order_by("id")
+        if opts["market"]:
+            markets = markets.filter(id__in=opts["market"])
+
+        total = 0
+        for market in markets:
+            if opts["only_missing"] and get_pool(market_pool_key(market.id)):
+                continue
+            added = refill_pool(market, count=opts["count"])
+            total += added
+            self.stdout.write(f"  {market.id} {market.dong} {market.name}: +{added}")
+
+        self.stdout.write(self.style.SUCCESS(f"완료: 문구 {total}쌍 추가"))
@@ -47,6 +47,8 @@ class ShoppingList(models.Model):
     market = models.ForeignKey(Market, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     is_done = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=0, help_text="담긴 재료가 바뀔 때마다 증가 (낙관적 동시성)")
+    item_count = models.PositiveIntegerField(default=0, help_text="담긴 재료 수 (cart_writer가 함께 갱신)")
 
     def __str__(self):
         return f"{self.id} - {self.user.username} - {self.created_at.date()}"
@@ -68,6 +70,29 @@ class ShoppingListIngredient(models.Model):
         return f"{self.shopping_list.id} - {self.ingredient.name}"
 
 
+class IngredientNeighbor(models.Model):
+    """
+    완료된 장보기에서 함께 담긴 재료 (재료별 상위 K개, lift 순).
+    cooccurrence가 전체 재계산(build_cooccurrence) 또는 장보기 완료 시 증분으로 채운다.
+    - support: 두 재료가 함께 담긴 완료 장보기 수
+    - lift: P(a,b) / (P(a)·P(b)), 1보다 크면 우연보다 자주 함께 산 것
+    """
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name="+")
+    support = models.PositiveIntegerField()
+    lift = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ingredient', 'neighbor'], name='uniq_ingredientneighbor_pair')
+        ]
+        indexes = [models.Index(fields=['ingredient', '-lift'])]
+
+    def __str__(self):
+        return f"{self.ingredient_id} → {self.neighbor_id} (lift {self.lift:.2f}, n={self.support})"
+
+
 class ActivityLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     shopping_list = models.ForeignKey(ShoppingList, on_delete=models.CASCADE)
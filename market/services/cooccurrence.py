@@ -0,0 +1,152 @@
+"""
+"함께 많이 산 재료" 추천 (완료된 장보기 기반 공동 출현).
+
+- 장보기 1건 = 재료 집합(바구니). 재료×재료 공동 출현 행렬은 희소하므로
+  행(재료)별 Counter로만 들고 다님 (COO 누적과 같은 방식, 0인 칸은 저장하지 않음)
+- lift(a,b) = n·c(a,b) / (c(a)·c(b)),  support(c(a,b))가 COOCCUR_MIN_SUPPORT 미만이면 제외
+- 재료별 상위 COOCCUR_TOP_K개를 IngredientNeighbor에 저장 → 화면은 인덱스 조회 한 번
+- rebuild_all(): 전체 재계산 (build_cooccurrence 명령)
+- update_for_list(): 장보기 완료 시 그 장보기에 든 재료들의 행만 다시 계산 (백그라운드 작업)
+  다른 재료 행의 lift는 다음 전체 재계산 때 맞춰짐
+"""
+import logging
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterable, List, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from food.models import Ingredient
+from food.services.catalog import get_catalog
+from food.services.job_queue import QueueFull, enqueue
+from market.models import IngredientNeighbor, ShoppingList, ShoppingListIngredient
+
+logger = logging.getLogger(__name__)
+
+COOCCUR_TOP_K = getattr(settings, "COOCCUR_TOP_K", 10)
+COOCCUR_MIN_SUPPORT = getattr(settings, "COOCCUR_MIN_SUPPORT", 2)
+
+Row = Dict[int, int]   # {이웃 id: 함께 담긴 수}
+
+
+def _done_items():
+    return ShoppingListIngredient.objects.filter(shopping_list__is_done=True)
+
+
+def basket_count() -> int:
+    return ShoppingList.objects.filter(is_done=True, shoppinglistingredient__isnull=False).distinct().count()
+
+
+def count_matrix(baskets: Iterable[Iterable[int]]) -> Tuple[int, Counter, Dict[int, Counter]]:
+    """바구니들 → (바구니 수, 재료별 출현 수, 행별 공동 출현 수)."""
+    n, items, rows = 0, Counter(), {}
+    for basket in baskets:
+        basket = sorted(set(basket))
+        if not basket:
+            continue
+        n += 1
+        items.update(basket)
+        for a, b in combinations(basket, 2):
+            rows.setdefault(a, Counter())[b] += 1
+            rows.setdefault(b, Counter())[a] += 1
+    return n, items, rows
+
+
+def top_neighbors(a: int, row: Row, items: Dict[int, int], n: int, k: int = COOCCUR_TOP_K) -> List[Tuple[int, int, float]]:
+    """행 a → [(이웃 id, support, lift)] lift 큰 순 상위 k개."""
+    ca = items.get(a) or 0
+    if not ca or not n:
+        return []
+    scored = []
+    for b, cab in row.items():
+        cb = items.get(b) or 0
+        if b == a or cab < COOCCUR_MIN_SUPPORT or not cb:
+            continue
+        scored.append((b, cab, n * cab / (ca * cb)))
+    scored.sort(key=lambda t: (-t[2], -t[1], t[0]))
+    return scored[:k]
+
+
+def _neighbors_to_rows(a: int, scored: List[Tuple[int, int, float]]) -> List[IngredientNeighbor]:
+    return [IngredientNeighbor(ingredient_id=a, neighbor_id=b, support=s, lift=round(lift, 4)) for b, s, lift in scored]
+
+
+def _baskets():
+    """완료된 장보기별 재료 id 목록 (장보기 id 순으로 한 번 훑기)."""
+    current, basket = None, []
+    for sl_id, ing_id in _done_items().order_by("shopping_list_id").values_list("shopping_list_id", "ingredient_id").iterator():
+        if sl_id != current:
+            if basket:
+                yield basket
+            current, basket = sl_id, []
+        basket.append(ing_id)
+    if basket:
+        yield basket
+
+
+def rebuild_all() -> int:
+    """전체 재계산 후 테이블 교체. 저장한 행 수를 반환."""
+    n, items, rows = count_matrix(_baskets())
+    objs = []
+    for a, row in rows.items():
+        objs.extend(_neighbors_to_rows(a, top_neighbors(a, row, items, n)))
+    with transaction.atomic():
+        IngredientNeighbor.objects.all().delete()
+        IngredientNeighbor.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def _row_from_db(a: int) -> Row:
+    lists = _done_items().filter(ingredient_id=a).values("shopping_list_id")
+    return dict(
+        _done_items().filter(shopping_list_id__in=lists).exclude(ingredient_id=a)
+        .values_list("ingredient_id").annotate(c=Count("shopping_list_id", distinct=True))
+    )
+
+
+def update_for_list(shopping_list_id: int) -> int:
+    """완료된 장보기 1건에 든 재료들의 이웃만 다시 계산."""
+    ids = list(ShoppingListIngredient.objects.filter(shopping_list_id=shopping_list_id)
+               .values_list("ingredient_id", flat=True))
+    if len(ids) < 2:
+        return 0
+    n = basket_count()
+    rows = {a: _row_from_db(a) for a in ids}
+    needed = set(ids).union(*rows.values())
+    items = dict(_done_items().filter(ingredient_id__in=needed)
+                 .values_list("ingredient_id").annotate(c=Count("shopping_list_id", distinct=True)))
+    written = 0
+    with transaction.atomic():
+        for a in ids:
+            objs = _neighbors_to_rows(a, top_neighbors(a, rows[a], items, n))
+            IngredientNeighbor.objects.filter(ingredient_id=a).delete()
+            IngredientNeighbor.objects.bulk_create(objs)
+            written += len(objs)
+    return written
+
+
+def schedule_update(shopping_list_id: int) -> bool:
+    """장보기 완료 직후 호출. 큐가 가득 차면 건너뜀(다음 전체 재계산에서 반영)."""
+    try:
+        enqueue("cooccurrence_update", {"shopping_list_id": shopping_list_id})
+        return True
+    except QueueFull:
+        logger.info("cooccurrence update skipped (queue full): list %s", shopping_list_id)
+        return False
+
+
+def related_ingredients(names: Iterable[str], *, exclude: Iterable[str] = (), limit: int = 6) -> List[str]:
+    """주어진 재료들과 함께 많이 산 재료명 (lift 합 큰 순)."""
+    catalog = get_catalog()
+    ids = list(catalog.ids_for(names or []).values())
+    if not ids:
+        return []
+    skip = set(ids) | set(catalog.ids_for(exclude or []).values())
+    rows = (IngredientNeighbor.objects.filter(ingredient_id__in=ids).exclude(neighbor_id__in=skip)
+            .values("neighbor_id").annotate(score=Sum("lift")).order_by("-score", "neighbor_id")[:limit])
+    out = []
+    for r in rows:
+        name = catalog.name_for(r["neighbor_id"])
+        if name:
+            out.append(name)
+    return out
@@ -0,0 +1,143 @@
+"""
+도착 화면 칭찬 문구 풀 (마켓별 / 동별).
+
+- 화면은 풀에서 무작위로 한 쌍을 뽑기만 한다 → 렌더 중 OpenAI를 기다리지 않음
+- 풀이 덜 찼거나 오래됐으면 백그라운드 작업(praise_pool_refill)으로 몇 쌍씩 보충
+  (마켓당 동시에 하나만, cache.add 락)
+- 마켓 풀이 비어 있으면 같은 동의 풀, 그것도 없으면 기본 문구
+- 풀은 DB(GeneratedText, kind=praise)에 저장하고 캐시는 PRAISE_CACHE_TTL 동안의 읽기용 사본
+  → refill_praise_pools 명령(별도 프로세스)으로 채운 풀도 웹 프로세스가 캐시 만료 후 DB에서 읽음,
+    재시작해도 풀이 남음
+"""
+import json, logging, random, time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from food.models import GeneratedText
+from food.services import llm_telemetry
+from food.services.job_queue import QueueFull, enqueue
+from ..models import Market
+from ..utils import generate_arrival_praises
+
+logger = logging.getLogger(__name__)
+
+PRAISE_POOL_SIZE = getattr(settings, "PRAISE_POOL_SIZE", 12)             # 풀당 최대 문구 쌍
+PRAISE_REFILL_BATCH = getattr(settings, "PRAISE_REFILL_BATCH", 3)        # 보충 1회당 생성 수
+PRAISE_POOL_REFRESH = getattr(settings, "PRAISE_POOL_REFRESH", 60 * 60 * 6)  # 초, 이보다 오래되면 교체 시작
+PRAISE_CACHE_TTL = getattr(settings, "PRAISE_CACHE_TTL", 60 * 5)        # 캐시 사본 유지 시간 (초)
+PRAISE_REFILL_LEASE = 60 * 5
+PRAISE_KIND = GeneratedText.Kind.PRAISE
+
+DEFAULT_PRAISES = [
+    ["지역 경제를 살린 쇼핑", "탄소 없는 도보 쇼핑"],
+    ["배달·포장 없는 장보기", "탄소 없는 도보 쇼핑"],
+]
+
+Entry = Dict[str, object]   # {"lines": [str, str], "at": float}
+
+
+def market_pool_key(market_id: int) -> str:
+    return f"praise_pool:market:{market_id}"
+
+
+def dong_pool_key(dong: str) -> str:
+    return f"praise_pool:dong:{dong}"
+
+
+def load_pools(keys: Iterable[str]) -> Dict[str, List[Entry]]:
+    """{풀 키: 문구 목록}. 캐시에 없으면 DB에서 읽어 캐시에 채움 (없는 풀은 [])."""
+    keys = list(keys)
+    pools = cache.get_many(keys)
+    missing = [k for k in keys if k not in pools]
+    if missing:
+        rows = dict(GeneratedText.objects.filter(kind=PRAISE_KIND, name__in=missing).values_list("name", "text"))
+        loaded = {k: json.loads(rows[k]) if k in rows else [] for k in missing}
+        cache.set_many(loaded, PRAISE_CACHE_TTL)
+        pools.update(loaded)
+    return pools
+
+
+def get_pool(key: str) -> List[Entry]:
+    return load_pools([key])[key]
+
+
+def _needs_refill(pool: List[Entry]) -> bool:
+    if len(pool) < PRAISE_POOL_SIZE:
+        return True
+    newest = max(float(e.get("at") or 0) for e in pool)
+    return time.time() - newest > PRAISE_POOL_REFRESH
+
+
+def sample_praises(market: Market) -> List[str]:
+    """풀에서 문구 2줄을 뽑는다. 필요하면 보충 작업만 걸고 바로 반환."""
+    keys = [market_pool_key(market.id)] + ([dong_pool_key(market.dong)] if market.dong else [])
+    pools = load_pools(keys)
+    pool = pools.get(keys[0]) or []
+
+    if _needs_refill(pool):
+        schedule_refill(market)
+
+    candidates = pool or (pools.get(keys[1]) if len(keys) > 1 else None) or []
+    if candidates:
+        llm_telemetry.record_cache_hit("praise")
+        return list(random.choice(candidates)["lines"])
+    return list(random.choice(DEFAULT_PRAISES))
+
+
+def schedule_refill(market: Market) -> bool:
+    """마켓당 하나의 보충 작업만 큐에 넣는다."""
+    lock = f"praise_pool:refill:{market.id}"
+    if not cache.add(lock, 1, PRAISE_REFILL_LEASE):
+        return False
+    try:
+        enqueue("praise_pool_refill", {"market_id": market.id})
+        return True
+    except QueueFull:
+        cache.delete(lock)
+        return False
+
+
+def _append(key: str, entries: List[Entry]) -> int:
+    if not entries:
+        return 0
+    with transaction.atomic():
+        row = GeneratedText.objects.select_for_update().filter(kind=PRAISE_KIND, name=key).first()
+        pool = ((json.loads(row.text) if row else []) + entries)[-PRAISE_POOL_SIZE:]   # 오래된 것부터 밀어냄
+        GeneratedText.objects.update_or_create(
+            kind=PRAISE_KIND, name=key,
+            defaults={
+                "text": json.dumps(pool, ensure_ascii=False),
+                "refresh_at": timezone.now() + timedelta(seconds=PRAISE_POOL_REFRESH),
+            },
+        )
+    cache.set(key, pool, PRAISE_CACHE_TTL)
+    return len(entries)
+
+
+def _generate(market_name: str, dong: Optional[str], count: int) -> List[Entry]:
+    out: List[Entry] = []
+    for _ in range(count):
+        try:
+            lines = generate_arrival_praises(market_name, dong, None)
+        except Exception:
+            logger.exception("praise generation failed (%s %s)", dong, market_name)
+            break
+        if len(lines) == 2:
+            out.append({"lines": lines, "at": time.time()})
+    return out
+
+
+def refill_pool(market: Market, *, count: Optional[int] = None) -> int:
+    """마켓 풀에 count쌍 추가(+ 동 풀이 덜 찼으면 1쌍). 추가된 수를 반환."""
+    count = PRAISE_REFILL_BATCH if count is None else count
+    try:
+        added = _append(market_pool_key(market.id), _generate(market.name, market.dong, count))
+        if market.dong and len(get_pool(dong_pool_key(market.dong))) < PRAISE_POOL_SIZE:
+            # 동 풀은 시장명 없이 동네 기준 문구
+            added += _append(dong_pool_key(market.dong), _generate("", market.dong, 1))
+        return added
+    finally:
+        cache.delete(f"praise_pool:refill:{market.id}")
@@ -0,0 +1,30 @@
+"""
+백그라운드 GPT 작업 정의 (market).
+"""
+from food.services.job_queue import register_task
+from .models import Market
+from .services.praise_pool import refill_pool
+
+
+@register_task("praise_pool_refill")
+def praise_pool_refill(market_id):
+    """도착 칭찬 문구 풀 보충 (화면은 풀에서 뽑기만 함)."""
+    market = Market.objects.filter(id=market_id).first()
+    return {"added": refill_pool(market) if market else 0}
+
+
+@register_task("cooccurrence_update")
+def cooccurrence_update(shopping_list_id):
+    """완료된 장보기의 재료 이웃(함께 산 재료) 갱신."""
+    from .services.cooccurrence import update_for_list
+    return {"written": update_for_list(shopping_list_id)}
+
+
+@register_task("ingredient_tips")
+def ingredient_tips(names):
+    """구매 TIP 일괄 생성 (배치 GPT). 화면은 저장본만 읽고 이 작업을 폴링."""
+    from food.services.text_store import get_or_generate_tips, release_tip_generation
+    try:
+        return {"tips": get_or_generate_tips(names)}
+    finally:
+        release_tip_generation(names)
@@ -1,3 +1,179 @@
-from django.test import TestCase
+import datetime as dt
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from food.models import GeneratedText, GptJob, Ingredient
+from food.services import text_store
+from food.services.catalog import invalidate_catalog
+from .models import IngredientNeighbor, Market, ShoppingList, ShoppingListIngredient
+from .services import cooccurrence, praise_pool
+from .utils import generate_tip_texts_batch
+
+User = get_user_model()
+
+
+def make_user(username="u", dong=""):
+    return User.objects.create_user(username=username, password="p", nickname=username,
+                                    latitude=37.6, longitude=127.0, addr_level3=dong)
+
+
+def make_market(name="망원시장", dong="망원동"):
+    return Market.objects.create(name=name, dong=dong, latitude=37.55, longitude=126.9,
+                                 open_time=dt.time(9), close_time=dt.time(18))
+
+
+def tip_batch_response(*pairs):
+    return {"responses": {"tip_batch": json.dumps({"tips": [{"name": n, "tip": t} for n, t in pairs]},
+                                                  ensure_ascii=False)}}
+
+
+# =============================================================================
+# 식재료 팁 일괄 생성 / API
+# =============================================================================
+
+class TipBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(FAKE_LLM=tip_batch_response(("양파", "양파 TIP"), ("감자", "모르는 재료"), ("대파", "")))
+    def test_batch_parse_keeps_only_requested_names(self):
+        self.assertEqual(generate_tip_texts_batch(["양파", "대파"]), {"양파": "양파 TIP"})
+
+    @override_settings(FAKE_LLM=tip_batch_response(("양파", "양파 TIP"), ("대파", "대파 TIP")))
+    def test_get_or_generate_tips_stores_each_name(self):
+        tips = text_store.get_or_generate_tips(["대파", "양파", "대파"])
+        self.assertEqual(list(tips), ["대파", "양파"])
+        self.assertEqual(set(GeneratedText.objects.filter(kind="tip").values_list("name", flat=True)),
+                         {"양파", "대파"})
+
+        cache.clear()   # 저장소에서 다시 읽음, GPT는 안 부름
+        with mock.patch.object(text_store, "generate_tip_texts_batch") as batch:
+            self.assertEqual(text_store.get_or_generate_tips(["양파", "대파"]), {"양파": "양파 TIP", "대파": "대파 TIP"})
+        batch.assert_not_called()
+
+    @override_settings(FAKE_LLM=tip_batch_response(("양파", "양파 TIP")))
+    def test_names_missing_from_batch_fall_back_to_single_tip(self):
+        tips = text_store.get_or_generate_tips(["양파", "대파"])
+        self.assertEqual(tips["양파"], "양파 TIP")
+        self.assertIn("대파", tips["대파"])
+
+    def test_api_returns_stored_tips_and_queues_missing_once(self):
+        text_store.store_text("tip", "양파", "저장된 양파 TIP")
+        self.client.force_login(make_user())
+        url = reverse("market:ingredient_tip_batch_api")
+
+        data = self.client.get(url, {"name": ["양파", "대파"]}).json()
+        self.assertEqual(data["tips"], {"양파": "저장된 양파 TIP"})
+        self.assertEqual(data["pending"], ["대파"])
+        job = GptJob.objects.get(id=data["job"]["job_id"])
+        self.assertEqual((job.task, job.payload), ("ingredient_tips", {"names": ["대파"]}))
+
+        again = self.client.get(url, {"name": ["대파"]}).json()   # 같은 재료는 작업을 또 넣지 않음
+        self.assertEqual(again["pending"], ["대파"])
+        self.assertIsNone(again["job"])
+        self.assertEqual(GptJob.objects.count(), 1)
+
+    def test_api_requires_name(self):
+        self.client.force_login(make_user())
+        self.assertEqual(self.client.get(reverse("market:ingredient_tip_batch_api")).status_code, 400)
+
+
+# =============================================================================
+# 도착 칭찬 문구 풀 (praise_pool)
+# =============================================================================
+
+@override_settings(FAKE_LLM={"responses": {"praise": "걸어서 온 알찬 장보기\n동네 시장과 함께한 하루"}})
+class PraisePoolTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.market = make_market()
+
+    def test_empty_pool_uses_default_and_schedules_one_refill(self):
+        self.assertIn(praise_pool.sample_praises(self.market), praise_pool.DEFAULT_PRAISES)
+        praise_pool.sample_praises(self.market)
+        self.assertEqual(list(GptJob.objects.values_list("task", "payload")),
+                         [("praise_pool_refill", {"market_id": self.market.id})])
+
+    def test_refill_is_stored_in_db_and_read_through_cache(self):
+        self.assertEqual(praise_pool.refill_pool(self.market, count=2), 3)   # 마켓 2쌍 + 동 1쌍
+        row = GeneratedText.objects.get(kind="praise", name=praise_pool.market_pool_key(self.market.id))
+        self.assertEqual(len(json.loads(row.text)), 2)
+
+        cache.clear()   # 다른 프로세스가 채운 풀처럼: 캐시가 비어도 DB에서 읽음
+        self.assertEqual(praise_pool.sample_praises(self.market), ["걸어서 온 알찬 장보기", "동네 시장과 함께한 하루"])
+        self.assertEqual(len(cache.get(praise_pool.market_pool_key(self.market.id))), 2)
+
+    def test_falls_back_to_dong_pool(self):
+        other = make_market("망원월드컵시장")
+        praise_pool.refill_pool(other, count=1)
+        self.assertEqual(praise_pool.sample_praises(self.market), ["걸어서 온 알찬 장보기", "동네 시장과 함께한 하루"])
+
+    def test_pool_is_capped(self):
+        for _ in range(3):
+            praise_pool.refill_pool(self.market, count=praise_pool.PRAISE_POOL_SIZE // 2)
+        self.assertEqual(len(praise_pool.get_pool(praise_pool.market_pool_key(self.market.id))),
+                         praise_pool.PRAISE_POOL_SIZE)
+
+
+# =============================================================================
+# 함께 많이 산 재료 (cooccurrence)
+# =============================================================================
+
+BASKETS = [["양파", "대파", "두부"], ["양파", "대파"], ["양파", "두부"], ["대파", "두부"], ["양파", "대파", "감자"]]
+
+
+class CooccurrenceTests(TestCase):
+    def setUp(self):
+        Ingredient.objects.bulk_create([Ingredient(name=n) for n in ["양파", "대파", "두부", "감자"]])
+        invalidate_catalog()
+        self.ids = dict(Ingredient.objects.values_list("name", "id"))
+        self.user = make_user()
+
+    def add_list(self, names, done=True):
+        sl = ShoppingList.objects.create(user=self.user, is_done=done)
+        ShoppingListIngredient.objects.bulk_create(
+            [ShoppingListIngredient(shopping_list=sl, ingredient_id=self.ids[n]) for n in names])
+        return sl
+
+    def neighbors(self, name):
+        return list(IngredientNeighbor.objects.filter(ingredient_id=self.ids[name])
+                    .order_by("-lift").values_list("neighbor__name", "support"))
+
+    def test_lift_with_min_support(self):
+        n, items, rows = cooccurrence.count_matrix([[1, 2, 3], [1, 2], [1, 3], [2, 3], [1, 2, 4]])
+        self.assertEqual((n, items[1], rows[1][2]), (5, 4, 3))
+        scored = cooccurrence.top_neighbors(1, rows[1], items, n)
+        self.assertEqual([(b, s) for b, s, _ in scored], [(2, 3), (3, 2)])   # 4는 support 1이라 제외
+        self.assertAlmostEqual(scored[0][2], 5 * 3 / (4 * 4))
+
+    def test_rebuild_uses_done_lists_only(self):
+        for names in BASKETS:
+            self.add_list(names)
+        self.add_list(["양파", "감자"], done=False)
+        self.add_list(["양파", "감자"], done=False)
+        cooccurrence.rebuild_all()
+        self.assertEqual(self.neighbors("양파"), [("대파", 3), ("두부", 2)])
+        self.assertEqual(self.neighbors("감자"), [])
+
+    def test_update_for_list_matches_rebuild(self):
+        for names in BASKETS[:-1]:
+            self.add_list(names)
+        cooccurrence.rebuild_all()
+        last = self.add_list(BASKETS[-1])
+        cooccurrence.update_for_list(last.id)
+        incremental = self.neighbors("양파")
+        cooccurrence.rebuild_all()
+        self.assertEqual(incremental, self.neighbors("양파"))
+
+    def test_related_ingredients(self):
+        for names in BASKETS:
+            self.add_list(names)
+        cooccurrence.rebuild_all()
+        self.assertEqual(cooccurrence.related_ingredients(["양파"]), ["대파", "두부"])
+        self.assertEqual(cooccurrence.related_ingredients(["양파"], exclude=["대파"]), ["두부"])
+        self.assertEqual(cooccurrence.related_ingredients(["없는재료"]), [])
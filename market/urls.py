@@ -12,6 +12,7 @@ urlpatterns = [
     path("arrival/<int:shoppinglist_id>/save", save_selected_ingredients_view, name="save_selected_ingredients"),
     path("tip", ingredient_tip_page, name="ingredient_tip_page"),
     path("api/ingredient-tip", ingredient_tip_api, name="ingredient_tip_api"),
+    path("api/ingredient-tips", ingredient_tip_batch_api, name="ingredient_tip_batch_api"),
     path('verify-secret/', verify_secret_code, name='verify_secret'),
     path('secret-input/<int:market_id>/', secret_input_view, name='secret_input'),
     path('success/<int:shoppinglist_id>/', shopping_success_view, name='shopping_success'),
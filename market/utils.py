@@ -1,13 +1,14 @@
-import datetime, math, re, requests
+import datetime, json, math, re, requests
 from math import radians, cos, sin, sqrt, atan2
 from typing import Iterable, Optional, Sequence, Tuple, Set, Dict, Any, List
 from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
-from openai import OpenAI
 from .models import Market, MarketStock, ShoppingList, ShoppingListIngredient
 from food.models import Ingredient
+from food.services import model_router
+from food.services.llm_backend import get_llm_client
 
 # 한국 요일 약어
 WEEKDAYS_KO = ['월', '화', '수', '목', '금', '토', '일']
@@ -247,10 +248,10 @@ def minutes_until_close(open_time, close_time, when=None) -> int:
 def reset_cart_session(request) -> None:
     """
     장보기 완료 후 세션 초기화. (food앱 세션 키와 충돌 없이 유지)
+    레시피 재료/선택 목록은 FlowState가 장바구니별로 들고 있어 새 장바구니에서는 자동으로 비어 있음.
     """
     for k in [
-        'optional_selected', 'extra_ingredients', 'search_selected',
-        'basic', 'optional', 'recipe_input', 'latest_recipe'
+        'extra_ingredients', 'search_selected', 'recipe_input', 'latest_recipe'
     ]:
         request.session.pop(k, None)
     request.session['active_sl_id'] = None
@@ -259,10 +260,12 @@ def reset_cart_session(request) -> None:
 # E. GPT 연동 헬퍼(식재료 구매 TIP/칭찬 문구)
 # =============================================================================
 
-AI_MODEL_TIPS = getattr(settings, "AI_MODEL_TIPS", "gpt-4o")
 AI_TEMPERATURE_DEFAULT = getattr(settings, "AI_TEMPERATURE_DEFAULT", 0.6)
+# 구매 TIP 프롬프트나 모델을 바꾸면 올려주세요 (저장된 TIP 재생성 기준)
+# 2: gpt-4o → model_router 기본(작은 모델)
+TIP_PROMPT_VERSION = 2
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client = get_llm_client()
 
 def generate_tip_text(name: str, followup: str | None = None) -> str:
     """
@@ -293,15 +296,79 @@ def generate_tip_text(name: str, followup: str | None = None) -> str:
             "색/향 → 크기 → 손상 → 보관법 순서로, 각 줄은 접두사 없이 '주제: 설명' 문장으로."
         )
 
-    resp = client.chat.completions.create(
-        model=AI_MODEL_TIPS,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=AI_TEMPERATURE_DEFAULT,
+    def create(model: str) -> str:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=AI_TEMPERATURE_DEFAULT,
+        )
+        return (resp.choices[0].message.content or "").strip()
+
+    return model_router.complete("tip", create)
+
+def generate_tip_texts_batch(names: Sequence[str]) -> Dict[str, str]:
+    """
+    여러 재료의 구매 TIP을 한 번의 JSON 응답으로 생성.
+    반환: {재료명: TIP 텍스트}. 파싱에 실패했거나 빠진 재료는 결과에 없음(호출측에서 개별 생성).
+    """
+    names = [n.strip() for n in names if n and n.strip()]
+    if not names:
+        return {}
+
+    system_prompt = (
+        "너는 신선식품 구매 도우미야. 여러 재료의 구매 TIP을 JSON으로만 답해.\n"
+        "각 TIP 형식: 첫 줄 '{재료명} 구매 TIP💡', 이후 줄마다 한 문장, 앞에 • 기호\n"
+        "예시 : 양파 구매 TIP💡\n• 색 - ...\n• 향 - ...\n• 크기 - ...\n• 손상 - ... \n• 보관법 - ...\n"
+        '응답 형식: {"tips": [{"name": "재료명", "tip": "TIP 텍스트"}]}'
     )
-    return (resp.choices[0].message.content or "").strip()
+    user_prompt = (
+        f"재료 목록: {', '.join(names)}\n"
+        "재료마다 구매 팁을 6~10줄로 제공해줘. "
+        "색/향 → 크기 → 손상 → 보관법 순서로, 각 줄은 '주제: 설명' 문장으로. "
+        "name은 재료 목록의 표기를 그대로 써."
+    )
+
+    def create(model: str) -> str:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=AI_TEMPERATURE_DEFAULT,
+            response_format={"type": "json_object"},
+        )
+        return (resp.choices[0].message.content or "").strip()
+
+    def parse(content: str):
+        try:
+            data = json.loads(content)
+        except Exception:
+            return None
+        return data if isinstance(data, dict) and isinstance(data.get("tips"), list) else None
+
+    data = parse(model_router.complete(
+        "tip_batch", create,
+        validate=lambda t: parse(t) is not None,
+        input_chars=len(system_prompt) + len(user_prompt), strict_json=True,
+    ))
+    if data is None:
+        return {}
+
+    wanted = {n.lower(): n for n in names}
+    out: Dict[str, str] = {}
+    items = data.get("tips") if isinstance(data, dict) else None
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        name = wanted.get(str(item.get("name") or "").strip().lower())
+        tip = str(item.get("tip") or "").strip()
+        if name and tip:
+            out[name] = tip
+    return out
 
 def generate_arrival_praises(market_name: str, dong: str | None, distance_m: int | None) -> list[str]:
     """
@@ -323,25 +390,32 @@ def generate_arrival_praises(market_name: str, dong: str | None, distance_m: int
         "디지털 플랫폼을 지역에게 돌려주는 상생 모델."
     )
 
+    # 거리 없이(None) 부르면 풀에 쌓아 두고 재사용할 수 있는 일반 문구
+    walked = f"사용자는 총 {distance_m}m를 걸어 도착했어.\n" if distance_m is not None else "사용자는 걸어서 도착했어.\n"
     user_prompt = (
         f"장소: {dong or ''} {market_name}\n"
-        f"사용자는 총 {distance_m or 0}m를 걸어 도착했어.\n"
+        f"{walked}"
         f"아래 서비스 특징을 바탕으로 사용자에게 칭찬과 격려 문구 2줄을 만들어줘:\n"
         f"{service_pitch}\n"
         "두 줄은 줄바꿈으로 구분하고, 형식 규칙을 반드시 지켜."
     )
 
-    resp = client.chat.completions.create(
-        model=AI_MODEL_TIPS,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user",   "content": user_prompt},
-        ],
-        temperature=AI_TEMPERATURE_DEFAULT,
-    )
-    text = (resp.choices[0].message.content or "").strip()
+    def create(model: str) -> str:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user",   "content": user_prompt},
+            ],
+            temperature=AI_TEMPERATURE_DEFAULT,
+        )
+        return (resp.choices[0].message.content or "").strip()
 
     # 후처리: 혹시 모를 기호/불릿 제거 & 2줄만 추출
-    lines = [re.sub(r'^[\s\-\*\•\d\.\)\(]+', '', ln).strip()
-             for ln in text.splitlines() if ln.strip()]
-    return lines[:2]
\ No newline at end of file
+    def to_lines(text: str) -> list[str]:
+        lines = [re.sub(r'^[\s\-\*\•\d\.\)\(]+', '', ln).strip()
+                 for ln in text.splitlines() if ln.strip()]
+        return [ln for ln in lines if ln][:2]
+
+    text = model_router.complete("praise", create, validate=lambda t: len(to_lines(t)) == 2)
+    return to_lines(text)
\ No newline at end of file
@@ -14,9 +14,18 @@ from decimal import Decimal
 from .services.route_service import route_user_to_market
 from .models import *
 from food.models import Ingredient
+from food.services.cart_writer import replace_names
 from point.models import UserPoint
 from .utils import *
-from food.utils import get_user_total_point, cart_items_count
+from .services.praise_pool import sample_praises
+from .services.cooccurrence import schedule_update as schedule_cooccurrence_update
+from food.services.job_queue import QueueFull, enqueue, job_to_dict
+from food.services.text_store import (
+    claim_tip_generation, get_or_generate_text, get_stored_tips, release_tip_generation,
+)
+
+# 식재료 팁 일괄 API 한 번에 받는 최대 재료 수
+TIP_BATCH_MAX = 20
 
 
 # =============================================================================
@@ -212,9 +221,6 @@ def nearest_market_view(request):
     # 재료 매칭 결과
     matched_ingredients, unmatched_ingredients = match_ingredients(nearest, shopping_ingredients_set)
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     return render(request, 'market/nearest_market.html', {
         "market": nearest,
         "distance_m": distance_m,
@@ -223,8 +229,6 @@ def nearest_market_view(request):
         "point_earned": point_earned,
         "matched_ingredients": matched_ingredients,
         "unmatched_ingredients": unmatched_ingredients,
-        "cart_items_count": items_count,
-        "total_point": total_point,
     })
 
 
@@ -262,9 +266,6 @@ def map_direction_view(request):
     shopping_ingredients_set = get_latest_shopping_ingredients(user)
     matched_ingredients, unmatched_ingredients = match_ingredients(market, shopping_ingredients_set)
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     # 5) 영업 여부
     is_open = is_open_now(market.open_days, market.open_time, market.close_time)
     closing_in_minutes = minutes_until_close(market.open_time, market.close_time) if is_open else 0
@@ -280,8 +281,6 @@ def map_direction_view(request):
         'polyline': json.dumps(polyline),
         'matched_ingredients': matched_ingredients,
         'unmatched_ingredients': unmatched_ingredients,
-        "cart_items_count": items_count,
-        "total_point": total_point,
         "is_open_now": is_open,
         "closing_in_minutes": closing_in_minutes,
         
@@ -298,7 +297,7 @@ def market_arrival_view(request, shoppinglist_id):
     """
     [마켓 도착 화면]
     - 이동정보(분/미터/포인트)와 재료 매칭 결과 표시
-    - AI 칭찬 문구는 실패 시 기본 2줄로 폴백
+    - AI 칭찬 문구는 미리 만들어 둔 풀에서 뽑음 (풀 보충은 백그라운드)
     """
     user = request.user
     shopping_list = get_object_or_404(ShoppingList, id=shoppinglist_id, user=user)
@@ -311,16 +310,8 @@ def market_arrival_view(request, shoppinglist_id):
     shopping_ingredients_set = get_latest_shopping_ingredients(user)
     matched_ingredients, unmatched_ingredients = match_ingredients(market, shopping_ingredients_set)
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
-    # AI 칭찬 문구 2줄 생성 (에러 시 기본 문구)
-    try:
-        praise_lines = generate_arrival_praises(market.name, getattr(market, "dong", None), distance_m)
-        if len(praise_lines) < 2:
-            raise ValueError("not enough lines")
-    except Exception:
-        praise_lines = ["지역 경제를 살린 쇼핑", "탄소 없는 도보 쇼핑"]
+    # AI 칭찬 문구 2줄: 마켓/동 풀에서 샘플링 (OpenAI 대기 없음)
+    praise_lines = sample_praises(market)
 
     context = {
         'user': user,
@@ -331,8 +322,6 @@ def market_arrival_view(request, shoppinglist_id):
         'shopping_list': shopping_list,
         'matched_ingredients': matched_ingredients,
         'unmatched_ingredients': unmatched_ingredients,
-        "cart_items_count": items_count,
-        'total_point': total_point,
         'praise_lines': praise_lines,
     }
     return render(request, 'market/market_arrival.html', context)
@@ -347,25 +336,9 @@ def save_selected_ingredients_view(request, shoppinglist_id):
     - 저장 후 next가 있으면 그 URL로, 없으면 도착 화면으로 유지
     """
     sl = get_object_or_404(ShoppingList, id=shoppinglist_id, user=request.user)
-    selected = set(request.POST.getlist("items"))
-
-    current = set(
-        ShoppingListIngredient.objects
-        .filter(shopping_list=sl)
-        .values_list("ingredient__name", flat=True)
-    )
-
-    # 제거
-    ShoppingListIngredient.objects.filter(shopping_list=sl)\
-        .exclude(ingredient__name__in=selected).delete()
 
-    # 추가
-    to_add = selected - current
-    if to_add:
-        ing_map = {i.name: i for i in Ingredient.objects.filter(name__in=to_add)}
-        ShoppingListIngredient.objects.bulk_create(
-            [ShoppingListIngredient(shopping_list=sl, ingredient=ing_map[n]) for n in to_add if n in ing_map]
-        )
+    # 선택된 것만 남기고 교체 저장
+    replace_names(sl, request.POST.getlist("items"))
 
     # 저장 후 이동
     next_url = request.POST.get("next")
@@ -399,7 +372,7 @@ def ingredient_tip_api(request):
     """
     [식재료 팁 API]
     - q가 있으면 캐시 건너뛰고 바로 생성
-    - q가 없으면 24h 캐시 사용
+    - q가 없으면 24h 캐시 → 사전 생성 저장소 사용 (동시 미스는 한 번의 생성으로 합침)
     """
     name = (request.GET.get("name") or "").strip()
     q    = (request.GET.get("q") or "").strip()
@@ -410,15 +383,43 @@ def ingredient_tip_api(request):
         tip = generate_tip_text(name, followup=q)
         return HttpResponse(tip, content_type="text/plain; charset=utf-8")
 
-    key = f"tip:{name.lower()}"
-    tip = cache.get(key)
-    if tip is None:
-        tip = generate_tip_text(name)
-        cache.set(key, tip, 60 * 60 * 24)
+    # 캐시 → 사전 생성 저장소 → GPT(single-flight) 순으로 조회
+    tip = get_or_generate_text("tip", name)
 
     return HttpResponse(tip, content_type="text/plain; charset=utf-8")
 
 
+@require_GET
+@login_required
+def ingredient_tip_batch_api(request):
+    """
+    [식재료 팁 일괄 API]
+    - ?name=양파&name=대파 ... (최대 TIP_BATCH_MAX개)
+    - 저장된 TIP만 바로 응답 (요청 안에서 GPT를 기다리지 않음)
+    - 없는 재료는 백그라운드 작업(ingredient_tips)으로 생성 → job.status_url을 폴링
+      끝나면 재료별 캐시/저장소에 들어가므로 ingredient_tip_api 개별 요청은 바로 응답
+    """
+    names = [n.strip() for n in request.GET.getlist("name") if n.strip()][:TIP_BATCH_MAX]
+    if not names:
+        return JsonResponse({"ok": False, "error": "name required"}, status=400)
+
+    tips = get_stored_tips(names)
+    pending = [n for n in names if n not in tips]
+    job = None
+    claimed = claim_tip_generation(pending)
+    if claimed:
+        try:
+            job = enqueue("ingredient_tips", {"names": claimed}, user=request.user)
+        except QueueFull:
+            release_tip_generation(claimed)
+    return JsonResponse({
+        "ok": True,
+        "tips": tips,
+        "pending": pending,
+        "job": job_to_dict(job) if job else None,
+    })
+
+
 # =============================================================================
 # F. 구매 인증 (비밀번호) 화면 & 처리
 # =============================================================================
@@ -531,6 +532,7 @@ def shopping_success_view(request, shoppinglist_id):
     # 5) 쇼핑리스트 완료 → 포인트 적립 → 활동 로그
     shopping_list.is_done = True
     shopping_list.save(update_fields=["is_done"])
+    schedule_cooccurrence_update(shopping_list.id)   # 함께 산 재료 증분 갱신(백그라운드)
 
     user_point, _ = UserPoint.objects.get_or_create(user=user)
     user_point.total_point += point_earned
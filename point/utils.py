@@ -6,9 +6,11 @@ from django.db.models import Sum, F, Value, IntegerField
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.crypto import get_random_string
+from django.core.cache import cache
 from .models import *
 from accounts.models import CustomUser
 from market.models import ShoppingList, Market, MarketStock, Ingredient, ActivityLog
+from food.utils import user_point_cache_key
 
 
 # =============================================================================
@@ -170,6 +172,8 @@ def deduct_points_and_log(user, use_point: int, request_id: str, memo: str = "
 
     up = UserPoint.objects.get(user=user)
     PointUsage.objects.create(user=user, amount=use_point, request_id=request_id, memo=memo)
+    # update()는 시그널이 없으므로 헤더 포인트 캐시를 직접 비움
+    transaction.on_commit(lambda: cache.delete(user_point_cache_key(user.pk)))
     return int(up.total_point)
 
 
@@ -9,7 +9,6 @@ from django.utils.crypto import get_random_string
 from point.models import *  
 from accounts.models import CustomUser
 from .utils import *
-from food.utils import get_user_total_point, cart_items_count
 from datetime import timedelta
 
 # =============================================================================
@@ -29,16 +28,11 @@ def point_home(request):
     weekly_points = weekly_points_of(weekly_base, user)
     my_rank = weekly_rank_among(weekly_base, weekly_points)
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     return render(request, "point/home.html", {
         "district": my_district(user),
         "total_points": my_total,
         "weekly_points": weekly_points,
         "my_rank": my_rank,
-        "cart_items_count": items_count,
-        "total_point": total_point,
     })
 
 
@@ -62,16 +56,11 @@ def point_history(request):
 
     summary = qs.aggregate(total_points=Sum("point_earned"), count=Count("id"))
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     return render(request, "point/history.html", {
         "logs": qs,
         "summary": summary,
         "selected": {"period": period, "sort": sort},
         "PERIODS": PERIODS,
-        "cart_items_count": items_count,
-        "total_point": total_point,
     })
 
 
@@ -89,16 +78,11 @@ def point_ranking(request):
     total_stats  = overall_stats_qs(user)
     weekly_top30 = weekly_top_n(base_qs, n=30)
 
-    items_count = cart_items_count(user)
-    total_point = get_user_total_point(user)
-
     return render(request, "point/ranking.html", {
         "district": my_district(user),
         "weekly_top30": weekly_top30,
         "weekly_stats": weekly_stats,
         "total_stats": total_stats,
-        "cart_items_count": items_count,
-        "total_point": total_point,
     })
 
 
@@ -0,0 +1,152 @@
+// cart_batch.js
+// 검색 화면의 담기/빼기 클릭을 모아서 장바구니 일괄 변경 API(cart/api/)로 한 번에 반영
+// - .selected-list[data-cart-api]가 있는 화면에서만 동작, 나머지는 기존 폼 전송 그대로
+// - FLUSH_MS 안에 들어온 클릭은 한 요청으로
+// - 버전 충돌(409)이면 서버가 준 최신 목록으로 다시 그리고, 그 목록에서도 여전히 뭔가를 바꾸는
+//   조작만 최신 버전으로 한 번 다시 보냄 (다른 곳에서 이미 반영된 조작은 버림)
+//   그래도 충돌하면 덮어쓰지 않고 최신 목록만 보여 주고 알림
+// - 실패하면 새로고침해서 서버 렌더링 상태로 복구
+document.addEventListener("DOMContentLoaded", () => {
+  const list = document.querySelector(".selected-list[data-cart-api]");
+  if (!list || !window.fetch) return;
+
+  const FLUSH_MS = 250;
+  const api = list.dataset.cartApi;
+  const scope = list.dataset.cartScope;
+  const addPath = new URL(list.dataset.addUrl, window.location.origin).pathname;
+  const deleteUrl = list.dataset.deleteUrl; // "__name__" 자리에 재료명
+  const csrf = list.dataset.csrf || "";
+  let version = Number(list.dataset.cartVersion || 0);
+
+  let pending = [];
+  let timer = null;
+  let busy = false;
+
+  const send = (ops) =>
+    fetch(api, {
+      method: "POST",
+      credentials: "same-origin",
+      headers: { "Content-Type": "application/json", "X-CSRFToken": csrf },
+      body: JSON.stringify({ scope, version, ops }),
+    });
+
+  const renderSelected = (items) => {
+    list.textContent = "";
+    if (!items.length) {
+      const li = document.createElement("li");
+      li.className = "selected-empty";
+      li.textContent = "장바구니에 담긴 재료가 없습니다.";
+      list.append(li);
+      return;
+    }
+    items.forEach(({ name }) => {
+      const li = document.createElement("li");
+      li.className = "selected-item";
+      const form = document.createElement("form");
+      form.method = "post";
+      form.action = deleteUrl.replace("__name__", encodeURIComponent(name));
+      form.dataset.name = name;
+      const token = document.createElement("input");
+      token.type = "hidden";
+      token.name = "csrfmiddlewaretoken";
+      token.value = csrf;
+      const btn = document.createElement("button");
+      btn.type = "submit";
+      btn.className = "chip selected-remove-btn";
+      btn.setAttribute("aria-label", `${name} 삭제`);
+      const label = document.createElement("span");
+      label.className = "chip-label";
+      label.textContent = name;
+      const x = document.createElement("span");
+      x.className = "chip-x";
+      x.setAttribute("aria-hidden", "true");
+      x.textContent = "×";
+      btn.append(label, x);
+      form.append(token, btn);
+      li.append(form);
+      list.append(li);
+    });
+  };
+
+  const CONFLICT_MSG = "다른 곳에서 장바구니가 바뀌어 최신 상태로 다시 불러왔어요. 확인 후 다시 담아 주세요.";
+
+  // 서버 최신 목록 기준으로 아직 의미 있는 조작만 (담기: 없는 것, 빼기: 있는 것)
+  const stillValid = (ops, items) => {
+    const names = new Set(items.map(({ name }) => name));
+    const seen = new Set();
+    return ops
+      .slice()
+      .reverse()
+      .filter(({ name }) => !seen.has(name) && seen.add(name)) // 같은 재료는 마지막 조작만
+      .reverse()
+      .filter(({ op, name }) => (op === "add" ? !names.has(name) : names.has(name)));
+  };
+
+  const flush = async () => {
+    if (busy || !pending.length) return;
+    busy = true;
+    const ops = pending;
+    pending = [];
+    try {
+      let res = await send(ops);
+      let data = null;
+      if (res.status === 409) {
+        data = await res.json();
+        version = data.version;
+        renderSelected(data.items);
+        const retry = stillValid(ops, data.items);
+        res = retry.length ? await send(retry) : null;
+        if (res && res.status === 409) {
+          data = await res.json();
+          version = data.version;
+          renderSelected(data.items);
+          res = null;
+          alert(CONFLICT_MSG);
+        }
+      }
+      if (res) {
+        if (!res.ok) throw new Error(`cart api ${res.status}`);
+        data = await res.json();
+        version = data.version;
+        renderSelected(data.items);
+      }
+      document.dispatchEvent(new CustomEvent("cart:changed", { detail: { version } }));
+    } catch (e) {
+      window.location.reload();
+      return;
+    } finally {
+      busy = false;
+    }
+    if (pending.length) flush();
+  };
+
+  const queue = (op, name) => {
+    pending.push({ op, name });
+    clearTimeout(timer);
+    timer = setTimeout(flush, FLUSH_MS);
+  };
+
+  // 검색 결과 체크박스: 기존 onchange(폼 전송)보다 먼저 잡아서 큐에 넣음
+  document.addEventListener(
+    "change",
+    (e) => {
+      const box = e.target;
+      if (!box.matches('input[type="checkbox"][name="ingredient"]') || !box.form) return;
+      if (new URL(box.form.action, window.location.origin).pathname !== addPath) return;
+      e.stopPropagation();
+      if (!box.checked) return;
+      queue("add", box.value);
+      box.closest("li")?.remove();
+    },
+    true
+  );
+
+  // 담은 재료의 × 버튼
+  list.addEventListener("submit", (e) => {
+    const form = e.target;
+    if (!form.dataset.name) return;
+    e.preventDefault();
+    queue("remove", form.dataset.name);
+    form.closest("li")?.remove();
+  });
+});
@@ -0,0 +1,131 @@
+// ingredient_autocomplete.js
+// 재료 검색창(#search[data-autocomplete-url]) 입력 중 자동완성 결과를 제자리에서 갱신
+// - 디바운스(서버가 알려준 debounce_ms, 기본 150ms) + 이전 요청 취소(AbortController)
+// - 같은 검색어는 메모리 캐시 재사용, 브라우저 캐시는 ETag/max-age로 서버가 관리
+// - 결과 항목은 서버 렌더링과 같은 모양의 담기 폼(POST)으로 그림
+document.addEventListener("DOMContentLoaded", () => {
+  const input = document.querySelector("#search[data-autocomplete-url]");
+  if (!input || !window.fetch) return;
+
+  const MIN_CHARS = 1;
+  const scope = input.dataset.autocompleteScope || "recipe";
+  const addUrl = input.dataset.autocompleteAddUrl;
+  const csrf = input.dataset.csrf || "";
+  let debounceMs = 150;
+
+  // 화면별 결과 목록 클래스(서버 템플릿과 동일)
+  const CLASSES = {
+    leftover: { wrap: "search-result", list: "result-list", item: "result-item", label: "result-row" },
+    default: { wrap: "", list: "search-result-list", item: "search-result-item", label: "result-label" },
+  };
+  const cls = CLASSES[scope] || CLASSES.default;
+
+  const form = input.closest("form");
+  const bar = input.closest(".addr-inputbar") || form;
+  const serverList = document.querySelector("." + (cls.wrap || cls.list));
+
+  const box = document.createElement(cls.wrap ? "section" : "div");
+  if (cls.wrap) box.className = cls.wrap;
+  box.classList.add("autocomplete-results");
+  box.setAttribute("aria-live", "polite");
+  box.hidden = true;
+  bar.insertAdjacentElement("afterend", box);
+
+  const memo = new Map(); // q → items
+  let timer = null;
+  let inflight = null;
+
+  const endpoint = (q) => {
+    const url = new URL(input.dataset.autocompleteUrl, window.location.origin);
+    url.searchParams.set("q", q);
+    url.searchParams.set("scope", scope);
+    url.searchParams.set("sel", input.dataset.autocompleteSel || "");
+    return url;
+  };
+
+  const el = (tag, attrs = {}) => {
+    const node = document.createElement(tag);
+    Object.entries(attrs).forEach(([k, v]) => node.setAttribute(k, v));
+    return node;
+  };
+
+  const render = (q, items) => {
+    box.textContent = "";
+    if (!items.length) {
+      box.hidden = true;
+      if (serverList) serverList.hidden = false;
+      return;
+    }
+    const ul = el("ul", { class: cls.list });
+    items.forEach((item) => {
+      const li = el("li", { class: cls.item });
+      const f = el("form", { method: "post", action: addUrl });
+      f.append(
+        el("input", { type: "hidden", name: "csrfmiddlewaretoken", value: csrf }),
+        el("input", { type: "hidden", name: "search", value: q })
+      );
+      const label = el("label", { class: cls.label });
+      const check = el("input", { type: "checkbox", name: "ingredient", value: item.name });
+      check.addEventListener("change", () => f.submit());
+      const name = el("span", { class: "result-name" });
+      if (item.image_url) {
+        name.append(el("img", { src: item.image_url, alt: "", width: "24", height: "24", loading: "lazy" }));
+      }
+      name.append(document.createTextNode(item.name));
+      label.append(check, name);
+      f.append(label);
+      li.append(f);
+      ul.append(li);
+    });
+    box.append(ul);
+    box.hidden = false;
+    if (serverList) serverList.hidden = true;
+  };
+
+  const lookup = async (q) => {
+    if (memo.has(q)) return render(q, memo.get(q));
+    if (inflight) inflight.abort();
+    inflight = new AbortController();
+    try {
+      const res = await fetch(endpoint(q), {
+        headers: { Accept: "application/json" },
+        credentials: "same-origin",
+        signal: inflight.signal,
+      });
+      if (!res.ok) return;
+      const data = await res.json();
+      if (!data.ok) return;
+      if (data.debounce_ms) debounceMs = data.debounce_ms;
+      // 서버의 현재 선택 목록 요약값과 다르면 그 값으로 갈아 끼움 (이전 결과 캐시는 버림)
+      if (data.sel !== undefined && data.sel !== input.dataset.autocompleteSel) {
+        memo.clear();
+        input.dataset.autocompleteSel = data.sel;
+      }
+      memo.set(q, data.items);
+      if (input.value.trim() === q) render(q, data.items);
+    } catch (e) {
+      if (e.name !== "AbortError") box.hidden = true;
+    }
+  };
+
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    const q = input.value.trim();
+    if (q.length < MIN_CHARS) {
+      if (inflight) inflight.abort();
+      render(q, []);
+      return;
+    }
+    timer = setTimeout(() => lookup(q), debounceMs);
+  });
+
+  // 장바구니가 바뀌면(cart_batch.js) 제외 목록이 달라지므로 캐시를 비움
+  // 새 요약값은 모르므로 비워 두고 다음 응답의 sel을 받음 (그동안 서버는 no-store로 응답)
+  document.addEventListener("cart:changed", () => {
+    memo.clear();
+    input.dataset.autocompleteSel = "";
+  });
+
+  // 엔터/검색 버튼은 기존대로 전체 검색(최근 검색어 저장)
+  form?.addEventListener("submit", () => clearTimeout(timer));
+});
@@ -0,0 +1,31 @@
+// 백그라운드 GPT 작업 폴링
+// - data-job-url 요소마다 상태 API를 주기적으로 조회
+// - 작업이 끝나면 "job:finished" 이벤트를 보내고, 기본적으로 페이지를 새로고침
+//   (data-job-reload="false"면 새로고침 없이 이벤트만)
+document.addEventListener("DOMContentLoaded", () => {
+  document.querySelectorAll("[data-job-url]").forEach((el) => {
+    const url = el.dataset.jobUrl;
+    const interval = parseInt(el.dataset.jobInterval || "1000", 10);
+    const reload = el.dataset.jobReload !== "false";
+    let tries = 0;
+
+    const tick = () => {
+      tries += 1;
+      if (tries > 180) return; // 약 3분 뒤 포기
+      fetch(url, { headers: { "X-Requested-With": "XMLHttpRequest" } })
+        .then((r) => (r.ok ? r.json() : Promise.reject(r)))
+        .then((job) => {
+          if (job.status === "done" || job.status === "failed") {
+            el.dispatchEvent(
+              new CustomEvent("job:finished", { detail: job, bubbles: true })
+            );
+            if (reload) window.location.reload();
+            return;
+          }
+          setTimeout(tick, interval);
+        })
+        .catch(() => setTimeout(tick, interval * 3));
+    };
+    tick();
+  });
+});
@@ -1,5 +1,6 @@
-// 최신순/가나다순
+// 관련도순(검색 시, 서버 순서)/최신순/가나다순
 document.addEventListener("DOMContentLoaded", () => {
+  const relevanceTab = document.querySelector(".search-filter .relevance");
   const latestTab = document.querySelector(".search-filter .lately");
   const alphaTab  = document.querySelector(".search-filter .abc");
   const list      = document.querySelector(".list-set");
@@ -17,7 +18,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
   // ★ 활성 표시: .is-active 뿐 아니라 .on 도 함께 토글
   const setActive = (activeEl) => {
-    [latestTab, alphaTab].forEach((el) => {
+    [relevanceTab, latestTab, alphaTab].filter(Boolean).forEach((el) => {
       const on = el === activeEl;
       el.classList.toggle("is-active", on);
       el.classList.toggle("on", on);                 // ← 핵심
@@ -29,6 +30,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
   const sortList = (mode) => {
     const sorted = items.slice().sort((a, b) => {
+      if (mode === "relevance") return a._idx - b._idx;
       return mode === "alpha"
         ? getTitle(a).localeCompare(getTitle(b), "ko", { sensitivity: "base", numeric: true })
         : getDate(b) - getDate(a);
@@ -40,12 +42,13 @@ document.addEventListener("DOMContentLoaded", () => {
   const getInitialMode = () => {
     const s = new URLSearchParams(location.search).get("sort");
     if (s === "alpha" || s === "latest") return s;
+    if (relevanceTab && (s === "relevance" || relevanceTab.classList.contains("on"))) return "relevance";
     if (alphaTab.classList.contains("on") || alphaTab.classList.contains("is-active")) return "alpha";
     return "latest";
   };
 
   const applySort = (mode) => {
-    setActive(mode === "alpha" ? alphaTab : latestTab);
+    setActive(mode === "alpha" ? alphaTab : mode === "relevance" ? relevanceTab : latestTab);
     sortList(mode);
   };
 
@@ -57,6 +60,7 @@ document.addEventListener("DOMContentLoaded", () => {
     // e.preventDefault();
     applySort("alpha");
   });
+  relevanceTab?.addEventListener("click", () => applySort("relevance"));
 
   applySort(getInitialMode()); // 초기 표시/정렬
 });